@@ -0,0 +1,100 @@
+"""Measures construction throughput of hot-path OOXML elements in elements per second.
+
+Compares building the elements with create_element and python-docx proxy objects to cloning element templates.
+
+Usage: python -m benchmarks.element_templates [COUNT]
+"""
+import sys
+from time import perf_counter
+
+import docx
+from docx.shared import Cm, RGBColor
+from docx.table import _Cell
+from docx.text.paragraph import Paragraph as DocxParagraph
+from docx.text.run import Run
+
+from md2gost import element_templates
+from md2gost.style_resolver import get_style_resolver
+from md2gost.util import create_element
+
+
+def _best_time(function, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _python_docx(document):
+    body = document._body
+
+    def paragraph():
+        DocxParagraph(create_element("w:p"), body).style = "Normal"
+
+    def run():
+        r = Run(create_element("w:r"), body)
+        r.bold, r.italic, r.font.strike = True, None, None
+        r.font.color.rgb = RGBColor(0xff, 0, 0)
+        r.text = "текст"
+
+    def hyphen_run():
+        create_element("w:r", [create_element("w:noBreakHyphen")])
+
+    def field():
+        create_element("w:r", [
+            create_element("w:fldChar", {"w:fldCharType": "begin"}),
+            create_element("w:instrText", {"xml:space": "preserve"}, " REF name \\h "),
+            create_element("w:fldChar", {"w:fldCharType": "separate"}),
+            create_element("w:t", "1"),
+            create_element("w:fldChar", {"w:fldCharType": "end"}),
+        ])
+
+    def bookmark():
+        create_element("w:bookmarkStart", {"w:id": "1", "w:name": "name"})
+        create_element("w:bookmarkEnd", {"w:id": "1"})
+
+    def table_cell():
+        cell = _Cell(create_element("w:tc"), None)
+        cell.width = Cm(3)
+        cell._tc.tcPr.append(create_element("w:shd", {"w:fill": "auto", "w:val": "clear"}))
+
+    return {"paragraph": paragraph, "run": run, "hyphen run": hyphen_run, "field": field,
+            "bookmark": bookmark, "table cell": table_cell}
+
+
+def _templates(document):
+    style_id = get_style_resolver(document).style_id("Normal")
+
+    def table_cell():
+        element_templates.table_cell(Cm(3))[0].append(element_templates.shading())
+
+    return {
+        "paragraph": lambda: element_templates.paragraph(style_id),
+        "run": lambda: element_templates.formatted_run("текст", True, None, RGBColor(0xff, 0, 0)),
+        "hyphen run": element_templates.hyphen_run,
+        "field": lambda: element_templates.field("1", " REF name \\h "),
+        "bookmark": lambda: element_templates.bookmark("1", "name"),
+        "table cell": table_cell,
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    document = docx.Document()
+
+    old, new = _python_docx(document), _templates(document)
+    for name in old:
+        def build(create):
+            for _ in range(count):
+                create()
+
+        old_time = _best_time(lambda: build(old[name]))
+        new_time = _best_time(lambda: build(new[name]))
+        print(f"{name:>10}: {count / old_time:>9.0f} elements/s python-docx, "
+              f"{count / new_time:>9.0f} elements/s templates ({old_time / new_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
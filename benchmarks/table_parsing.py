@@ -0,0 +1,48 @@
+"""Measures parse throughput of markdown tables in rows per second.
+
+Usage: python -m benchmarks.table_parsing [ROWS ...]
+"""
+import sys
+from time import perf_counter
+
+from marko.source import Source
+
+from md2gost.extended_markdown import markdown
+from md2gost.extended_markdown.table import Table
+
+
+def _table(rows: int) -> str:
+    return "| № | Значение | Погрешность |\n|---|:-:|--:|\n" + \
+        "".join(f"| {i} | {i * 3.5} | {i / 7:.3f} |\n" for i in range(rows))
+
+
+def _best_time(function, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _parse_blocks(text: str):
+    """Parses block elements only, without inline parsing of the cells"""
+    source = Source(text)
+    source.parser = markdown.parser
+    with source.under_state(markdown.parser.block_elements["Document"]()):
+        markdown.parser.parse_source(source)
+
+
+def main():
+    markdown.parse("")  # sets the parser up
+    assert markdown.parser.block_elements["Table"] is Table
+
+    for rows in map(int, sys.argv[1:] or (1000, 4000, 16000)):
+        text = _table(rows)
+        blocks = _best_time(lambda: _parse_blocks(text))
+        full = _best_time(lambda: markdown.parse(text))
+        print(f"{rows:>6} rows: {rows / blocks:>9.0f} rows/s blocks, {rows / full:>9.0f} rows/s with cells")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,13 @@ from argparse import ArgumentParser, BooleanOptionalAction
 import os.path
 from getpass import getuser
 
+from .checker import Checker
 from .converter import Converter
+from .file_buffer import FileBuffer
+from .layout_cache import LayoutCache
+from .parse_cache import ParseCache, get_cache_dir
+from .parser_backend import PARSER_BACKENDS, get_parser_backend
+from .watch import watch
 
 
 def main():
@@ -23,14 +29,30 @@ def main():
                             страниц(ы) в формете docx", default=1, type=int)
     parser.add_argument("--syntax-highlighting", help="Подсветка синтаксиса в листингах",
                         action=BooleanOptionalAction)
+    parser.add_argument("--metrics-pack", help="Путь до файла метрик шрифтов (см. md2gost-metrics-pack), \
+                            используется вместо файлов шрифтов")
+    parser.add_argument("-j", "--jobs", help="Количество процессов для разбора файлов и измерения текста перед \
+                            разметкой страниц", default=1, type=int)
+    parser.add_argument("--stream", help="Создаёт и размечает элементы документа по одному, \
+                            чтобы не хранить их все в памяти", action="store_true")
+    parser.add_argument("--parser", help="Библиотека для разбора markdown, markdown-it быстрее, но требует \
+                            установленного markdown-it-py", choices=PARSER_BACKENDS, default="marko")
+    parser.add_argument("--no-cache", help="Не использует сохранённые результаты разбора исходных файлов",
+                        action="store_true")
+    parser.add_argument("--check", help="Только проверяет ссылки, названия подписей и пути до картинок \
+                            и файлов с кодом, не создавая документ", action="store_true")
     parser.add_argument("--debug", help="Добавляет отладочные данные в документ",
                         action="store_true")
+    parser.add_argument("--watch", help="Отслеживает изменения исходных файлов, шаблона и картинок \
+                            и генерирует документ заново", action="store_true")
 
     args = parser.parse_args()
     filenames, output, template, title, title_pages, debug = \
         args.filenames, args.output, args.template, args.title, args.title_pages, args.debug
     if args.syntax_highlighting:
         os.environ["SYNTAX_HIGHLIGHTING"] = "1"
+    if args.metrics_pack:
+        os.environ["METRICS_PACK"] = os.path.abspath(args.metrics_pack)
 
     if not filenames:
         print("Нет входных файлов!")
@@ -40,6 +62,9 @@ def main():
         print("Ошибка: файл должен иметь расширение .md")
         exit(1)
 
+    if args.check:
+        exit(check(filenames))
+
     if output:
         if not output.endswith(".docx"):
             print("Ошибка: выходной файл должен иметь расширение .docx")
@@ -47,20 +72,44 @@ def main():
     else:
         output = os.path.basename(filenames[0]).replace(".md", ".docx")
 
+    if args.jobs < 1:
+        print("Ошибка: количество процессов должно быть не меньше 1")
+        exit(3)
+
     if not template:
         template = os.path.join(os.path.dirname(__file__), "Template.docx")
 
-    converter = Converter(filenames, output, template, title, title_pages, debug)
-    converter.convert()
+    try:
+        parser_backend = get_parser_backend(args.parser)
+    except ImportError:
+        print("Ошибка: для --parser markdown-it нужен пакет markdown-it-py")
+        exit(4)
+
+    file_buffer = FileBuffer()
+    layout_cache = LayoutCache() if args.watch else None
+    parse_cache = None if args.no_cache else ParseCache(get_cache_dir())
+
+    def convert():
+        converter = Converter(file_buffer, filenames, output, template, title, title_pages, debug, layout_cache,
+                              args.jobs, args.stream, parse_cache, parser_backend)
+        converter.convert()
 
-    document = converter.document
+        document = converter.document
 
-    document.core_properties.author = getuser()
-    document.core_properties.comments =\
-        "Создано при помощи https://github.com/witelokk/md2gost"
+        document.core_properties.author = getuser()
+        document.core_properties.comments =\
+            "Создано при помощи https://github.com/witelokk/md2gost"
 
-    document.save(output)
-    print(f"Сгенерированный документ: {os.path.abspath(output)}")
+        document.save(output)
+        print(f"Сгенерированный документ: {os.path.abspath(output)}")
+        if layout_cache and layout_cache.reused:
+            print(f"Переиспользовано блоков: {layout_cache.reused}")
+
+    try:
+        convert()
+    except FileNotFoundError as e:
+        print(e)
+        exit(-3)
 
     if debug:
         import platform
@@ -73,6 +122,24 @@ def main():
             import subprocess
             subprocess.call(('xdg-open', output))
 
+    if args.watch:
+        watch(file_buffer, convert)
+
+
+def check(filenames: list[str]) -> int:
+    checker = Checker(FileBuffer())
+    for filename in filenames:
+        try:
+            checker.scan(filename)
+        except FileNotFoundError:
+            print(f"Файл {filename} не найден!")
+            exit(-3)
+    warnings = checker.check()
+
+    print(f"Проверено файлов: {len(filenames)}, заголовков: {len(checker.headings)}, "
+          f"ссылок: {checker.references}, предупреждений: {warnings}")
+    return 1 if warnings else 0
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+import logging
+import re
+from io import BytesIO, TextIOWrapper
+
+from marko.ext.gfm.elements import Url
+from marko.inline import AutoLink
+
+from .extended_markdown import Caption, Reference
+from .extended_markdown.table import TableRow
+from .numberer import NumberingPreProcessor
+from .renderable import Equation, Image, Listing, Table
+
+_CAPTION = re.compile(r" {0,3}" + Caption.pattern + "$")
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})\s*\S*\s*(.*?)\s*$")
+_EQUATION = re.compile(r" {0,3}\$\$")
+_HEADING = re.compile(r" {0,3}(#{1,9})\s+(.*?)(?:\s+#+)?\s*$")
+_LIST_ITEM = re.compile(r"\s*(?:[-+*]|\d+[.)])\s")
+_INDENTED_CODE = re.compile(r"(?: {4}|\t)")
+_CODE_SPAN = re.compile(r"(`+).+?\1")
+_IMAGE = re.compile(r"!\[[^\]]*\]\(\s*<?([^\s)>]+)>?(?:\s+[\"']%(\w+)[^)]*)?\)")
+_REFERENCE = re.compile(Reference.pattern)
+_ESCAPE = re.compile(r"\\[!-/:-@\[-`{-~]")
+
+
+def _mask_links(line: str) -> str:
+    """Blanks out backslash escapes, autolinks, bare urls and emails, references aren't parsed inside them"""
+    line = _ESCAPE.sub("  ", line)
+    line = AutoLink.pattern.sub(lambda m: " " * len(m.group()), line)
+    chars = list(line)
+    for match in Url.find(line, source=None):
+        chars[match.start():match.end()] = " " * (match.end() - match.start())
+    return "".join(chars)
+
+
+def _get_row_cells(line: str) -> list[str]:
+    """Splits a table row into cells as TableRow does, returns no cells if the line isn't a row"""
+    if not TableRow.line_start.match(line) or not TableRow.splitter.search(line):
+        return []
+    cells = TableRow.splitter.split(line.strip())
+    if cells and not cells[0]:
+        cells.pop(0)
+    if cells and not cells[-1]:
+        cells.pop()
+    return cells
+
+
+class Checker:
+    """Checks references, caption names and included files of markdown files without converting them.
+
+    The files are scanned line by line with regular expressions instead of the markdown parser, and the same
+    warnings are logged as in conversion.
+    """
+
+    def __init__(self, filebuffer: dict[str, BytesIO]):
+        self._filebuffer = filebuffer
+        self._numbering = NumberingPreProcessor()
+        self._references: list[str] = []
+        self._caption: str | None = None  # applies to the next block, even in the next file
+        self._missing_files = 0
+        self.headings: list[tuple[int, str]] = []
+
+    @property
+    def references(self) -> int:
+        return len(self._references)
+
+    def scan(self, path: str):
+        """Raises FileNotFoundError if there is no such file"""
+        fence = None
+        in_equation = in_list = in_indented_code = False
+        previous_blank = True
+        # caption and columns of a line that is a table header if a delimiter row follows it
+        table_header: tuple[str, int] | None = None
+
+        with TextIOWrapper(self._filebuffer[path], "utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+
+                if fence:
+                    if line.strip().startswith(fence) and not line.strip(fence[0]).strip():
+                        fence = None
+                    continue
+                if in_equation:
+                    in_equation = "$$" not in line
+                    continue
+
+                if not line.strip():
+                    previous_blank = True
+                    table_header = None
+                    continue
+                if in_indented_code or previous_blank and not in_list:
+                    in_indented_code = bool(_INDENTED_CODE.match(line))
+                    if in_indented_code and previous_blank:
+                        self._add_name(Listing.NUMBERING_CATEGORY)
+                previous_blank = False
+                if in_indented_code:
+                    continue
+
+                if table_header:
+                    caption, columns = table_header
+                    cells = _get_row_cells(line)
+                    if len(cells) == columns and all(TableRow.delimiter.match(cell) for cell in cells):
+                        self._numbering.add_name(Table.NUMBERING_CATEGORY, caption)
+                    table_header = None
+
+                if m := _CAPTION.match(line):
+                    self._caption = m.group(1)
+                    continue
+
+                if m := _FENCE.match(line):
+                    fence = m.group(1)
+                    self._add_name(Listing.NUMBERING_CATEGORY)
+                    if (extra := m.group(2)) and extra not in self._filebuffer:
+                        self._warn_missing(f"Файл с кодом не найден: {extra}")
+                    continue
+                if _EQUATION.match(line):
+                    in_equation = "$$" not in line.strip()[2:]
+                    self._add_name(Equation.NUMBERING_CATEGORY)
+                    continue
+                if self._caption and (cells := _get_row_cells(line)) \
+                        and not all(TableRow.delimiter.match(cell) for cell in cells):
+                    table_header = (self._caption, len(cells))
+
+                if m := _HEADING.match(line):
+                    self.headings.append((len(m.group(1)), m.group(2)))
+                in_list = bool(_LIST_ITEM.match(line)) or (in_list and line[0].isspace())
+
+                line = _CODE_SPAN.sub("", line)
+                for m in _IMAGE.finditer(line):
+                    image_path, unique_name = m.groups()
+                    if not image_path.startswith("http") and image_path not in self._filebuffer:
+                        self._warn_missing(f"Путь {image_path} не существует, картинка не будет добавлена")
+                    self._numbering.add_name(Image.NUMBERING_CATEGORY, unique_name)
+                self._references.extend(_REFERENCE.findall(_mask_links(_IMAGE.sub("", line))))
+                self._caption = None
+
+    def check(self) -> int:
+        """Resolves the references of the scanned files, returns the number of warnings"""
+        for unique_name in self._references:
+            self._numbering.resolve(unique_name)
+        return self._numbering.warnings + self._missing_files
+
+    def _add_name(self, category: str):
+        self._numbering.add_name(category, self._caption)
+        self._caption = None
+
+    def _warn_missing(self, message: str):
+        self._missing_files += 1
+        logging.getLogger("md2gost").warning(message)
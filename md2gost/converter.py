@@ -1,3 +1,4 @@
+import logging
 import os.path
 from io import BytesIO
 
@@ -6,16 +7,19 @@ from docx.document import Document
 from docx.oxml import CT_P, CT_Tbl, CT_Blip
 from docx.oxml.ns import qn
 from docx.shared import Cm
-from docx.styles.style import _ParagraphStyle
 from docx.text.paragraph import Paragraph
 
-from .debugger import Debugger
+from .layout_cache import LayoutCache
 from .layout_tracker import LayoutTracker
 from .numberer import NumberingPreProcessor
+from .parse_cache import ParseCache
 from .parser_ import Parser
+from .parser_backend import ParserBackend
+from .pre_measurer import PreMeasurer
+from .renderable.paragraph_sizer import font_cache_info, word_width_cache
 from .toc_processor import TocPreProcessor, TocPostProcessor
 from .renderer import Renderer
-from .util import merge_objects
+from .style_resolver import get_style_resolver
 
 BOTTOM_MARGIN = Cm(1.86)
 
@@ -24,23 +28,32 @@ class Converter:
     """Converts markdown file to docx file"""
 
     def __init__(self, filebuffer: dict[str, BytesIO], input_paths: list[str], output_path: str,
-                 template_path: str = None, title_path: str | None = None, title_pages: int = 1, debug: bool = False):
+                 template_path: str = None, title_path: str | None = None, title_pages: int = 1, debug: bool = False,
+                 layout_cache: LayoutCache | None = None, jobs: int = 1, streaming: bool = False,
+                 parse_cache: ParseCache | None = None, parser_backend: ParserBackend | None = None):
+        """Raises FileNotFoundError if an input file doesn't exist"""
         self._output_path = output_path
         self._title_document: Document = docx.Document(filebuffer[title_path] if title_path else None)
         # self._title_pages = title_pages if title_path else 0
         self._title_pages = 1
         self._document: Document = docx.Document(filebuffer[template_path] if template_path else os.path.join(os.path.dirname(__file__), "Template.docx"))
         self._document._body.clear_content()
-        self._debugger = Debugger(self._document) if debug else None
-        self._parser = Parser(self._document, filebuffer)
+        self._layout_cache = layout_cache
+        self._jobs = jobs
+        self._streaming = streaming
+        self._debugger = None
+        if debug:
+            from .debugger import Debugger  # imports PIL, which is needed only for debugging
+            self._debugger = Debugger(self._document)
+        self._parser = Parser(self._document, filebuffer, streaming, parse_cache, parser_backend)
+        texts = []
         for path in input_paths:
             try:
                 with filebuffer[path] as f:
-                    text = f.read().decode("utf-8")
-            except FileNotFoundError:
-                print(f"Файл {path} не найден!")
-                exit(-3)
-            self._parser.parse(text, os.path.dirname(path))
+                    texts.append((f.read().decode("utf-8"), os.path.dirname(path)))
+            except FileNotFoundError as e:
+                raise FileNotFoundError(f"Файл {path} не найден!") from e
+        self._parser.parse_many(texts, jobs)
 
         max_height = self._document.sections[-1].page_height - self._document.sections[0] \
             .top_margin - BOTTOM_MARGIN  # - ((136 / 2) * (Pt(1)*72/96))  # todo add bottom margin detection with footer
@@ -54,24 +67,13 @@ class Converter:
 
     def append_title(self):
         # copy element styles to element
-        default_style_element = type("DefaultStyle", (), {})
-        default_style_element.rPr = \
-            self._document.styles.element.xpath(
-                'w:docDefaults/w:rPrDefault/w:rPr')[0]
-        default_style_element.pPr = \
-            self._document.part.document.styles.element.xpath(
-                'w:docDefaults/w:pPrDefault/w:pPr')[0]
-        default_style = _ParagraphStyle(default_style_element)
+        style_resolver = get_style_resolver(self._title_document)
 
         for element in self._title_document._body._element.iter():
             if isinstance(element, CT_P):
                 p = Paragraph(element, self._title_document._body)
-                styles = [p.style]
-                while styles[-1].base_style:
-                    styles.append(styles[-1].base_style)
-                styles.append(default_style)
-                pf = merge_objects(*[style.paragraph_format for style in styles][::-1], p.paragraph_format)
-                for attr, value in pf.__dict__.items():
+                pf = style_resolver.paragraph_format(p)
+                for attr, value in pf.items():
                     try:
                         p.paragraph_format.__setattr__(attr, value if value is not None else 0)
                     except AttributeError:
@@ -110,17 +112,54 @@ class Converter:
         self._document._body._element.xpath("w:sectPr/w:pgNumType")[0].set(qn("w:start"), str(self._title_pages+1))
 
     def convert(self):
+        if self._streaming:
+            self._convert_streaming()
+        else:
+            self._convert()
+
+        if self._debugger:
+            self._log_cache_stats()
+
+    def _convert(self):
         renderables = list(self._parser.get_rendered())
 
         processors = [
             TocPreProcessor(),
             NumberingPreProcessor(),
-            Renderer(self._document, self._layout_tracker, self._debugger),
-            TocPostProcessor(self._title_pages),
+            *([PreMeasurer(self._jobs)] if self._jobs > 1 else []),
+            Renderer(self._document, self._layout_tracker, self._debugger, self._layout_cache),
+            TocPostProcessor(self._layout_tracker.page_map, self._title_pages),
         ]
 
-        for processor in processors:
-            processor.process(renderables)
+        # PreMeasurer raises the bound of the word width cache until the measured words are rendered
+        maxsize = word_width_cache.maxsize
+        try:
+            for processor in processors:
+                processor.process(renderables)
+        finally:
+            word_width_cache.maxsize = maxsize
+
+    def _convert_streaming(self):
+        """Creates, renders and releases the blocks one at a time after a prescan of the whole document"""
+        numbering = NumberingPreProcessor()
+        prescanned = self._parser.prescan(numbering)
+        TocPreProcessor().process(prescanned)
+
+        renderer = Renderer(self._document, self._layout_tracker, self._debugger, self._layout_cache)
+        renderer.process(numbering.number_all(self._parser.iter_rendered()))
+
+        TocPostProcessor(self._layout_tracker.page_map, self._title_pages).process(prescanned)
+
+    @staticmethod
+    def _log_cache_stats():
+        logger = logging.getLogger("md2gost")
+        font_info = font_cache_info()
+        logger.debug(f"Font cache: {font_info.hits} hits, {font_info.misses} misses, "
+                     f"{font_info.currsize}/{font_info.maxsize} faces")
+        width_info = word_width_cache.info()
+        logger.debug(f"Word width cache: {width_info.hit_rate:.1%} hit rate, {width_info.hits} hits, "
+                     f"{width_info.misses} misses, {width_info.evictions} evictions, "
+                     f"{width_info.currsize}/{width_info.maxsize} words")
 
     @property
     def document(self) -> Document:
@@ -1,5 +1,4 @@
 import logging
-from collections import defaultdict
 from io import BytesIO
 
 from PIL import Image
@@ -13,10 +12,10 @@ from docx.oxml.shape import CT_Picture
 from docx.oxml.xmlchemy import BaseOxmlElement, OneAndOnlyOne
 from docx.text.paragraph import Paragraph
 
+from .layout_tracker import PageMap
 from .util import create_element
 
 EMUS_PER_PX = Pt(1)
-BOTTOM_MARGIN = Cm(1.86)
 
 
 # refer to docx.oxml.shape.CT_Inline
@@ -127,57 +126,34 @@ def to_px(length: Length) -> int:
 
 class _Page:
     def __init__(self, width: Length, height: Length,
-                 margin_left: Length, margin_top: Length,
-                 margin_right: Length, margin_bottom: Length, first_color: str = None):
+                 margin_left: Length, margin_top: Length, margin_right: Length):
         self._left_offset = margin_left
         self._right_offset = margin_right
-        self._max_height = height - margin_bottom
+        self._top_offset = margin_top
 
         self._width, self._height = width, height
         self._image = Image.new("RGBA", (to_px(width), to_px(height)))
         self._draw = ImageDraw(self._image)
-        self._offset = Length(margin_top)
-
-        self._colors = [
-            (255, 0, 0, 100),  # red
-            (0, 255, 0, 100),  # green
-            (0, 0, 255, 100),  # blue
-        ]
-        if first_color in self._colors:
-            self._i = self._colors.index(first_color)
-        else:
-            self._i = 0
 
     @classmethod
-    def from_document(cls, document: Document, *args, **kwargs):
+    def from_document(cls, document: Document):
         return cls(
             document.sections[-1].page_width,
             document.sections[-1].page_height,
             document.sections[-1].left_margin,
             document.sections[-1].top_margin,
             document.sections[-1].right_margin,
-            BOTTOM_MARGIN,  # todo: fix detection
-            *args, **kwargs
         )
 
-    @property
-    def last_color(self):
-        return self._colors[(self._i-1) % len(self._colors)]
-
-    def add_height(self, height: Length) -> Length:
-        """Return remaining height, that didn't fit to the page"""
-        fitting = min(height, self._max_height - self._offset)
-        remaining = height - fitting
-
+    def draw(self, top: int, bottom: int, color: tuple[int, int, int, int]):
+        """Draws an element part between the heights from the top margin"""
         self._draw.rectangle(
             (
-                (to_px(self._left_offset), to_px(self._offset)),
-                (to_px(self._width-self._right_offset), to_px(self._offset + fitting))
+                (to_px(self._left_offset), to_px(self._top_offset + top)),
+                (to_px(self._width-self._right_offset), to_px(self._top_offset + bottom))
             ),
-            self._get_color()
+            color
         )
-        self._offset += height
-        return remaining
 
     @property
     def image(self) -> BytesIO:
@@ -185,46 +161,46 @@ class _Page:
         self._image.save(io, Image.registered_extensions()[".png"])
         return io
 
-    def _get_color(self):
-        color = self._colors[self._i % len(self._colors)]
-        self._i += 1
-        return color
+
+COLORS = [
+    (255, 0, 0, 100),  # red
+    (0, 255, 0, 100),  # green
+    (0, 0, 255, 100),  # blue
+]
 
 
 class Debugger:
     def __init__(self, document: Document):
         self._document = document
-
-        self._pages: list[_Page] = [_Page.from_document(document)]
-        self._paragraphs_by_page: defaultdict[int, Paragraph] = defaultdict(lambda: None)
+        self._elements: list[Parented] = []
 
     def add(self, docx_element: Parented, height: Length):
-        remaining_height = self._current_page.add_height(height)
+        self._elements.append(docx_element)
 
-        while remaining_height:
-            self._pages.append(_Page.from_document(self._document, self._current_page.last_color))
-            remaining_height = self._current_page.add_height(remaining_height)
-
-        if not self._paragraphs_by_page[len(self._pages)-1] and isinstance(docx_element, Paragraph)\
-                and docx_element.text and "\n" not in docx_element.text:
-            self._paragraphs_by_page[len(self._pages)-1] = docx_element
-
-    def after_rendered(self):
+    def after_rendered(self, page_map: PageMap):
         """Must be called after rendering is finished"""
         if not self._document.paragraphs:
             logging.getLogger("md2gost").debug("No paragraphs found, can't add debug info")
             return
 
-        for i in range(len(self._pages)):
-            if self._paragraphs_by_page[i] is None:
-                logging.getLogger("md2gost").debug(f"Skipping page {i} as there are no paragraphs")
+        pages = [_Page.from_document(self._document) for _ in range(page_map.pages)]
+        for i in range(len(page_map)):
+            start, end = page_map.start(i), page_map.end(i)
+            for page in range(start // page_map.page_height + 1, page_map.page_of(i) + 1):
+                page_start = (page - 1) * page_map.page_height
+                pages[page - 1].draw(max(start, page_start) - page_start,
+                                     min(end, page_start + page_map.page_height) - page_start,
+                                     COLORS[i % len(COLORS)])
+
+        for page in range(1, page_map.pages + 1):
+            paragraph = next((self._elements[i] for i in page_map.elements_on(page)
+                              if isinstance(self._elements[i], Paragraph)
+                              and self._elements[i].text and "\n" not in self._elements[i].text), None)
+            if paragraph is None:
+                logging.getLogger("md2gost").debug(f"Skipping page {page - 1} as there are no paragraphs")
                 continue
             add_float_picture(
-                self._paragraphs_by_page[i],
-                self._pages[i].image,
+                paragraph,
+                pages[page - 1].image,
                 # self._document.sections[-1].page_width
             )
-
-    @property
-    def _current_page(self):
-        return self._pages[-1]
@@ -4,6 +4,7 @@ from docx.oxml import CT_Tbl, CT_R
 from docx.shared import Parented, Length
 from docx.table import Table, _Row, _Cell
 
+from . import element_templates
 from .util import create_element
 
 
@@ -21,13 +22,9 @@ def create_table(parent: Parented, rows: int, cols, width: Length, style="Table
     # google docs fix
     table._tbl.tblPr.append(
         deepcopy(parent.part.styles[style]._element.xpath("w:tblPr/w:tblBorders")[0]))
-    for i in range(rows):
-        for j in range(cols):
-            cell = table.cell(i, j)
-            cell._element.remove(cell.paragraphs[0]._element)
-            table.cell(i, j)._element.tcPr.append(create_element("w:shd", {
-                "w:fill": "auto", "w:val": "clear"
-            }))
+    for tc in table._tbl.iter_tcs():
+        tc.remove(tc.p_lst[0])
+        tc.tcPr.append(element_templates.shading())
 
     return table
 
@@ -37,29 +34,8 @@ def create_table_row(parent: Table):
 
 
 def create_table_cell(parent: _Row, width: Length):
-    cell = _Cell(create_element("w:tc"), parent)
-    cell.width = width
-    return cell
+    return _Cell(element_templates.table_cell(width), parent)
 
 
 def create_field(text: str, instr_text: str) -> CT_R:
-    r = create_element("w:r")
-
-    r.append(create_element("w:fldChar", {
-        "w:fldCharType": "begin"
-    }))
-    r.append(create_element("w:instrText", {
-        "xml:space": "preserve"
-    }, instr_text))
-    r.append(create_element("w:fldChar", {
-        "w:fldCharType": "separate"
-    }))
-    t = create_element("w:t")
-    r.append(t)
-    if text is not None:
-        t.text = text
-    r.append(create_element("w:fldChar", {
-        "w:fldCharType": "end"
-    }))
-
-    return r
+    return element_templates.field(text, instr_text)
@@ -0,0 +1,151 @@
+"""Creates OOXML elements of hot paths by cloning prebuilt templates and setting only the varying values.
+
+The elements are the same as the ones built with create_element and python-docx proxy objects, which resolve
+qualified names and create the children one at a time.
+"""
+import re
+from copy import deepcopy
+
+from docx.oxml import parse_xml, CT_P, CT_R
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Length, RGBColor
+from lxml.etree import _Element
+
+_VAL = qn("w:val")
+_XML_SPACE = qn("xml:space")
+_TCW_W = qn("w:w")
+_INSTR = qn("w:instr")
+_ID = qn("w:id")
+_NAME = qn("w:name")
+
+# tabs and line breaks are separate elements, such text is set by python-docx
+_special_characters = re.compile(r"[\t\r\n]")
+
+
+def _parse(xml: str) -> _Element:
+    tag_end = re.match(r"<[\w:]+", xml).end()
+    return parse_xml(f"{xml[:tag_end]} {nsdecls('w')}{xml[tag_end:]}")
+
+
+_PARAGRAPH = _parse("<w:p><w:pPr/></w:p>")
+_PARAGRAPH_STYLE = _parse('<w:pStyle w:val=""/>')
+_RUN = _parse("<w:r/>")
+_FORMATTED_RUN = _parse("<w:r><w:rPr/></w:r>")
+_RUN_STYLE = _parse('<w:rStyle w:val=""/>')
+_BOLD = _parse("<w:b/>")
+_ITALIC = _parse("<w:i/>")
+_STRIKE = _parse("<w:strike/>")
+_COLOR = _parse('<w:color w:val=""/>')
+_TEXT = _parse("<w:t/>")
+_HYPHEN_RUN = _parse("<w:r><w:noBreakHyphen/></w:r>")
+_FIELD = _parse(
+    '<w:r><w:fldChar w:fldCharType="begin"/><w:instrText xml:space="preserve"/>'
+    '<w:fldChar w:fldCharType="separate"/><w:t/><w:fldChar w:fldCharType="end"/></w:r>'
+)
+_SIMPLE_FIELD = _parse('<w:fldSimple w:instr=""><w:r><w:t/></w:r></w:fldSimple>')
+_BOOKMARK_START = _parse('<w:bookmarkStart w:id="" w:name=""/>')
+_BOOKMARK_END = _parse('<w:bookmarkEnd w:id=""/>')
+_NO_NUMBERING = _parse('<w:numPr><w:ilvl w:val="0"/><w:numId w:val="0"/></w:numPr>')
+_SHADING = _parse('<w:shd w:fill="auto" w:val="clear"/>')
+_TABLE_CELL = _parse('<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="0"/></w:tcPr></w:tc>')
+
+
+def paragraph(style_id: str | None) -> CT_P:
+    """A paragraph with the style, as python-docx assigns it"""
+    p = deepcopy(_PARAGRAPH)
+    if style_id is not None:
+        p_style = deepcopy(_PARAGRAPH_STYLE)
+        p_style.set(_VAL, style_id)
+        p[0].append(p_style)
+    return p
+
+
+def _append_text(r: CT_R, text: str | None):
+    if not text:
+        return
+    if _special_characters.search(text):
+        r.text = text
+        return
+    t = deepcopy(_TEXT)
+    t.text = text
+    if len(text.strip()) < len(text):
+        t.set(_XML_SPACE, "preserve")
+    r.append(t)
+
+
+def run(text: str | None = None) -> CT_R:
+    """A run without formatting, as python-docx Paragraph.add_run creates"""
+    r = deepcopy(_RUN)
+    _append_text(r, text)
+    return r
+
+
+def formatted_run(text: str | None, bold: bool | None = None, italic: bool | None = None,
+                  color: RGBColor | None = None, strike: bool | None = None, style_id: str | None = None) -> CT_R:
+    """A run with the character style and the font properties set, as with python-docx Run and Font"""
+    r = deepcopy(_FORMATTED_RUN)
+    rPr = r[0]
+    if style_id is not None:
+        rPr.append(_with_value(_RUN_STYLE, style_id))
+    for template, value in ((_BOLD, bold), (_ITALIC, italic), (_STRIKE, strike)):
+        if value is not None:
+            element = deepcopy(template)
+            if not value:
+                element.set(_VAL, "0")
+            rPr.append(element)
+    if color is not None:
+        rPr.append(_with_value(_COLOR, str(color)))
+    _append_text(r, text)
+    return r
+
+
+def hyphen_run() -> CT_R:
+    """A run with a non-breaking hyphen"""
+    return deepcopy(_HYPHEN_RUN)
+
+
+def field(text: str | None, instr_text: str) -> CT_R:
+    """A complex field run, its result is the text"""
+    r = deepcopy(_FIELD)
+    r[1].text = instr_text
+    if text is not None:
+        r[3].text = text
+    return r
+
+
+def simple_field(instr: str, text: str) -> _Element:
+    """A simple field, its result is the text of its only run"""
+    fld_simple = deepcopy(_SIMPLE_FIELD)
+    fld_simple.set(_INSTR, instr)
+    fld_simple[0][0].text = text
+    return fld_simple
+
+
+def bookmark(bookmark_id: str, name: str) -> tuple[_Element, _Element]:
+    """Returns the start and the end elements of the bookmark"""
+    start, end = deepcopy(_BOOKMARK_START), deepcopy(_BOOKMARK_END)
+    start.set(_ID, bookmark_id)
+    start.set(_NAME, name)
+    end.set(_ID, bookmark_id)
+    return start, end
+
+
+def no_numbering() -> _Element:
+    """Numbering properties removing the numbering of the paragraph style"""
+    return deepcopy(_NO_NUMBERING)
+
+
+def shading() -> _Element:
+    return deepcopy(_SHADING)
+
+
+def table_cell(width: Length) -> _Element:
+    tc = deepcopy(_TABLE_CELL)
+    tc[0][0].set(_TCW_W, str(Length(width).twips))
+    return tc
+
+
+def _with_value(template: _Element, value: str) -> _Element:
+    element = deepcopy(template)
+    element.set(_VAL, value)
+    return element
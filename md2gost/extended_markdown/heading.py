@@ -20,14 +20,19 @@ class Heading(BlockElement):
 
     def __init__(self, match: Match[str]) -> None:
         self.level = len(match.group(1))
-        inline_body = match.group(2).strip()
+        self.numbered, self.inline_body = self.parse_inline_body(match.group(2))
+
+    @staticmethod
+    def parse_inline_body(inline_body: str) -> tuple[bool, str]:
+        """Returns whether the heading is numbered and its text without the asterisk"""
+        inline_body = inline_body.strip()
         if not inline_body:
             logging.getLogger("md2gost").warning(f"Пустой заголовок")
             inline_body = "Пустой заголовок"
-        self.numbered = not (inline_body[0] == "*")
-        if not self.numbered:
+        numbered = not (inline_body[0] == "*")
+        if not numbered:
             inline_body = inline_body[1:]
-        self.inline_body = inline_body
+        return numbered, inline_body
 
     @classmethod
     def match(cls, source: Source) -> Match[str] | None:
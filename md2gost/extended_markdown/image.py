@@ -5,11 +5,16 @@ from marko.inline import Image as Image_
 
 class Image(Image_):
     override = True
+    caption_pattern = re.compile(r"\%(\w+)( (.+))?")
+
     def __init__(self, match):
         super().__init__(match)
+        self.parse_title()
 
+    def parse_title(self):
+        """Takes the unique name of the image from the title: %name Caption text"""
         self.unique_name = None
 
-        if self.title and (m := re.match(r"\%(\w+)( (.+))?", self.title)):
+        if self.title and (m := self.caption_pattern.match(self.title)):
             self.unique_name = m.group(1)
             self.title = m.group(2)
@@ -5,13 +5,14 @@ from marko.ext.gfm.elements import TableCell
 
 
 class TableRow(block.BlockElement):
-    """A table row element."""
+    """A table row element.
+
+    State between match and parse is kept in source.context, so sources can be parsed concurrently."""
 
     splitter = re.compile(r"\s*(?<!\\)\|\s*")
     delimiter = re.compile(r":?-+:?")
+    line_start = re.compile(r" {,3}\S")
     virtual = True
-    _cells = None
-    _is_delimiter = False
 
     def __init__(self, cells):
         self.children = cells
@@ -19,7 +20,7 @@ class TableRow(block.BlockElement):
     @classmethod
     def match(cls, source):
         line = source.next_line()
-        if not line or not re.match(r" {,3}\S", line):
+        if not line or not cls.line_start.match(line):
             return False
         parts = cls.splitter.split(line.strip())
         if parts and not parts[0]:
@@ -28,15 +29,15 @@ class TableRow(block.BlockElement):
             parts.pop()
         if len(parts) < 1:
             return False
-        cls._cells = parts
-        cls._is_delimiter = all(cls.delimiter.match(cell) for cell in parts)
+        source.context.cells = parts
+        source.context.is_delimiter = all(cls.delimiter.match(cell) for cell in parts)
         return True
 
     @classmethod
     def parse(cls, source):
         source.consume()
         parent = source.state
-        cells = cls._cells[:]
+        cells = source.context.cells[:]
         if len(cells) < parent._num_of_cols:
             cells.extend("" for _ in range(parent._num_of_cols - len(cells)))
         elif len(cells) > parent._num_of_cols:
@@ -48,31 +49,32 @@ class TableRow(block.BlockElement):
         return cells
 
 
-
 class Table(block.BlockElement):
     """A table element."""
 
-    _num_of_cols = None
     _prefix = ""
     override = True
+    # a line starting with a pipe can't start another block element, so it's a row without trying them
+    pipe_row = re.compile(r" {,3}\|")
+
+    def __init__(self, num_of_cols: int):
+        self._num_of_cols = num_of_cols
+        self.children = []
 
     @classmethod
     def match(cls, source):
         source.anchor()
-        if TableRow.match(source) and not TableRow._is_delimiter:
+        if TableRow.match(source) and not source.context.is_delimiter:
             if not TableRow.splitter.search(source.next_line()):
                 return False
             source.pos = source.match.end()
-            num_of_cols = len(TableRow._cells)
+            num_of_cols = len(source.context.cells)
             if (
                 TableRow.match(source)
-                and TableRow._is_delimiter
-                and num_of_cols == len(TableRow._cells)
+                and source.context.is_delimiter
+                and num_of_cols == len(source.context.cells)
             ):
-                cls._num_of_cols = num_of_cols
-                lens = [len(x) for x in TableRow._cells]
-                proportions = [x/sum(lens) for x in lens]
-                TableRow.proportions = proportions
+                source.context.num_of_cols = num_of_cols
                 source.reset()
                 return True
         source.reset()
@@ -80,15 +82,16 @@ class Table(block.BlockElement):
 
     @classmethod
     def parse(cls, source):
-        rv = cls()
-        rv._num_of_cols = cls._num_of_cols
-        rv.children = []
+        rv = cls(source.context.num_of_cols)
+        # other elements ending the table, built once per table instead of once per row
+        block_elements = [e for e in source.parser._build_block_element_list()
+                          if not issubclass(e, (Table, block.Paragraph))]
         with source.under_state(rv):
             TableRow.match(source)
             header = TableRow(TableRow.parse(source))
             rv.children.append(header)
             TableRow.match(source)
-            delimiters = TableRow._cells
+            delimiters = source.context.cells
             source.consume()
             for d, th in zip(delimiters, header.children):
                 stripped_d = d.strip()
@@ -100,15 +103,12 @@ class Table(block.BlockElement):
                 elif stripped_d[-1] == ":":
                     th.align = "right"
             while not source.exhausted:
-                for e in source.parser._build_block_element_list():
-                    if issubclass(e, (Table, block.Paragraph)):
-                        continue
-                    if e.match(source):
+                line = source.next_line()
+                if line is None or not cls.pipe_row.match(line):
+                    if any(e.match(source) for e in block_elements):
                         break
-                else:
-                    if TableRow.match(source):
-                        rv.children.append(TableRow(TableRow.parse(source)))
-                        continue
+                if TableRow.match(source):
+                    rv.children.append(TableRow(TableRow.parse(source)))
+                    continue
                 break
         return rv
-
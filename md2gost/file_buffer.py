@@ -0,0 +1,47 @@
+import os
+from collections.abc import Iterator, Mapping
+from io import BytesIO
+
+
+class FileBuffer(Mapping[str, BytesIO]):
+    """Files of a conversion read from the disk on access.
+
+    Each access returns a new stream, as the converter closes them. Contents are kept while the file is not
+    modified, and the accessed paths are recorded, so they can be watched for changes.
+    """
+
+    def __init__(self):
+        self._contents: dict[str, tuple[int, bytes]] = {}
+        self.accessed: set[str] = set()
+
+    def __getitem__(self, path: str) -> BytesIO:
+        """Raises FileNotFoundError if there is no such file"""
+        self.accessed.add(path)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._contents.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as f:
+                cached = self._contents[path] = (mtime, f.read())
+        return BytesIO(cached[1])
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, str):
+            return False
+        self.accessed.add(path)
+        return os.path.isfile(path)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._contents)
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def get_mtimes(self) -> dict[str, int | None]:
+        """Returns modification times of the accessed paths, None for missing files"""
+        mtimes = {}
+        for path in self.accessed:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
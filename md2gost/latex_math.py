@@ -1,5 +1,6 @@
 import os
 from copy import deepcopy
+from functools import cache, lru_cache
 
 from lxml import etree
 
@@ -7,15 +8,20 @@ import latex2mathml.converter
 from lxml.etree import _Element
 
 
-def latex_to_omml(latex_equation: str) -> _Element:
+FORMULA_CACHE_SIZE = 1024
+
+
+@cache
+def _get_transform() -> etree.XSLT:
+    return etree.XSLT(etree.parse(os.path.join(os.path.dirname(__file__), "mml2omml")))
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _convert(latex_equation: str) -> _Element:
     try:
         mathml = latex2mathml.converter.convert(latex_equation)
         tree = etree.fromstring(mathml)
-        xslt = etree.parse(
-            os.path.join(os.path.dirname(__file__), "mml2omml")
-        )
-        transform = etree.XSLT(xslt)
-        new_dom = transform(tree)
+        new_dom = _get_transform()(tree)
         word_math = new_dom.getroot()
     except Exception:
         raise ValueError(f"Can't parse the formula:\n{latex_equation}")
@@ -23,6 +29,11 @@ def latex_to_omml(latex_equation: str) -> _Element:
     return word_math
 
 
+def latex_to_omml(latex_equation: str) -> _Element:
+    """Returns a copy of the cached conversion, as it's inserted to the document"""
+    return deepcopy(_convert(latex_equation))
+
+
 def inline_omml(omml: _Element):
     omml = deepcopy(omml)
 
@@ -0,0 +1,54 @@
+from copy import deepcopy
+from dataclasses import dataclass
+
+from docx.oxml.xmlchemy import BaseOxmlElement
+from docx.shared import Length
+
+from .layout_tracker import LayoutState
+
+
+@dataclass(frozen=True)
+class CachedBlock:
+    """Elements rendered from a block and their heights"""
+    elements: list[tuple[BaseOxmlElement, Length]]
+
+
+class LayoutCache:
+    """Rendered blocks of the previous conversion, reused while a block and the layout it enters are same.
+
+    A block is keyed by its content hash, the previous rendered element and the position on the page, so after
+    a changed block the following ones are reused again as soon as they start at the same place of a page.
+    Only blocks of the last conversion are kept.
+    """
+
+    def __init__(self):
+        self._blocks: dict[tuple, CachedBlock] = {}
+        self._next_blocks: dict[tuple, CachedBlock] = {}
+        self.reused = 0
+
+    @staticmethod
+    def get_key(content_hash: bytes, previous: bytes | None, layout_state: LayoutState) -> tuple:
+        # only these properties of the layout state are used when rendering
+        return (content_hash, previous, layout_state.max_height, layout_state.max_width,
+                layout_state.current_page_height, layout_state.page == 1)
+
+    def start(self):
+        """Must be called before a conversion"""
+        self._next_blocks = {}
+        self.reused = 0
+
+    def get(self, key: tuple) -> list[tuple[BaseOxmlElement, Length]] | None:
+        """Returns copies of the cached elements of the block"""
+        block = self._blocks.get(key)
+        if block is None:
+            return None
+        self._next_blocks[key] = block
+        self.reused += 1
+        return [(deepcopy(element), height) for element, height in block.elements]
+
+    def put(self, key: tuple, elements: list[tuple[BaseOxmlElement, Length]]):
+        self._next_blocks[key] = CachedBlock([(deepcopy(element), height) for element, height in elements])
+
+    def finish(self):
+        """Must be called after a conversion, drops the blocks which weren't used in it"""
+        self._blocks, self._next_blocks = self._next_blocks, {}
@@ -1,50 +1,124 @@
-from copy import copy
+from array import array
+from bisect import bisect_right
 
 from docx.shared import Length
+from docx.oxml.xmlchemy import BaseOxmlElement
 
 
 class LayoutState:
-    def __init__(self, max_height: Length, max_width: Length):
-        self.max_height: Length = max_height
-        self.max_width: Length = max_width
-        self._current_height: Length = Length(0)
+    """Position in the document layout, all lengths are integer EMUs"""
+    __slots__ = ("max_height", "max_width", "_current_height")
+
+    def __init__(self, max_height: Length | int, max_width: Length | int, current_height: int = 0):
+        self.max_height: int = int(max_height)
+        self.max_width: int = int(max_width)
+        self._current_height: int = current_height
+
+    def __copy__(self) -> "LayoutState":
+        return LayoutState(self.max_height, self.max_width, self._current_height)
+
+    def snapshot(self) -> tuple[int, int, int]:
+        """Returns the state, which can be restored after exploring a placement"""
+        return self.max_height, self.max_width, self._current_height
+
+    def restore(self, snapshot: tuple[int, int, int]):
+        self.max_height, self.max_width, self._current_height = snapshot
 
     def new_page(self):
         self._current_height += self.remaining_page_height
 
     @property
-    def current_page_height(self):
+    def current_height(self) -> int:
+        """Height of the document from its beginning"""
+        return self._current_height
+
+    @property
+    def current_page_height(self) -> int:
         return self._current_height % self.max_height
 
     @property
-    def remaining_page_height(self) -> Length:
-        return self.max_height - self.current_page_height
+    def remaining_page_height(self) -> int:
+        return self.max_height - self._current_height % self.max_height
 
     @property
-    def page(self):
+    def page(self) -> int:
         return self._current_height // self.max_height + 1
 
-    def add_height(self, height: Length):
-        self._current_height += height
+    def add_height(self, height: Length | float):
+        self._current_height += int(height)
+
+
+class PageMap:
+    """Pages of the rendered elements, stored as the document height after each element in integer EMUs"""
+
+    def __init__(self, page_height: Length | int):
+        self.page_height = int(page_height)
+        self._ends = array("q")  # document height after each element
+        self._first_elements = array("q", [0])  # index of the first element ending on each page
+        self._indexes: dict[BaseOxmlElement, int] = {}
+
+    def __len__(self):
+        return len(self._ends)
+
+    @property
+    def pages(self) -> int:
+        return len(self._first_elements)
+
+    def add(self, end: int, element: BaseOxmlElement | None = None):
+        """Adds the next element, which ends at the given document height"""
+        index = len(self._ends)
+        self._ends.append(end)
+        for _ in range(self.page_of(index) - len(self._first_elements)):
+            self._first_elements.append(index)
+        if element is not None:
+            self._indexes[element] = index
+
+    def index_of(self, element: BaseOxmlElement) -> int:
+        return self._indexes[element]
+
+    def start(self, index: int) -> int:
+        return self._ends[index - 1] if index else 0
+
+    def end(self, index: int) -> int:
+        return self._ends[index]
+
+    def page_of(self, index: int) -> int:
+        """Returns the page where the element ends"""
+        return self._ends[index] // self.page_height + 1
+
+    def elements_on(self, page: int) -> range:
+        """Returns indexes of the elements ending on the page"""
+        return range(self._first_elements[page - 1],
+                     self._first_elements[page] if page < len(self._first_elements) else len(self._ends))
+
+    def element_at(self, height: int) -> int:
+        """Returns index of the element at the document height"""
+        return bisect_right(self._ends, height)
 
 
 class LayoutTracker:
     def __init__(self, max_height: Length, max_width: Length):
         self._state = LayoutState(max_height, max_width)
         self._is_new_page = False
+        self._page_map = PageMap(max_height)
+
+    @property
+    def current_state(self) -> LayoutState:
+        return LayoutState(*self._state.snapshot())
 
     @property
-    def current_state(self):
-        return copy(self._state)
+    def page_map(self) -> PageMap:
+        return self._page_map
 
     @property
     def is_new_page(self):
         return self._is_new_page
 
-    def add_height(self, height: Length):
+    def add_height(self, height: Length, element: BaseOxmlElement | None = None):
         page = self._state.page
         self._state.add_height(height)
         self._is_new_page = self._state.page > page
+        self._page_map.add(self._state._current_height, element)
 
     def can_fit_to_page(self, height: Length):
         return height <= self._state.remaining_page_height
@@ -0,0 +1,356 @@
+"""Parser backend based on markdown-it-py, which builds the same marko elements as the marko backend.
+
+markdown-it-py is configured to follow marko: GFM tables and strikethrough, blocks of the md2gost extensions, which
+can't interrupt paragraphs, and bare urls. The tokens are converted to the marko and md2gost element classes, so
+RenderableFactory doesn't depend on the backend.
+"""
+import re
+from functools import cache
+
+import markdown_it
+from markdown_it import MarkdownIt
+from markdown_it.rules_block import heading, paragraph, reference, table
+from markdown_it.tree import SyntaxTreeNode
+from marko.block import Document as MarkoDocument
+from marko.ext.gfm.elements import Url
+
+from .extended_markdown import markdown, Caption, Equation, Heading, TOC, Reference, InlineEquation
+from .extended_markdown.table import TableRow
+from .parser_backend import ParserBackend
+
+ALIGNMENTS = {"text-align:left": "left", "text-align:right": "right", "text-align:center": "center"}
+
+_email_local_part = re.compile(r"[\w.\-+]+$")
+_task_list_item = re.compile(r"(\[[\sxX]\])\s+\S")
+
+
+def _block_rule(token_type: str, pattern: re.Pattern):
+    """A rule for a block element of the md2gost extensions, matched at the start of a line like in marko.
+
+    Parsing continues from the end of the element, so the rest of its last line starts the next block."""
+    def rule(state, start_line: int, end_line: int, silent: bool) -> bool:
+        if state.sCount[start_line] != state.blkIndent:
+            return False
+        match = pattern.match(state.src, state.bMarks[start_line] + state.tShift[start_line])
+        if not match:
+            return False
+        line = start_line
+        while line < end_line and state.eMarks[line] < match.end():
+            line += 1
+        if line >= end_line:
+            return False
+        if silent:
+            return True
+
+        token = state.push(token_type, "", 0)
+        token.meta = {"groups": match.groups()}
+        token.map = [start_line, line + 1]
+        rest = state.src[match.end():state.eMarks[line]]
+        if rest.strip():
+            indent = len(rest) - len(rest.lstrip())
+            state.bMarks[line] = match.end()
+            state.tShift[line] = indent
+            state.sCount[line] = state.blkIndent + indent
+            state.line = line
+        else:
+            state.line = line + 1
+        return True
+    return rule
+
+
+def _link_ref_def_rule(reference):
+    """Wraps the reference rule to keep the definitions as blocks, as marko does"""
+    def rule(state, start_line: int, end_line: int, silent: bool) -> bool:
+        references = state.env.setdefault("references", {})
+        state.env["references"] = {}
+        try:
+            if not reference(state, start_line, end_line, silent):
+                return False
+            new_references = state.env["references"]
+        finally:
+            state.env["references"] = references
+
+        for label, link_ref_def in new_references.items():
+            references.setdefault(label, link_ref_def)
+            token = state.push("link_ref_def", "", 0)
+            token.meta = {"label": label, **link_ref_def}
+        return True
+    return rule
+
+
+def _paragraph(paragraph):
+    """Wraps the paragraph rule to keep the trailing whitespace of the paragraph, as marko does"""
+    def rule(state, start_line: int, end_line: int, silent: bool) -> bool:
+        if not paragraph(state, start_line, end_line, silent):
+            return False
+        last_line = state.src[state.bMarks[state.line - 1]:state.eMarks[state.line - 1]]
+        state.tokens[-2].content += last_line[len(last_line.rstrip()):]
+        return True
+    return rule
+
+
+def _table(table):
+    """Wraps the table rule to mark the table as the parent, so the rules ending only tables end it"""
+    def rule(state, start_line: int, end_line: int, silent: bool) -> bool:
+        parent_type = state.parentType
+        state.parentType = "table"
+        try:
+            return table(state, start_line, end_line, silent)
+        finally:
+            state.parentType = parent_type
+    return rule
+
+
+def _ending_tables(rule):
+    """Lets the rule end tables, but not the lazy continuation lines of blockquotes, as in marko.
+
+    Both use the terminator rules of blockquotes."""
+    def wrapper(state, start_line: int, end_line: int, silent: bool) -> bool:
+        if silent and state.parentType != "table":
+            return False
+        return rule(state, start_line, end_line, silent)
+    return wrapper
+
+
+def _is_email(src: str, pos: int) -> bool:
+    """Whether the @ at pos is a part of an email, which marko parses as an url instead of a reference"""
+    local_part = _email_local_part.search(src, 0, pos)
+    if not local_part:
+        return False
+    match = Url.bare_pattern.match(src, local_part.start())
+    return match is not None and match.end() > pos
+
+
+def _inline_rule(token_type: str, pattern: re.Pattern):
+    def rule(state, silent: bool) -> bool:
+        match = pattern.match(state.src, state.pos, state.posMax)
+        if not match or token_type == "reference" and _is_email(state.src, state.pos):
+            return False
+        if not silent:
+            token = state.push(token_type, "", 0)
+            token.content = match.group(1)
+        state.pos = match.end()
+        return True
+    return rule
+
+
+def _strikethrough(state, silent: bool) -> bool:
+    """Strikethrough with one or two tildes, like in marko"""
+    match = _strikethrough_pattern.match(state.src, state.pos, state.posMax)
+    if not match:
+        return False
+    if not silent:
+        state.push("s_open", "s", 1)
+        pos_max = state.posMax
+        state.pos, state.posMax = match.start(2), match.end(2)
+        state.md.inline.tokenize(state)
+        state.posMax = pos_max
+        state.push("s_close", "s", -1)
+    state.pos = match.end()
+    return True
+
+
+_strikethrough_pattern = re.compile(r"(?<!~)(~|~~)([^~]+)\1(?!~)")
+
+
+def _inline_bodies(state) -> None:
+    """Strips the asterisks of unnumbered headings and the task list markers, as marko elements do"""
+    tokens = state.tokens
+    for i, token in enumerate(tokens):
+        if token.type == "heading_open":
+            inline = tokens[i + 1]
+            if token.markup.startswith("#"):
+                numbered, inline.content = Heading.parse_inline_body(inline.content)
+            else:
+                numbered = not (inline.content[0] == "*")
+                if not numbered:
+                    inline.content = inline.content[1:]
+            token.meta = {"numbered": numbered}
+        elif token.type == "paragraph_open":
+            inline = tokens[i + 1]
+            if m := _task_list_item.match(inline.content):
+                inline.content = inline.content[m.end(1):]
+                token.meta = {"checked": m.group(1)[1:-1].lower() == "x"}
+
+
+@cache
+def _get_markdown_it() -> MarkdownIt:
+    md = MarkdownIt("commonmark")
+    # urls are kept as they're written
+    md.normalizeLink = md.normalizeLinkText = lambda url: url
+    md.validateLink = lambda url: True
+
+    # the tables and the headings of md2gost don't interrupt paragraphs, but they and all the other blocks end tables
+    terminator = {"alt": ["blockquote"]}
+    md.block.ruler.at("table", _table(table))
+    md.block.ruler.at("paragraph", _paragraph(paragraph))
+    md.block.ruler.at("heading", _ending_tables(heading), terminator)
+    md.block.ruler.at("reference", _ending_tables(_link_ref_def_rule(reference)), terminator)
+    md.block.ruler.before("code", "equation", _ending_tables(_block_rule("equation", Equation.pattern)), terminator)
+    md.block.ruler.before("code", "caption", _ending_tables(_block_rule("caption", re.compile(Caption.pattern))),
+                          terminator)
+    md.block.ruler.before("code", "toc", _ending_tables(_block_rule("toc", re.compile(TOC.pattern))), terminator)
+    md.enable("table")
+
+    md.inline.ruler.before("strikethrough", "tilde_strikethrough", _strikethrough)
+    md.inline.ruler.before("emphasis", "inline_equation",
+                           _inline_rule("inline_equation", re.compile(InlineEquation.pattern)))
+    md.inline.ruler.before("emphasis", "reference", _inline_rule("reference", re.compile(Reference.pattern)))
+    md.core.ruler.after("block", "inline_bodies", _inline_bodies)
+    md.disable("text_join")  # entities are kept as they're written
+    return md
+
+
+@cache
+def _get_elements() -> dict[str, type]:
+    markdown.parse("")  # sets up the extensions
+    return markdown.parser.block_elements | markdown.parser.inline_elements
+
+
+def _new(name: str, **attributes):
+    element = _get_elements()[name].__new__(_get_elements()[name])
+    element.__dict__.update(attributes)
+    return element
+
+
+class _TreeBuilder:
+    """Converts the syntax tree of markdown-it to marko elements"""
+
+    def document(self, root) -> MarkoDocument:
+        return _new("Document", children=self.blocks(root.children), link_ref_defs={})
+
+    def blocks(self, nodes) -> list:
+        children = []
+        for node in nodes:
+            children.extend(getattr(self, f"_{node.type}")(node))
+        return children
+
+    def _paragraph(self, node):
+        yield _new("Paragraph", children=self.inlines(node.children[0].children), _tight=False, **node.meta)
+
+    def _heading(self, node):
+        name = "Heading" if node.markup.startswith("#") else "SetextHeading"
+        yield _new(name, level=int(node.tag[1:]), numbered=node.meta["numbered"],
+                   children=self.inlines(node.children[0].children))
+
+    def _bullet_list(self, node):
+        yield _new("List", bullet=node.markup, ordered=False, start=1, tight=True, children=self._list_items(node))
+
+    def _ordered_list(self, node):
+        yield _new("List", bullet=node.markup, ordered=True, start=int(node.attrs.get("start", 1)), tight=True,
+                   children=self._list_items(node))
+
+    def _list_items(self, node) -> list:
+        return [_new("ListItem", children=self.blocks(item.children)) for item in node.children]
+
+    def _blockquote(self, node):
+        yield _new("Quote", children=self.blocks(node.children))
+
+    def _table(self, node):
+        rows = [row for section in node.children for row in section.children]
+        table = _new("Table", _num_of_cols=len(rows[0].children), children=[])
+        for row in rows:
+            cells = [_new("TableCell", header=cell.type == "th", align=ALIGNMENTS.get(cell.attrs.get("style")),
+                          children=self.inlines(cell.children[0].children if cell.children else []))
+                     for cell in row.children]
+            table.children.append(TableRow(cells))
+        yield table
+
+    def _fence(self, node):
+        lang, _, extra = node.info.strip().partition(" ")
+        yield _new("FencedCode", lang=lang, extra=extra.strip(), children=[_new("RawText", children=node.content,
+                                                                                 escape=False)])
+
+    def _code_block(self, node):
+        yield _new("CodeBlock", lang="", extra="", children=[_new("RawText", children=node.content, escape=False)])
+
+    def _hr(self, node):
+        yield _new("ThematicBreak")
+
+    def _html_block(self, node):
+        yield _new("HTMLBlock", body=node.content)
+
+    def _link_ref_def(self, node):
+        yield _new("LinkRefDef", label=node.meta["label"], dest=node.meta.get("href", ""),
+                   title=node.meta.get("title") or None)
+
+    def _equation(self, node):
+        yield _new("Equation", latex_equation=node.meta["groups"][0].strip())
+
+    def _caption(self, node):
+        yield _new("Caption", unique_name=node.meta["groups"][0], text=node.meta["groups"][2])
+
+    def _toc(self, node):
+        yield _new("TOC")
+
+    def inlines(self, nodes, in_link: bool = False) -> list:
+        children = []
+        for node in nodes:
+            if node.type == "text" or node.type == "text_special" and node.info == "entity":
+                text = node.content if node.type == "text" else node.markup
+                if children and type(children[-1]) is _get_elements()["RawText"]:
+                    children[-1].children += text
+                else:
+                    children.append(_new("RawText", children=text, escape=True))
+            elif node.type == "text_special":
+                children.append(_new("Literal", children=node.content))
+            elif node.type in ("softbreak", "hardbreak"):
+                children.append(_new("LineBreak", soft=node.type == "softbreak", children="\n"))
+            elif node.type == "code_inline":
+                children.append(_new("CodeSpan", children=node.content))
+            elif node.type == "html_inline":
+                children.append(_new("InlineHTML", children=node.content))
+            elif node.type in ("em", "strong", "s"):
+                name = {"em": "Emphasis", "strong": "StrongEmphasis", "s": "Strikethrough"}[node.type]
+                children.append(_new(name, children=self.inlines(node.children, in_link)))
+            elif node.type == "link" and node.markup == "autolink":
+                children.append(_new("AutoLink", dest=node.attrs["href"], title="",
+                                     children=[_new("RawText", children=node.children[0].content, escape=True)]))
+            elif node.type == "link":
+                children.append(_new("Link", dest=node.attrs["href"], title=node.attrs.get("title"),
+                                     children=self.inlines(node.children, True)))
+            elif node.type == "image":
+                image = _new("Image", dest=node.attrs["src"], title=node.attrs.get("title"),
+                             children=self.inlines(node.children, True))
+                image.parse_title()
+                children.append(image)
+            elif node.type == "reference":
+                children.append(_new("Reference", unique_name=node.content))
+            elif node.type == "inline_equation":
+                children.append(_new("InlineEquation", latex_equation=node.content))
+            else:
+                raise ValueError(f"Unknown markdown-it node: {node.type}")
+        return children if in_link else self._find_urls(children)
+
+    @staticmethod
+    def _find_urls(children: list) -> list:
+        """Splits the bare urls and emails out of the text, as the GFM extension of marko does"""
+        result = []
+        for child in children:
+            if type(child) is not _get_elements()["RawText"]:
+                result.append(child)
+                continue
+            text, pos = child.children, 0
+            for match in sorted(Url.find(text, source=None), key=lambda m: m.start()):
+                if match.start() < pos:
+                    continue
+                if match.start() > pos:
+                    result.append(_new("RawText", children=text[pos:match.start()], escape=True))
+                result.append(Url(match))
+                pos = match.end()
+            if pos < len(text):
+                result.append(_new("RawText", children=text[pos:], escape=True))
+        return result
+
+
+class MarkdownItBackend(ParserBackend):
+    """A faster parser, markdown-it-py with rules for the md2gost extensions"""
+
+    name = "markdown-it"
+
+    @property
+    def version(self) -> str:
+        return markdown_it.__version__
+
+    def parse(self, text: str) -> MarkoDocument:
+        return _TreeBuilder().document(SyntaxTreeNode(_get_markdown_it().parse(text)))
@@ -1,5 +1,6 @@
 import logging
 from collections import defaultdict
+from collections.abc import Generator, Iterable
 
 from .renderable import Renderable, Paragraph
 from .renderable.requires_numbering import RequiresNumbering
@@ -8,24 +9,50 @@ from .renderable.requires_numbering import RequiresNumbering
 class NumberingPreProcessor:
     def __init__(self):
         self._categories: dict[str, int] = defaultdict(lambda: 0)
+        self._numbers: dict[str, int] = defaultdict(lambda: 0)
         self._reference_data: dict[str, int] = dict()
+        self.warnings = 0
 
     def process(self, renderables: list[Renderable]):
         for requires_numbering in filter(lambda x: isinstance(x, RequiresNumbering), renderables):
-            requires_numbering.set_number(self._categories[requires_numbering.numbering_category] + 1)
-            self._categories[requires_numbering.numbering_category] += 1
-
-            if not requires_numbering.numbering_unique_name:
-                continue
-
-            if requires_numbering.numbering_unique_name in self._reference_data:
-                logging.getLogger("md2gost").warning(f"Дублирование названия подписи: {requires_numbering.numbering_unique_name}. Ссылки будут созданы некорректно")
-            self._reference_data[requires_numbering.numbering_unique_name] =\
-                self._categories[requires_numbering.numbering_category]
-
-        for paragraph in filter(lambda x: isinstance(x, Paragraph), renderables):
-            for reference in paragraph.references:
-                if reference.unique_name in self._reference_data:
-                    reference.set_number(self._reference_data[reference.unique_name])
-                else:
-                    logging.getLogger("md2gost").warning(f"Неверная ссылка: {reference.unique_name} не существует")
+            self.add_name(requires_numbering.numbering_category, requires_numbering.numbering_unique_name)
+
+        for renderable in renderables:
+            self.number(renderable)
+
+    def add_name(self, category: str, unique_name: str | None):
+        """Counts a numbered element, so the references to it can be resolved before it's created"""
+        self._categories[category] += 1
+
+        if not unique_name:
+            return
+
+        if unique_name in self._reference_data:
+            self.warnings += 1
+            logging.getLogger("md2gost").warning(f"Дублирование названия подписи: {unique_name}. Ссылки будут созданы некорректно")
+        self._reference_data[unique_name] = self._categories[category]
+
+    def number(self, renderable: Renderable):
+        """Numbers the element and resolves its references, names of all elements must be added before"""
+        if isinstance(renderable, RequiresNumbering):
+            self._numbers[renderable.numbering_category] += 1
+            renderable.set_number(self._numbers[renderable.numbering_category])
+
+        if isinstance(renderable, Paragraph):
+            for reference in renderable.references:
+                if (number := self.resolve(reference.unique_name)) is not None:
+                    reference.set_number(number)
+
+    def resolve(self, unique_name: str) -> int | None:
+        """Returns the number of the referenced element, None if it doesn't exist"""
+        if unique_name in self._reference_data:
+            return self._reference_data[unique_name]
+        self.warnings += 1
+        logging.getLogger("md2gost").warning(f"Неверная ссылка: {unique_name} не существует")
+        return None
+
+    def number_all(self, renderables: Iterable[Renderable]) -> Generator[Renderable, None, None]:
+        """Numbers the elements as they are iterated, names of all elements must be added before"""
+        for renderable in renderables:
+            self.number(renderable)
+            yield renderable
@@ -0,0 +1,103 @@
+from array import array
+
+# block flags
+PAGE_BREAK_BEFORE = 1
+KEEP_WITH_NEXT = 2  # the block isn't split and goes to the next page with three lines after it
+KEEP_TOGETHER = 4  # the block isn't split, it goes to the next page if it doesn't fit
+
+KEPT_LINES = 3
+
+
+class BlockArray:
+    """Blocks of lines laid out one after another, stored column-wise in arrays"""
+    __slots__ = ("before", "lines", "line_height", "line_spacing", "after", "flags")
+
+    def __init__(self):
+        self.before = array("d")
+        self.lines = array("q")
+        self.line_height = array("d")
+        self.line_spacing = array("d")
+        self.after = array("d")
+        self.flags = array("B")
+
+    def __len__(self):
+        return len(self.lines)
+
+    def append(self, before: float, lines: int, line_height: float, line_spacing: float, after: float,
+               flags: int = 0):
+        self.before.append(before)
+        self.lines.append(lines)
+        self.line_height.append(line_height)
+        self.line_spacing.append(line_spacing)
+        self.after.append(after)
+        self.flags.append(flags)
+
+
+def lines_height(before: float, lines: int, line_height: float, line_spacing: float) -> float:
+    """Returns height of the lines from the top of the block to the base of the last line"""
+    return before + ((lines - 1) * line_spacing + 1) * line_height
+
+
+def fitting_lines(before: float, lines: int, line_height: float, line_spacing: float, height: float) -> int:
+    """Returns how many lines of the block fit the height"""
+    if before + line_height > height:
+        return 0
+    fitting = min(lines, int((height - before - line_height) / (line_spacing * line_height)) + 1)
+    # correct the float rounding, so the result is same as comparing heights of lines
+    while fitting < lines and lines_height(before, fitting + 1, line_height, line_spacing) <= height:
+        fitting += 1
+    while fitting > 0 and lines_height(before, fitting, line_height, line_spacing) > height:
+        fitting -= 1
+    return fitting
+
+
+def paginate(blocks: BlockArray, page_height: int, height: int) -> tuple[array, array]:
+    """Lays out the blocks from the document height.
+
+    Returns heights of the blocks, which include the rest of the page if a block or its part goes to the next page,
+    and whether each block with KEEP_WITH_NEXT was moved to the next page.
+    """
+    heights = array("q")
+    moved = array("B")
+    for before, lines, line_height, line_spacing, after, flags in zip(
+            blocks.before, blocks.lines, blocks.line_height, blocks.line_spacing, blocks.after, blocks.flags):
+        remaining = page_height - height % page_height
+
+        if flags & KEEP_WITH_NEXT:
+            if height % page_height == 0 and height >= page_height:
+                before = 0
+            full = int(before + line_height * line_spacing * lines + after)
+
+            block_moved = ((lines + KEPT_LINES - 1) * line_spacing + 1) * line_height > remaining
+            block_height = full - before if block_moved else full
+            if block_moved or flags & PAGE_BREAK_BEFORE:
+                block_height += remaining
+            moved.append(block_moved)
+        else:
+            position = height + remaining if flags & PAGE_BREAK_BEFORE else height
+            position_remaining = page_height - position % page_height
+            if position % page_height == 0 and position >= page_height:
+                before = 0
+            full = int(before + line_height * line_spacing * lines + after)
+
+            fitting = fitting_lines(before, lines, line_height, line_spacing, position_remaining)
+            if fitting == lines:
+                # the whole block fits the page
+                block_height = min(full, position_remaining)
+            elif fitting <= 1 or flags & KEEP_TOGETHER or (lines - fitting == 1 and lines == 3):
+                # if no or only one line fits the page, or the block isn't splittable, it goes to the next page
+                block_height = position_remaining + full
+            elif lines - fitting == 1:
+                # if all lines except the last fit the page, the last two lines go to the next page
+                block_height = position_remaining + before + line_height * line_spacing * 2 + after
+            else:
+                block_height = position_remaining + before + line_height * line_spacing * (lines - fitting) + after
+
+            if flags & PAGE_BREAK_BEFORE:
+                block_height += remaining
+            moved.append(False)
+
+        heights.append(int(block_height))
+        height += int(block_height)
+
+    return heights, moved
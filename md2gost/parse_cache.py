@@ -0,0 +1,102 @@
+"""Parsed markdown files stored on disk by their content, so unchanged files aren't parsed again.
+
+Entries are keyed by a hash of the text, the parser backend and the parser version (md2gost version and sources of
+the markdown extensions and backends), the least recently used ones are removed when the cache exceeds its size.
+"""
+import logging
+import os
+import pickle
+import zlib
+from functools import cache
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version
+
+from marko.block import Document as MarkoDocument
+
+from .parser_backend import ParserBackend, MarkoBackend
+
+CACHE_VERSION = 1
+
+MAX_CACHE_SIZE = 64 * 1024 * 1024
+
+
+def get_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "md2gost", "parsed")
+
+
+@cache
+def get_parser_version() -> bytes:
+    """Returns a digest of everything the parsed tree depends on besides the text"""
+    try:
+        md2gost_version = version("md2gost")
+    except PackageNotFoundError:
+        md2gost_version = None
+
+    digest = blake2b(repr((CACHE_VERSION, md2gost_version)).encode())
+    package_dir = os.path.dirname(__file__)
+    extensions_dir = os.path.join(package_dir, "extended_markdown")
+    paths = [os.path.join(extensions_dir, name) for name in sorted(os.listdir(extensions_dir)) if name.endswith(".py")]
+    paths += [os.path.join(package_dir, name) for name in ("parser_backend.py", "markdown_it_backend.py")]
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+class ParseCache:
+    def __init__(self, directory: str, max_size: int = MAX_CACHE_SIZE, parser_version: bytes | None = None):
+        self._directory = directory
+        self._max_size = max_size
+        self._parser_version = parser_version or get_parser_version()
+        self.hits = 0
+
+    def _get_path(self, text: str, backend: ParserBackend) -> str:
+        digest = blake2b(self._parser_version)
+        digest.update(f"{backend.name} {backend.version}".encode())
+        digest.update(text.encode("utf-8"))
+        return os.path.join(self._directory, f"{digest.hexdigest()}.pickle")
+
+    def get(self, text: str, backend: ParserBackend = MarkoBackend()) -> MarkoDocument | None:
+        """Returns the text parsed by the backend, None if it isn't cached"""
+        path = self._get_path(text, backend)
+        try:
+            with open(path, "rb") as f:
+                parsed = pickle.loads(zlib.decompress(f.read()))
+            os.utime(path)  # the modification time is the last use for eviction
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            logging.getLogger("md2gost").debug(f"Can't read parsed file from {path}")
+            return None
+        self.hits += 1
+        return parsed
+
+    def put(self, text: str, parsed: MarkoDocument, backend: ParserBackend = MarkoBackend()):
+        path = self._get_path(text, backend)
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}"
+            with open(temp_path, "wb") as f:
+                f.write(zlib.compress(pickle.dumps(parsed, pickle.HIGHEST_PROTOCOL), 1))
+            os.replace(temp_path, path)
+        except OSError:
+            logging.getLogger("md2gost").debug(f"Can't save parsed file to {path}")
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits its size"""
+        try:
+            entries = [entry for entry in os.scandir(self._directory) if entry.name.endswith(".pickle")]
+            stats = sorted(((entry.stat(), entry.path) for entry in entries), key=lambda x: x[0].st_mtime_ns)
+        except OSError:
+            return
+
+        size = sum(stat.st_size for stat, _ in stats)
+        for stat, path in stats:
+            if size <= self._max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= stat.st_size
@@ -1,13 +1,18 @@
+import logging
 import os
 from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 
 from docx import Document
 from marko.block import BlankLine, Paragraph, CodeBlock, FencedCode, \
-    BlockElement
+    BlockElement, Document as MarkoDocument
 from marko.inline import Image
 
-from .extended_markdown import markdown, Caption
+from .extended_markdown import Caption, Heading, SetextHeading, TOC
+from .numberer import NumberingPreProcessor
+from .parse_cache import ParseCache
+from .parser_backend import ParserBackend, MarkoBackend
 from .renderable.caption import CaptionInfo
 from .renderable.renderable import Renderable
 from .renderable_factory import RenderableFactory
@@ -16,12 +21,20 @@ from .renderable_factory import RenderableFactory
 class Parser:
     """Parses given markdown string and returns Renderable elements"""
 
-    def __init__(self, document: Document, filebuffer: dict[str, BytesIO]):
+    def __init__(self, document: Document, filebuffer: dict[str, BytesIO], streaming: bool = False,
+                 parse_cache: ParseCache | None = None, backend: ParserBackend | None = None):
         self._document = document
+        self._parse_cache = parse_cache
+        self._backend = backend or MarkoBackend()
         self._renderables = []
         self._factory = RenderableFactory(self._document._body, filebuffer)
         self._caption_info: CaptionInfo | None = None
 
+        # in the streaming mode blocks are kept with their captions and created one at a time when rendered
+        self._streaming = streaming
+        self._blocks: list[tuple[BlockElement, CaptionInfo | None] | None] = []
+        self._prescanned: dict[int, list[Renderable]] = {}
+
     @staticmethod
     def resolve_paths(marko_element: BlockElement, relative_dir_path: str):
         """Resolves relative paths in Marko elements"""
@@ -37,7 +50,37 @@ class Parser:
                 relative_dir_path, os.path.expanduser(marko_element.extra))
 
     def parse(self, text, relative_dir_path: str) -> None:
-        marko_parsed = markdown.parse(text)
+        self._add(self._backend.parse(text), relative_dir_path)
+
+    def parse_many(self, texts: list[tuple[str, str]], jobs: int = 1) -> None:
+        """Parses (text, relative_dir_path) of several files, in a process pool if jobs > 1.
+
+        Files found in the parse cache aren't parsed. The markdown is parsed in parallel, while the renderables are
+        created in the order of the files, so a caption at the end of a file applies to the first element of the next
+        one, as in sequential parsing.
+        """
+        parsed = [self._parse_cache.get(text, self._backend) if self._parse_cache else None for text, _ in texts]
+        missing = [i for i, marko_parsed in enumerate(parsed) if marko_parsed is None]
+        if self._parse_cache:
+            logging.getLogger("md2gost").debug(f"Parse cache: {len(texts) - len(missing)} of {len(texts)} files")
+
+        if jobs > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(min(jobs, len(missing))) as executor:
+                for i, marko_parsed in zip(missing, executor.map(self._backend.parse, [texts[i][0] for i in missing])):
+                    parsed[i] = marko_parsed
+        else:
+            for i in missing:
+                parsed[i] = self._backend.parse(texts[i][0])
+
+        if self._parse_cache and missing:
+            for i in missing:
+                self._parse_cache.put(texts[i][0], parsed[i], self._backend)
+            self._parse_cache.evict()
+
+        for marko_parsed, (_, relative_dir_path) in zip(parsed, texts):
+            self._add(marko_parsed, relative_dir_path)
+
+    def _add(self, marko_parsed: MarkoDocument, relative_dir_path: str) -> None:
         for marko_element in marko_parsed.children:
             # self.resolve_paths(marko_element, relative_dir_path)
 
@@ -49,9 +92,37 @@ class Parser:
                     CaptionInfo(marko_element.unique_name, marko_element.text)
                 continue
 
-            for renderable in self._factory.create(marko_element, self._caption_info):
-                self._renderables.append(renderable)
+            if self._streaming:
+                self._blocks.append((marko_element, self._caption_info))
+            else:
+                for renderable in self._factory.create(marko_element, self._caption_info):
+                    self._renderables.append(renderable)
             self._caption_info = None
 
     def get_rendered(self) -> list[Renderable]:
         return self._renderables
+
+    def prescan(self, numbering: NumberingPreProcessor) -> list[Renderable]:
+        """Adds names of the numbered elements of the blocks to the numbering, so forward references can be resolved,
+        and creates the tables of contents and the headings, which are needed before rendering. Streaming mode only.
+
+        Returns the created renderables, iter_rendered returns the same ones in their places.
+        """
+        renderables = []
+        for i, (marko_element, caption_info) in enumerate(self._blocks):
+            for category, unique_name in self._factory.get_numbered_names(marko_element, caption_info):
+                numbering.add_name(category, unique_name)
+
+            if isinstance(marko_element, (Heading, SetextHeading, TOC)):
+                self._prescanned[i] = list(self._factory.create(marko_element, caption_info))
+                renderables.extend(self._prescanned[i])
+        return renderables
+
+    def iter_rendered(self) -> Generator[Renderable, None, None]:
+        """Creates renderables of the blocks one at a time and releases the blocks. Streaming mode only"""
+        for i in range(len(self._blocks)):
+            marko_element, caption_info = self._blocks[i]
+            self._blocks[i] = None
+            prescanned = self._prescanned.pop(i, None)
+            yield from prescanned if prescanned is not None else self._factory.create(marko_element, caption_info)
+        self._blocks.clear()
@@ -0,0 +1,50 @@
+"""Markdown parsers building the marko element trees RenderableFactory creates renderables from"""
+from abc import ABC, abstractmethod
+
+import marko
+from marko.block import Document as MarkoDocument
+
+from .extended_markdown import markdown
+
+
+class ParserBackend(ABC):
+    """Parses markdown text into a marko Document with the md2gost extensions.
+
+    The backend and the parsed trees must be picklable, so files can be parsed in worker processes and cached."""
+
+    name: str
+
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        """Version of the underlying parser, a part of the parse cache key"""
+
+    @abstractmethod
+    def parse(self, text: str) -> MarkoDocument:
+        pass
+
+
+class MarkoBackend(ParserBackend):
+    """The reference parser, marko with GFM and md2gost extensions"""
+
+    name = "marko"
+
+    @property
+    def version(self) -> str:
+        return marko.__version__
+
+    def parse(self, text: str) -> MarkoDocument:
+        return markdown.parse(text)
+
+
+PARSER_BACKENDS = ("marko", "markdown-it")
+
+
+def get_parser_backend(name: str) -> ParserBackend:
+    if name == "marko":
+        return MarkoBackend()
+    if name == "markdown-it":
+        # raises ImportError if markdown-it-py, an optional dependency, isn't installed
+        from .markdown_it_backend import MarkdownItBackend
+        return MarkdownItBackend()
+    raise ValueError(f"Unknown parser backend: {name}")
@@ -0,0 +1,39 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from docx.shared import Length
+
+from .renderable import Renderable
+from .renderable.paragraph_sizer import ParagraphSizer, measure_texts, word_width_cache
+
+CHUNK_SIZE = 2048
+
+
+class PreMeasurer:
+    """Measures words of all paragraphs in a process pool before rendering, so the renderer finds them cached"""
+
+    def __init__(self, jobs: int):
+        self._jobs = jobs
+
+    def process(self, renderables: list[Renderable]):
+        paragraphs = [paragraph for renderable in renderables for paragraph in renderable.get_sized_paragraphs()]
+
+        chunks: list[tuple[tuple, list[str]]] = []
+        for face_key, texts in ParagraphSizer.get_texts_to_measure(paragraphs).items():
+            missing = word_width_cache.get_missing(face_key, sorted(texts))
+            chunks.extend((face_key, missing[i:i + CHUNK_SIZE]) for i in range(0, len(missing), CHUNK_SIZE))
+        if not chunks:
+            return
+
+        # the measured words must not be evicted before rendering, the caller restores the bound after it
+        words = sum(len(texts) for _, texts in chunks)
+        cache_info = word_width_cache.info()
+        if cache_info.currsize + words > cache_info.maxsize:
+            word_width_cache.maxsize = cache_info.currsize + words
+
+        with ProcessPoolExecutor(min(self._jobs, len(chunks))) as executor:
+            for (face_key, texts), widths in zip(chunks, executor.map(measure_texts, *zip(*chunks))):
+                word_width_cache.put_widths(face_key, texts, [Length(width) for width in widths])
+
+        logging.getLogger("md2gost").debug(
+            f"Pre-measured {words} words of {len(paragraphs)} paragraphs with {self._jobs} processes")
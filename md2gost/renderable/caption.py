@@ -3,16 +3,18 @@ from dataclasses import dataclass
 from typing import Generator
 from uuid import uuid4
 
-from docx.shared import Parented, Cm
+from docx.shared import Parented, Cm, Length
 from docx.text.paragraph import Paragraph as DocxParagraph
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.table import Table
 
 from ..layout_tracker import LayoutState
+from ..pagination import BlockArray, KEEP_WITH_NEXT, PAGE_BREAK_BEFORE, paginate
 from .renderable import Renderable
 from ..rendered_info import RenderedInfo
 from .paragraph_sizer import ParagraphSizer
-from ..util import create_element
+from .. import element_templates
+from ..style_resolver import get_style_resolver
 
 
 @dataclass
@@ -26,27 +28,23 @@ class Caption(Renderable):
                  number: int = None, before=True):
         self._parent = parent
         self._before = before
-        self._docx_paragraph = DocxParagraph(create_element("w:p"), parent)
+        p = element_templates.paragraph(get_style_resolver(parent.part.document).style_id("Caption"))
+        self._docx_paragraph = DocxParagraph(p, parent)
 
         uid = uuid4().hex
+        bookmark_start, bookmark_end = element_templates.bookmark(uid, caption_info.unique_name) \
+            if caption_info and caption_info.unique_name else (None, None)
 
-        self._docx_paragraph.style = "Caption"
-        self._docx_paragraph.add_run(f"{category} ")
-        if caption_info and caption_info.unique_name:
-            self._docx_paragraph._p.append(create_element("w:bookmarkStart", {
-                "w:id": uid,
-                "w:name": caption_info.unique_name
-            }))
-        self._numbering_run = create_element("w:r", str(number) if number else "?")
-        self._docx_paragraph._p.append(create_element("w:fldSimple", {
-                    "w:instr": f"SEQ {category} \\* ARABIC"
-                }, [self._numbering_run]))
-        if caption_info and caption_info.unique_name:
-            self._docx_paragraph._p.append(create_element("w:bookmarkEnd", {
-                "w:id": uid
-            }))
+        p.append(element_templates.run(f"{category} "))
+        if bookmark_start is not None:
+            p.append(bookmark_start)
+        numbering = element_templates.simple_field(f"SEQ {category} \\* ARABIC", str(number) if number else "?")
+        self._numbering_run = numbering[0]
+        p.append(numbering)
+        if bookmark_end is not None:
+            p.append(bookmark_end)
         if caption_info and caption_info.text:
-            self._docx_paragraph.add_run(f" - {caption_info.text}")
+            p.append(element_templates.run(f" - {caption_info.text}"))
 
     def center(self):
         self._docx_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -66,19 +64,19 @@ class Caption(Renderable):
             layout_state.max_width
         ).calculate_height()
 
-        # if three more lines don't fit, move it to the next page (so there is no only caption on the end of the page)
-        if self._before and ((height_data.lines + 3 - 1) * height_data.line_spacing + 1) * height_data.line_height \
-                > layout_state.remaining_page_height:
+        page_break_before = self._docx_paragraph.paragraph_format.page_break_before
+        if not self._before:
+            # a caption after an image stays with it and is not split
+            yield RenderedInfo(self._docx_paragraph, height_data.full +
+                               (layout_state.remaining_page_height if page_break_before else 0))
+            return
+
+        # if three more lines don't fit, it goes to the next page (so there is no only caption on the end of the page)
+        blocks = BlockArray()
+        height_data.to_block(blocks, KEEP_WITH_NEXT | (PAGE_BREAK_BEFORE if page_break_before else 0))
+        (height,), (moved,) = paginate(blocks, layout_state.max_height, layout_state.current_height)
+        if moved:
             self._docx_paragraph.paragraph_format.page_break_before = True
             self._docx_paragraph.paragraph_format.space_before = None
-            height_data = ParagraphSizer(
-                self._docx_paragraph,
-                None,
-                layout_state.max_width
-            ).calculate_height()
 
-        yield RenderedInfo(
-            self._docx_paragraph,
-            height_data.full +
-            (layout_state.remaining_page_height
-                if self._docx_paragraph.paragraph_format.page_break_before else 0))
+        yield RenderedInfo(self._docx_paragraph, Length(height))
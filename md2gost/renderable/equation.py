@@ -11,23 +11,24 @@ from .requires_numbering import RequiresNumbering
 from ..layout_tracker import LayoutState
 from ..renderable import Renderable
 from ..rendered_info import RenderedInfo
-from ..util import create_element
+from .. import element_templates
 from ..latex_math import latex_to_omml
+from ..style_resolver import get_style_resolver
 
 
 _HEIGHT = Pt(50)
 
 
 class Equation(Renderable, RequiresNumbering):
+    NUMBERING_CATEGORY = "Формула"
+
     def __init__(self, parent, latex_formula: str, caption_info: CaptionInfo):
-        super().__init__("Формула", caption_info.unique_name if caption_info else None)
+        super().__init__(self.NUMBERING_CATEGORY, caption_info.unique_name if caption_info else None)
         word_math = latex_to_omml(latex_formula)
 
         sect = parent.part.document.sections[-1]
 
-        # todo: style inheritance
-        left_margin = Twips(int(parent.part.styles["Normal Table"]._element.xpath("w:tblPr/w:tblCellMar/w:left")[0].attrib["{http://schemas.openxmlformats.org/wordprocessingml/2006/main}w"]))
-        right_margin = Twips(int(parent.part.styles["Normal Table"]._element.xpath("w:tblPr/w:tblCellMar/w:right")[0].attrib["{http://schemas.openxmlformats.org/wordprocessingml/2006/main}w"]))
+        left_margin, right_margin = get_style_resolver(parent.part.document).table_cell_margins("Normal Table")
 
         table_width = sect.page_width - sect.right_margin - sect.left_margin + left_margin + right_margin
 
@@ -50,22 +51,17 @@ class Equation(Renderable, RequiresNumbering):
 
         right_paragraph = right_cell.paragraphs[0]
         right_paragraph.style = "Formula Numbering"
-        right_paragraph._p.append(create_element("w:r", "("))
-        if caption_info and caption_info.unique_name:
-            right_paragraph._p.append(create_element("w:bookmarkStart", {
-                "w:id": uid,
-                "w:name": caption_info.unique_name
-            }))
-        self._numbering_run = create_element("w:r", "?")
-        right_paragraph._p.append(
-            create_element("w:fldSimple", {
-                "w:instr": f"SEQ Формула \\* ARABIC"
-            }, [self._numbering_run]))
-        if caption_info and caption_info.unique_name:
-            right_paragraph._p.append(create_element("w:bookmarkEnd", {
-                "w:id": uid
-            }))
-        right_paragraph._p.append(create_element("w:r", ")"))
+        bookmark_start, bookmark_end = element_templates.bookmark(uid, caption_info.unique_name) \
+            if caption_info and caption_info.unique_name else (None, None)
+        right_paragraph._p.append(element_templates.run("("))
+        if bookmark_start is not None:
+            right_paragraph._p.append(bookmark_start)
+        numbering = element_templates.simple_field(f"SEQ Формула \\* ARABIC", "?")
+        self._numbering_run = numbering[0]
+        right_paragraph._p.append(numbering)
+        if bookmark_end is not None:
+            right_paragraph._p.append(bookmark_end)
+        right_paragraph._p.append(element_templates.run(")"))
         right_cell.vertical_alignment = \
             WD_CELL_VERTICAL_ALIGNMENT.CENTER
 
@@ -1,28 +1,14 @@
-from sys import platform, exit
-import subprocess
-import logging
+from sys import platform
 from functools import cache
 
+from .font_index import get_font_index
 
-def __find_font_linux(name: str, bold: bool, italic: bool):
-    result = subprocess.run(
-        "fc-list", shell=True, check=True, stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE, text=True)
-
-    if result.returncode == 0:
-        fonts = \
-            [line.split(":") for line in result.stdout.strip().split("\n")]
-        fonts = [font for font in fonts if len(font) == 3]
-    else:
-        logging.getLogger("md2gost").log(logging.ERROR, "fc-list not found")
-        exit(1)
 
-    for path, names, styles in fonts:
-        if (name in names
-                and ("Bold" in styles) == bool(bold)
-                and ("Italic" in styles) == bool(italic)):
-            return path
-    raise ValueError(f"Font {name} not found")
+def __find_font_linux(name: str, bold: bool, italic: bool):
+    path = get_font_index().find(name, bold, italic)
+    if path is None:
+        raise ValueError(f"Font {name} not found")
+    return path
 
 
 @cache
@@ -0,0 +1,175 @@
+"""Index of installed fonts by family and style, read from the font files.
+
+The index is stored on disk and rebuilt only when a font directory changes
+(its mtime), so looking a font up doesn't scan the font directories.
+"""
+import json
+import logging
+import os
+import struct
+from functools import cache
+
+INDEX_VERSION = 1
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".otc")
+
+# name ids of the family and style names, typographic ones included
+_FAMILY_NAME_IDS = (1, 16)
+_STYLE_NAME_IDS = (2, 17)
+
+
+def get_font_dirs() -> list[str]:
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return [os.path.join(data_dir, "fonts") for data_dir in data_dirs.split(":") if data_dir] + \
+        [os.path.join(data_home, "fonts"), os.path.expanduser("~/.fonts")]
+
+
+def get_index_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "md2gost", "font_index.json")
+
+
+def _decode_name(platform_id: int, data: bytes) -> str:
+    if platform_id == 1:  # macintosh
+        return data.decode("mac_roman", "replace")
+    return data.decode("utf-16-be", "replace")
+
+
+def _read_sfnt_names(data: bytes, offset: int) -> tuple[set[str], set[str]]:
+    """Returns family and style names of the font at the offset"""
+    tables_count, = struct.unpack_from(">H", data, offset + 4)
+    for i in range(tables_count):
+        tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, offset + 12 + 16 * i)
+        if tag == b"name":
+            break
+    else:
+        return set(), set()
+
+    _, count, strings_offset = struct.unpack_from(">HHH", data, table_offset)
+    families, styles = set(), set()
+    for i in range(count):
+        platform_id, _, _, name_id, length, name_offset = \
+            struct.unpack_from(">HHHHHH", data, table_offset + 6 + 12 * i)
+        if name_id not in _FAMILY_NAME_IDS + _STYLE_NAME_IDS:
+            continue
+        start = table_offset + strings_offset + name_offset
+        name = _decode_name(platform_id, data[start:start + length]).strip()
+        if name:
+            (families if name_id in _FAMILY_NAME_IDS else styles).add(name)
+    return families, styles
+
+
+def read_font_names(path: str) -> list[tuple[set[str], set[str]]]:
+    """Returns family and style names of every font in the file"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if data[:4] == b"ttcf":
+        fonts_count, = struct.unpack_from(">I", data, 8)
+        offsets = struct.unpack_from(f">{fonts_count}I", data, 12)
+    else:
+        offsets = (0,)
+    return [_read_sfnt_names(data, offset) for offset in offsets]
+
+
+class FontIndex:
+    """Maps (family, bold, italic) to font paths"""
+
+    def __init__(self, font_dirs: list[str], index_path: str | None):
+        self._font_dirs = font_dirs
+        self._index_path = index_path
+        self._fonts: list[tuple[str, list[str], list[str]]] = []
+        self._dirs: dict[str, int] = {}
+        self._paths: dict[tuple[str, bool, bool], str] = {}
+
+        if not self._load():
+            self._scan()
+            self._save()
+
+        for path, families, styles in self._fonts:
+            bold = any("Bold" in style for style in styles)
+            italic = any("Italic" in style for style in styles)
+            for family in families:
+                self._paths.setdefault((family.casefold(), bold, italic), path)
+
+    def _get_mtimes(self, dirs) -> dict[str, int]:
+        mtimes = {}
+        for font_dir in dirs:
+            try:
+                mtimes[font_dir] = os.stat(font_dir).st_mtime_ns
+            except OSError:
+                mtimes[font_dir] = -1
+        return mtimes
+
+    def _load(self) -> bool:
+        """Loads the stored index, returns False if it's missing or outdated"""
+        if not self._index_path:
+            return False
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if index.get("version") != INDEX_VERSION or index.get("font_dirs") != self._font_dirs \
+                or self._get_mtimes(index["dirs"]) != index["dirs"]:
+            logging.getLogger("md2gost").debug("Font index is outdated")
+            return False
+
+        self._dirs = index["dirs"]
+        self._fonts = [tuple(font) for font in index["fonts"]]
+        return True
+
+    def _scan(self):
+        dirs = []
+        for font_dir in self._font_dirs:
+            dirs.append(font_dir)
+            for root, subdirs, files in os.walk(font_dir):
+                subdirs.sort()
+                dirs.extend(os.path.join(root, subdir) for subdir in subdirs)
+                for file in sorted(files):
+                    if not file.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, file)
+                    try:
+                        names = read_font_names(path)
+                    except (OSError, struct.error):
+                        logging.getLogger("md2gost").debug(f"Can't read font {path}")
+                        continue
+                    for families, styles in names:
+                        self._fonts.append((path, sorted(families), sorted(styles)))
+        self._dirs = self._get_mtimes(dirs)
+
+    def _save(self):
+        if not self._index_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._index_path), exist_ok=True)
+            temp_path = f"{self._index_path}.{os.getpid()}"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "font_dirs": self._font_dirs,
+                    "dirs": self._dirs,
+                    "fonts": self._fonts,
+                }, f, ensure_ascii=False)
+            os.replace(temp_path, self._index_path)
+        except OSError:
+            logging.getLogger("md2gost").debug(f"Can't save font index to {self._index_path}")
+
+    def find(self, name: str, bold: bool, italic: bool) -> str | None:
+        path = self._paths.get((name.casefold(), bool(bold), bool(italic)))
+        if path is None:
+            # names like "Courier" may be a part of the family name
+            for path_, families, styles in self._fonts:
+                if any(name in family for family in families) \
+                        and any("Bold" in style for style in styles) == bool(bold) \
+                        and any("Italic" in style for style in styles) == bool(italic):
+                    return path_
+        return path
+
+
+@cache
+def get_font_index() -> FontIndex:
+    return FontIndex(get_font_dirs(), get_index_path())
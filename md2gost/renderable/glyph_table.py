@@ -0,0 +1,152 @@
+from threading import Lock
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from freetype import Face
+
+_BLOCK_BITS = 7
+_BLOCK_SIZE = 1 << _BLOCK_BITS
+_BLOCKS_COUNT = 0x110000 >> _BLOCK_BITS
+
+
+def _pixel(values):
+    """Rounds 26.6 values to whole pixels (same as PIXEL() in Pillow)"""
+    return (values + 32) >> 6
+
+
+class GlyphTable:
+    """Glyph advances and kerning pairs of a face for bulk text measuring.
+
+    Metrics are loaded lazily for every Unicode block (128 code points) that is
+    met in the measured text. Widths are computed the same way as Pillow's
+    textbbox with the basic layout: the pen line and glyph boxes, where kerning
+    is added to advances in pixels (as Pillow does).
+
+    Pillow built with libraqm uses the raqm layout by default, which shapes text
+    with HarfBuzz (GPOS kerning, ligatures), so widths can differ from its
+    default textbbox there, and page breaks can move compared with measuring
+    through Pillow."""
+
+    def __init__(self, face: "Face"):
+        self._face = face
+        self._has_kerning = face.has_kerning
+        self._lock = Lock()
+
+        # row of each unicode block in the metric tables, -1 if not loaded yet
+        self._block_rows = np.full(_BLOCKS_COUNT, -1, dtype=np.int64)
+        self._indexes = np.zeros((0, _BLOCK_SIZE), dtype=np.int64)
+        self._advances = np.zeros((0, _BLOCK_SIZE), dtype=np.int64)
+        self._ink_left = np.zeros((0, _BLOCK_SIZE), dtype=np.int64)
+        self._ink_right = np.zeros((0, _BLOCK_SIZE), dtype=np.int64)
+
+        # sorted (left glyph << 32 | right glyph) keys and their kerning, replaced together as readers don't lock
+        self._kerning = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def _load_blocks(self, blocks):
+        from freetype import FT_LOAD_DEFAULT
+
+        with self._lock:
+            blocks = blocks[self._block_rows[blocks] < 0]
+            if not len(blocks):
+                return
+
+            shape = (len(blocks), _BLOCK_SIZE)
+            indexes, advances = np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=np.int64)
+            ink_left, ink_right = np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=np.int64)
+            for row, block in enumerate(blocks.tolist()):
+                for col in range(_BLOCK_SIZE):
+                    code = (block << _BLOCK_BITS) | col
+                    if 0xD800 <= code <= 0xDFFF:  # surrogates can't be encoded
+                        index = 0
+                    else:
+                        index = self._face.get_char_index(code)
+                    self._face.load_glyph(index, FT_LOAD_DEFAULT)
+                    metrics = self._face.glyph.metrics
+                    indexes[row, col] = index
+                    advances[row, col] = metrics.horiAdvance
+                    ink_left[row, col] = metrics.horiBearingX >> 6
+                    ink_right[row, col] = (metrics.horiBearingX + metrics.width + 63) >> 6
+
+            first_row = len(self._indexes)
+            self._indexes = np.concatenate((self._indexes, indexes))
+            self._advances = np.concatenate((self._advances, advances))
+            self._ink_left = np.concatenate((self._ink_left, ink_left))
+            self._ink_right = np.concatenate((self._ink_right, ink_right))
+            # readers don't take the lock, so the rows are published only after the tables contain them
+            self._block_rows[blocks] = np.arange(first_row, first_row + len(blocks))
+
+    def _get_kerning(self, keys):
+        kerning_keys, kerning_values = self._kerning
+        positions = np.searchsorted(kerning_keys, keys)
+        found = positions < len(kerning_keys)
+        found[found] = kerning_keys[positions[found]] == keys[found]
+
+        if not found.all():
+            with self._lock:
+                kerning_keys, kerning_values = self._kerning
+                missing = np.setdiff1d(keys[~found], kerning_keys)
+                keys_ = np.concatenate((kerning_keys, missing))
+                order = np.argsort(keys_, kind="stable")
+                kerning_keys = keys_[order]
+                kerning_values = np.concatenate((kerning_values, self._load_kerning(missing)))[order]
+                self._kerning = (kerning_keys, kerning_values)
+            positions = np.searchsorted(kerning_keys, keys)
+
+        return kerning_values[positions]
+
+    def _load_kerning(self, keys):
+        """Returns kerning of (left glyph << 32 | right glyph) keys in pixels"""
+        from freetype import FT_KERNING_DEFAULT
+
+        return _pixel(np.array([
+            self._face.get_kerning(key >> 32, key & 0xFFFFFFFF, FT_KERNING_DEFAULT).x
+            for key in keys.tolist()
+        ], dtype=np.int64))
+
+    def get_widths(self, texts: list[str]) -> list[int]:
+        """Returns widths of the texts in pixels"""
+        if not texts:
+            return []
+
+        # all texts are measured at once, joined with separators which are masked out
+        codes = np.frombuffer(" ".join(texts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.int64)
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        is_separator = np.zeros(len(codes), dtype=bool)
+        is_separator[starts[1:] - 1] = True
+
+        blocks = codes >> _BLOCK_BITS
+        rows = self._block_rows[blocks]
+        if (rows < 0).any():
+            self._load_blocks(np.unique(blocks[rows < 0]))
+            rows = self._block_rows[blocks]
+        cols = codes & (_BLOCK_SIZE - 1)
+
+        advances = np.where(is_separator, 0, self._advances[rows, cols]).astype(np.int64)
+
+        if self._has_kerning and len(codes) > 1:
+            indexes = self._indexes[rows, cols].astype(np.int64)
+            pairs = (indexes[:-1] != 0) & (indexes[1:] != 0) & ~is_separator[:-1] & ~is_separator[1:]
+            if pairs.any():
+                keys = (indexes[:-1][pairs] << 32) | indexes[1:][pairs]
+                advances[:-1][pairs] += self._get_kerning(keys)
+
+        # pen positions are relative to the start of their text
+        offsets = np.concatenate(([0], np.cumsum(advances)))
+        text_offsets = np.repeat(offsets[starts], lengths + 1)[:len(codes)]
+        positions = _pixel(offsets[:-1] - text_offsets)
+        advanced = _pixel(offsets[1:] - text_offsets)
+        ink_left = np.where(is_separator, 0, positions + self._ink_left[rows, cols])
+        ink_right = np.where(is_separator, 0, np.maximum(advanced, positions + self._ink_right[rows, cols]))
+
+        widths = [0] * len(texts)
+        non_empty = np.flatnonzero(lengths)
+        if len(non_empty):
+            starts = starts[non_empty]
+            x_min = np.minimum(0, np.minimum.reduceat(ink_left, starts))
+            x_max = np.maximum(0, np.maximum.reduceat(ink_right, starts))
+            for i, width in zip(non_empty.tolist(), (x_max - x_min).tolist()):
+                widths[i] = width
+        return widths
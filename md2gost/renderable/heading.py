@@ -1,17 +1,18 @@
-from copy import copy
 from typing import Generator
 from uuid import uuid4
 
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.xmlchemy import BaseOxmlElement
 from docx.text.paragraph import Paragraph as DocxParagraph
 from docx.shared import Parented, Length, Cm
 
 from . import Renderable
 from .paragraph_sizer import ParagraphSizer
 from ..layout_tracker import LayoutState
+from ..pagination import BlockArray, KEEP_WITH_NEXT, PAGE_BREAK_BEFORE, paginate
 from .paragraph import Paragraph
 from ..rendered_info import RenderedInfo
-from ..util import create_element
+from .. import element_templates
 
 
 class Heading(Paragraph):
@@ -31,18 +32,10 @@ class Heading(Paragraph):
             self._remove_numbering()
             self._docx_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
-        self._rendered_page = 0
-
         self._id = uuid4().hex
 
         # todo: add bookmark here
-        self._docx_paragraph._p.append(create_element("w:bookmarkStart", {
-            "w:id": self._id,
-            "w:name": self._id,
-        }))
-        self._docx_paragraph._p.append(create_element("w:bookmarkEnd", {
-            "w:id": self._id,
-        }))
+        self._docx_paragraph._p.extend(element_templates.bookmark(self._id, self._id))
 
     @property
     def anchor(self) -> str:
@@ -52,9 +45,13 @@ class Heading(Paragraph):
     def is_numbered(self) -> bool:
         return self._numbered
 
+    def content_hash(self) -> bytes | None:
+        return None  # the page of the heading element is looked up for the table of contents
+
     @property
-    def rendered_page(self) -> int:
-        return self._rendered_page
+    def docx_element(self) -> BaseOxmlElement:
+        """The rendered paragraph element, its page can be looked up in the page map"""
+        return self._docx_paragraph._p
 
     @property
     def level(self) -> int:
@@ -65,21 +62,10 @@ class Heading(Paragraph):
         return self._docx_paragraph.text
 
     def _remove_numbering(self):
-        self._docx_paragraph._p.pPr.append(
-            create_element("w:numPr", [
-                create_element("w:ilvl", {
-                    "w:val": "0"
-                }),
-                create_element("w:numId", {
-                    "w:val": "0"
-                })
-            ])
-        )
+        self._docx_paragraph._p.pPr.append(element_templates.no_numbering())
 
     def render(self, previous_rendered: RenderedInfo, layout_state: LayoutState)\
             -> Generator[RenderedInfo | Renderable, None, None]:
-        remaining_height = layout_state.remaining_page_height
-
         if self._level == 1 and not (layout_state.page == 1 and layout_state.current_page_height == 0) and\
                 not (previous_rendered and isinstance(previous_rendered.docx_element, DocxParagraph)
                      and previous_rendered.docx_element.text == "\n"):
@@ -91,25 +77,17 @@ class Heading(Paragraph):
             if previous_rendered and isinstance(previous_rendered.docx_element, DocxParagraph) else None,
             layout_state.max_width, Cm(1.25)).calculate_height()
 
-        if layout_state.current_page_height == 0 and layout_state.page != 1:
-            height_data.before = 0
+        blocks = BlockArray()
+        height_data.to_block(blocks, KEEP_WITH_NEXT | (PAGE_BREAK_BEFORE if self.page_break_before else 0))
+        (height,), (moved,) = paginate(blocks, layout_state.max_height, layout_state.current_height)
 
         # if a heading + 3 lines don't fit to the page, they go to the next page
-        if ((height_data.lines + 3 - 1) * height_data.line_spacing + 1) * height_data.line_height\
-                > layout_state.remaining_page_height:
+        if moved:
             self._docx_paragraph.paragraph_format.space_before = 0  # libreoffice fix
-            height = height_data.full - height_data.before
 
             # force this behaviour as there could be a table or an image instead of text
             self.page_break_before = True
 
-        else:
-            height = height_data.full
-
-        if self.page_break_before:
-            height += remaining_height
-
         layout_state.add_height(height)
-        self._rendered_page = layout_state.page
 
         yield RenderedInfo(self._docx_paragraph, Length(height))
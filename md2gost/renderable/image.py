@@ -1,5 +1,4 @@
 import logging
-from copy import copy
 from io import BytesIO
 from typing import Generator
 from os import environ
@@ -19,8 +18,10 @@ from ..util import create_element
 
 
 class Image(Renderable, RequiresNumbering):
+    NUMBERING_CATEGORY = "Рисунок"
+
     def __init__(self, parent: Parented, path: str, filebuffer: dict[str, BytesIO], caption_info: CaptionInfo | None = None):
-        super().__init__("Рисунок", caption_info.unique_name if caption_info else None)
+        super().__init__(self.NUMBERING_CATEGORY, caption_info.unique_name if caption_info else None)
         self._parent = parent
         self._caption_info = caption_info
         self._docx_paragraph = Paragraph(create_element("w:p"), parent)
@@ -84,7 +85,9 @@ class Image(Renderable, RequiresNumbering):
         caption = Caption(self._parent, "Рисунок", self._caption_info, self._number, False)
         caption.center()
 
-        caption_rendered_infos = list(caption.render(None, copy(layout_state)))
+        snapshot = layout_state.snapshot()
+        caption_rendered_infos = list(caption.render(None, layout_state))
+        layout_state.restore(snapshot)
         caption_height = sum([info.height for info in caption_rendered_infos])
 
         if height + caption_height > layout_state.remaining_page_height:
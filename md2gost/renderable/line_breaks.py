@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from math import ceil, floor
+
+from docx.shared import Length
+
+
+@dataclass(frozen=True)
+class LineBreaks:
+    """Lines of a wrapped paragraph"""
+    offsets: list[int]  # offset in the paragraph text where each line starts
+    widths: list[Length]
+
+    @property
+    def count(self) -> int:
+        return len(self.offsets)
+
+
+class MeasuredWords:
+    """Measured words of a paragraph, which can be wrapped at any width without measuring them again"""
+
+    def __init__(self, words: list[tuple[int, int, float]], space_width: float,
+                 tab_stop: float | None = None, tabbed: dict[int, list[float]] | None = None):
+        self._words = words  # (offset in the text, spaces before, width without spaces)
+        self._space_width = space_width
+        # widths of the tab separated parts of words with tabs by the word index, as the width of such a word
+        # depends on its position in the line
+        self._tab_stop = tab_stop
+        self._tabbed = tabbed or {}
+        self._wrapped: dict[tuple[Length, Length], LineBreaks] = {}
+
+    def wrap(self, max_width: Length, first_line_indent: Length) -> LineBreaks:
+        line_breaks = self._wrapped.get((max_width, first_line_indent))
+        if line_breaks is None:
+            line_breaks = self._wrapped[(max_width, first_line_indent)] = self._wrap(max_width, first_line_indent)
+        return line_breaks
+
+    def _wrap(self, max_width: Length, first_line_indent: Length) -> LineBreaks:
+        offsets = [0]
+        widths = []
+        line_width = first_line_indent
+        for i, (offset, spaces, words_width) in enumerate(self._words):
+            tab_parts = self._tabbed.get(i) if self._tabbed else None
+            if tab_parts:
+                words_width = self._get_tabbed_width(tab_parts, line_width + spaces*self._space_width)
+            width = spaces*self._space_width + words_width
+            if width <= max_width - line_width:
+                line_width += width
+            elif width > max_width - first_line_indent:
+                # the word doesn't fit an empty line, so it's broken
+                if len(offsets) == 1 and line_width == first_line_indent and not spaces:
+                    lines = ceil((width - (max_width - first_line_indent)) / max_width)
+                    line_width = (width - (max_width - first_line_indent)) % max_width
+                    widths.append(max_width)
+                else:
+                    lines = ceil(width / max_width)
+                    widths.append(line_width)
+                    line_width = width % max_width
+                widths.extend([max_width] * (lines - 1))
+                offsets.extend([offset] * lines)
+            else:
+                offsets.append(offset)
+                widths.append(line_width)
+                # tab stops of a wrapped line start from its beginning
+                line_width = self._get_tabbed_width(tab_parts, 0) if tab_parts else words_width
+        widths.append(line_width)
+
+        return LineBreaks(offsets, [Length(int(width)) for width in widths])
+
+    def _get_tabbed_width(self, parts: list[float], start: float) -> float:
+        """Returns the width of a word with tabs starting at the position, tabs advance to the next tab stop"""
+        position = start + parts[0]
+        for part in parts[1:]:
+            position = (floor(position / self._tab_stop) + 1) * self._tab_stop + part
+        return position - start
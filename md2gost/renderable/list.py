@@ -1,12 +1,16 @@
-from copy import copy
 from typing import Generator
 
-from docx.shared import Pt, Cm, Twips
+from docx.shared import Length, Pt, Cm, Twips
+from docx.text.paragraph import Paragraph as DocxParagraph
 
 from . import Paragraph
+from .paragraph_sizer import ParagraphSizer
 from .renderable import Renderable
 from ..layout_tracker import LayoutState
+from ..pagination import BlockArray, PAGE_BREAK_BEFORE, paginate
 from ..rendered_info import RenderedInfo
+from ..style_resolver import get_style_resolver
+from ..util import hash_content
 
 
 LEVEL_INDENT = Twips(425)
@@ -30,7 +34,8 @@ class List(Renderable):
         paragraph.add_run((f"{self._numbering[level-1]}." if self._ordered else "●")+"\t")
 
         # first level indent is a first_line_indent of normal text
-        first_indent = self._parent.part.styles["Normal"].paragraph_format.first_line_indent
+        first_indent = get_style_resolver(self._parent.part.document).style_by_name("Normal")\
+            .paragraph_format.first_line_indent
 
         # idk how it works but it works
         paragraph._docx_paragraph.paragraph_format.tab_stops.add_tab_stop(Twips(360))
@@ -44,12 +49,30 @@ class List(Renderable):
         self._paragraphs.append(paragraph)
         return paragraph
 
+    def content_hash(self) -> bytes | None:
+        return hash_content(self._last_paragraph_space_after,
+                            *[paragraph._docx_paragraph._p for paragraph in self._paragraphs])
+
+    def get_sized_paragraphs(self) -> list[DocxParagraph]:
+        return [paragraph._docx_paragraph for paragraph in self._paragraphs]
+
     def render(self, previous_rendered: RenderedInfo, layout_state: LayoutState) -> Generator[
             RenderedInfo | Renderable, None, None]:
         self._paragraphs[-1]._docx_paragraph.paragraph_format.space_after = self._last_paragraph_space_after
 
-        for paragraph in self._paragraphs:
-            for x in paragraph.render(previous_rendered, copy(layout_state)):
-                layout_state.add_height(x.height)
-                previous_rendered = x
-                yield x
+        self._paragraphs[0].prepare(previous_rendered)
+        heights_data = ParagraphSizer.size_many(
+            [paragraph._docx_paragraph for paragraph in self._paragraphs],
+            [layout_state.max_width] * len(self._paragraphs),
+            previous_rendered.docx_element
+            if previous_rendered and isinstance(previous_rendered.docx_element, DocxParagraph) else None)
+
+        # the paragraphs are paginated in one pass
+        blocks = BlockArray()
+        for paragraph, height_data in zip(self._paragraphs, heights_data):
+            height_data.to_block(blocks, PAGE_BREAK_BEFORE if paragraph.page_break_before else 0)
+        heights, _ = paginate(blocks, layout_state.max_height, layout_state.current_height)
+
+        for paragraph, height in zip(self._paragraphs, heights):
+            layout_state.add_height(height)
+            yield RenderedInfo(paragraph._docx_paragraph, Length(height))
@@ -1,24 +1,27 @@
 import logging
-from copy import copy
 import os
+from functools import lru_cache
 from typing import Generator, Callable
 
 from docx.oxml import CT_Tbl
 from docx.shared import Length, Pt, RGBColor, Twips
 from docx.table import Table
 
-from pygments import highlight
+from pygments import lex
 from pygments.formatter import Formatter
 from pygments.lexers import get_lexer_by_name
 from pygments.util import ClassNotFound
 
 from .caption import Caption, CaptionInfo
 from .paragraph import Paragraph
+from .paragraph_sizer import ParagraphSizer, ParagraphSizerResult
 from .renderable import Renderable
 from .requires_numbering import RequiresNumbering
 from ..docx_elements import create_table
 from ..layout_tracker import LayoutState
 from ..rendered_info import RenderedInfo
+from ..style_resolver import get_style_resolver
+from ..util import hash_content
 
 
 class DocxParagraphPygmentsFormatter(Formatter):
@@ -48,11 +51,20 @@ class DocxParagraphPygmentsFormatter(Formatter):
 
 
 LISTING_OFFSET = Pt(14)
+HIGHLIGHTING_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=HIGHLIGHTING_CACHE_SIZE)
+def _get_tokens(language: str, text: str) -> tuple:
+    """Returns highlighted tokens of the code, raises ClassNotFound if the language is not supported"""
+    return tuple(lex(text, get_lexer_by_name(language)))
 
 
 class Listing(Renderable, RequiresNumbering):
+    NUMBERING_CATEGORY = "Листинг"
+
     def __init__(self, parent, language: str, caption_info: CaptionInfo):
-        super().__init__("Листинг", caption_info.unique_name if caption_info else None)
+        super().__init__(self.NUMBERING_CATEGORY, caption_info.unique_name if caption_info else None)
         self._caption_info = caption_info
         self._language = language
         self._parent = parent
@@ -60,13 +72,7 @@ class Listing(Renderable, RequiresNumbering):
         self._number = None
 
     def _create_table(self, parent, width: Length):
-        # todo: style inheritance
-        left_margin = Twips(int(
-            parent.part.styles["Normal Table"]._element.xpath("w:tblPr/w:tblCellMar/w:left")[0].attrib[
-                "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}w"]))
-        right_margin = Twips(int(
-            parent.part.styles["Normal Table"]._element.xpath("w:tblPr/w:tblCellMar/w:right")[0].attrib[
-                "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}w"]))
+        left_margin, right_margin = get_style_resolver(parent.part.document).table_cell_margins("Normal Table")
 
         return create_table(parent, 1, 1, width + left_margin + right_margin)
 
@@ -81,7 +87,7 @@ class Listing(Renderable, RequiresNumbering):
         if self._language and "SYNTAX_HIGHLIGHTING" in os.environ and os.environ["SYNTAX_HIGHLIGHTING"] == "1":
             formatter = DocxParagraphPygmentsFormatter(self.paragraphs, lambda: create_paragraph())
             try:
-                highlight(text, get_lexer_by_name(self._language), formatter)
+                formatter.format(_get_tokens(self._language, text), None)
                 return
             except ClassNotFound:
                 logging.getLogger("md2gost").warning(f"Язык {self._language} не поддерживается, синтаксис не будет подсвечен")
@@ -94,12 +100,28 @@ class Listing(Renderable, RequiresNumbering):
     def set_number(self, number: int):
         self._number = number
 
+    def content_hash(self) -> bytes | None:
+        return hash_content(self._caption_info, self._number,
+                            *[paragraph._docx_paragraph._p for paragraph in self.paragraphs])
+
+    @staticmethod
+    def _render_paragraph(paragraph: Paragraph, previous: RenderedInfo | None, layout_state: LayoutState,
+                          height_data: ParagraphSizerResult | None = None) -> RenderedInfo:
+        """Renders the line inside the listing table, the layout state is left unchanged"""
+        snapshot = layout_state.snapshot()
+        layout_state.max_width -= LISTING_OFFSET
+        paragraph_rendered_info = next(paragraph.render(previous, layout_state, height_data))
+        layout_state.restore(snapshot)
+        return paragraph_rendered_info
+
     def render(self, previous_rendered: RenderedInfo, layout_state: LayoutState)\
             -> Generator[RenderedInfo | Renderable, None, None]:
+        snapshot = layout_state.snapshot()
         caption_rendered_infos = list(
             Caption(self._parent, "Листинг", self._caption_info, self._number, True)
-            .render(previous_rendered, copy(layout_state))
+            .render(previous_rendered, layout_state)
         )
+        layout_state.restore(snapshot)
         layout_state.add_height(sum([info.height for info in caption_rendered_infos]))
         yield from caption_rendered_infos
 
@@ -108,18 +130,18 @@ class Listing(Renderable, RequiresNumbering):
 
         table_height = Pt(1)  # table borders, 4 eights of point for each border
 
+        heights_data = ParagraphSizer.size_many(
+            [paragraph._docx_paragraph for paragraph in self.paragraphs],
+            [layout_state.max_width - LISTING_OFFSET] * len(self.paragraphs))
+
         # if first line doesn't fit move listing to the next page
-        paragraph_layout_state = copy(layout_state)
-        paragraph_layout_state.max_width -= LISTING_OFFSET
-        paragraph_rendered_info = next(self.paragraphs[0].render(previous, paragraph_layout_state))
+        paragraph_rendered_info = self._render_paragraph(self.paragraphs[0], previous, layout_state, heights_data[0])
         if paragraph_rendered_info.height + table_height > layout_state.remaining_page_height:
             table_height += layout_state.remaining_page_height
             layout_state.add_height(layout_state.remaining_page_height)
 
-        for paragraph in self.paragraphs:
-            paragraph_layout_state = copy(layout_state)
-            paragraph_layout_state.max_width -= LISTING_OFFSET
-            paragraph_rendered_info = next(paragraph.render(previous, paragraph_layout_state))
+        for paragraph, height_data in zip(self.paragraphs, heights_data):
+            paragraph_rendered_info = self._render_paragraph(paragraph, previous, layout_state, height_data)
 
             if paragraph_rendered_info.height > layout_state.remaining_page_height:  # todo add before after
                 table_rendered_info = RenderedInfo(table, table_height)
@@ -133,8 +155,9 @@ class Listing(Renderable, RequiresNumbering):
                 continuation_paragraph.first_line_indent = 0
                 continuation_paragraph.page_break_before = True
 
-                continuation_rendered_info = next(
-                    continuation_paragraph.render(None, copy(layout_state)))
+                snapshot = layout_state.snapshot()
+                continuation_rendered_info = next(continuation_paragraph.render(None, layout_state))
+                layout_state.restore(snapshot)
 
                 layout_state.add_height(continuation_rendered_info.height)
                 yield continuation_rendered_info
@@ -143,9 +166,7 @@ class Listing(Renderable, RequiresNumbering):
 
                 previous = None
 
-                paragraph_layout_state = copy(layout_state)
-                paragraph_layout_state.max_width -= LISTING_OFFSET
-                paragraph_rendered_info = next(paragraph.render(previous, paragraph_layout_state))
+                paragraph_rendered_info = self._render_paragraph(paragraph, previous, layout_state)
 
             table._cells[0]._element.append(paragraph_rendered_info.docx_element._element)
             layout_state.add_height(paragraph_rendered_info.height)
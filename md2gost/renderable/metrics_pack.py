@@ -0,0 +1,349 @@
+"""Precomputed font metrics, so documents can be measured without font files.
+
+A pack is built once from the fonts of a template (md2gost-metrics-pack) and
+read at runtime through mmap (md2gost --metrics-pack), without freetype.
+
+File layout: MAGIC, header length (uint32 LE), JSON header, arrays.
+The header describes every face (family, bold, italic, size) and the offsets of
+its arrays. Faces with size null hold unscaled metrics (font units) and are used
+for sizes that weren't packed.
+"""
+import json
+import logging
+import mmap
+import os.path
+import struct
+from argparse import ArgumentParser
+from functools import lru_cache
+from math import prod
+from threading import Lock
+
+import numpy as np
+import docx
+from docx.document import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.shared import Length, Pt
+from docx.styles.style import _ParagraphStyle
+
+from .glyph_table import GlyphTable, _BLOCK_BITS, _BLOCK_SIZE, _BLOCKS_COUNT
+
+MAGIC = b"MD2GMP01"
+_ALIGNMENT = 8
+
+_STYLES = ((False, False), (True, False), (False, True), (True, True))
+
+
+class PackedGlyphTable(GlyphTable):
+    """Glyph table with all blocks and kerning pairs read from a metrics pack"""
+
+    def __init__(self, block_rows, indexes, advances, ink_left, ink_right, kerning_keys, kerning_values):
+        self._face = None
+        self._has_kerning = len(kerning_keys) > 0
+        self._lock = Lock()
+
+        self._block_rows = block_rows
+        self._indexes = indexes
+        self._advances = advances
+        self._ink_left = ink_left
+        self._ink_right = ink_right
+
+        self._kerning_keys = kerning_keys
+        self._kerning_values = kerning_values
+
+    def _get_kerning(self, keys):
+        # the pack holds all kerning pairs of the face, others have no kerning
+        positions = np.minimum(np.searchsorted(self._kerning_keys, keys), len(self._kerning_keys) - 1)
+        return np.where(self._kerning_keys[positions] == keys, self._kerning_values[positions], 0)
+
+
+class PackedFontFace:
+    """Font face read from a metrics pack, replaces the loaded font files in Font"""
+
+    def __init__(self, pack: "MetricsPack", info: dict, size_pt: float):
+        self.key = (pack.path, info["family"], size_pt, info["bold"], info["italic"])
+        self.size_pt = size_pt
+
+        arrays = {name: pack.get_array(description) for name, description in info["arrays"].items()}
+
+        if info["size"] is None:
+            # font units are scaled to the size and rounded to pixels, which approximates hinting
+            scale = size_pt * 64 / info["units_per_em"] / 64
+            arrays["advances"] = np.rint(arrays["advances"] * scale).astype(np.int64) * 64
+            arrays["ink_left"] = np.floor(arrays["ink_left"] * scale).astype(np.int64)
+            arrays["ink_right"] = np.ceil(arrays["ink_right"] * scale).astype(np.int64)
+            arrays["kerning_values"] = np.rint(arrays["kerning_values"] * scale).astype(np.int64)
+            self.mono_advance = round(info["mono_advance"] * scale) * 64
+            self.line_height = Pt(round(info["height"] * size_pt / info["units_per_em"]))
+        else:
+            self.mono_advance = info["mono_advance"]
+            self.line_height = Length(info["line_height"])
+
+        self.is_mono = info["is_mono"]
+        self.glyph_table = PackedGlyphTable(**arrays)
+
+
+class MetricsPack:
+    """Font metrics pack, read through mmap"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a metrics pack")
+        header_length, = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        self._data_offset = len(MAGIC) + 4 + header_length
+        header = json.loads(self._mmap[len(MAGIC) + 4:self._data_offset])
+
+        self._faces = {
+            (face["family"], face["bold"], face["italic"], face["size"]): face
+            for face in header["faces"]
+        }
+        self._font_faces: dict[tuple, PackedFontFace] = {}
+        self._lock = Lock()
+
+    def get_array(self, description: dict) -> np.ndarray:
+        return np.frombuffer(
+            self._mmap, np.dtype(description["dtype"]), prod(description["shape"]),
+            self._data_offset + description["offset"]
+        ).reshape(description["shape"])
+
+    def get_font_face(self, name: str, bold: bool, italic: bool, size_pt: float) -> PackedFontFace:
+        key = (name, bold, italic, size_pt)
+        font_face = self._font_faces.get(key)
+        if font_face is None:
+            with self._lock:
+                info = self._faces.get(key) or self._faces.get((name, bold, italic, None))
+                if info is None:
+                    raise ValueError(f"Font {name} not found in metrics pack {self.path}")
+                font_face = self._font_faces[key] = PackedFontFace(self, info, size_pt)
+        return font_face
+
+
+@lru_cache
+def open_metrics_pack(path: str) -> MetricsPack:
+    return MetricsPack(path)
+
+
+class _PackWriter:
+    def __init__(self):
+        self._faces: list[dict] = []
+        self._chunks: list[bytes] = []
+        self._size = 0
+
+    def _add_array(self, array: np.ndarray) -> dict:
+        description = {"offset": self._size, "dtype": array.dtype.str, "shape": list(array.shape)}
+        self._chunks.append(np.ascontiguousarray(array).tobytes())
+        self._size += array.nbytes
+        if padding := -self._size % _ALIGNMENT:
+            self._chunks.append(b"\0" * padding)
+            self._size += padding
+        return description
+
+    def add_face(self, info: dict, arrays: dict[str, np.ndarray]):
+        info["arrays"] = {name: self._add_array(array) for name, array in arrays.items()}
+        self._faces.append(info)
+
+    def write(self, path: str):
+        header = json.dumps({"faces": self._faces}, ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % _ALIGNMENT)
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for chunk in self._chunks:
+                f.write(chunk)
+
+
+def _read_kerning_pairs(path: str) -> list[tuple[int, int]]:
+    """Returns glyph pairs of the format 0 subtables of the 'kern' table"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    offset = struct.unpack_from(">I", data, 12)[0] if data[:4] == b"ttcf" else 0
+    tables_count, = struct.unpack_from(">H", data, offset + 4)
+    for i in range(tables_count):
+        tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, offset + 12 + 16 * i)
+        if tag == b"kern":
+            break
+    else:
+        return []
+
+    version, subtables_count = struct.unpack_from(">HH", data, table_offset)
+    if version != 0:  # apple kern tables are not supported
+        return []
+
+    pairs = []
+    position = table_offset + 4
+    for _ in range(subtables_count):
+        _, length, coverage = struct.unpack_from(">HHH", data, position)
+        if coverage >> 8 == 0:
+            pairs_count, = struct.unpack_from(">H", data, position + 6)
+            pairs.extend(struct.unpack_from(">HH", data, position + 14 + 6 * i) for i in range(pairs_count))
+            length = 14 + 6 * pairs_count  # the length field overflows in large subtables
+        position += length
+    return pairs
+
+
+def _get_blocks(face) -> list[int]:
+    """Returns blocks of the face's charmap and a block it doesn't cover, for .notdef"""
+    blocks = sorted({code >> _BLOCK_BITS for code, _ in face.get_chars()})
+    uncovered = next(block for block in range(_BLOCKS_COUNT - 1, -1, -1) if block not in blocks)
+    return blocks + [uncovered]
+
+
+def _pack_glyph_table(glyph_table: GlyphTable, blocks: list[int], pairs: list[tuple[int, int]])\
+        -> dict[str, np.ndarray]:
+    glyph_table._load_blocks(np.array(blocks, dtype=np.int64))
+
+    block_rows = np.full(_BLOCKS_COUNT, glyph_table._block_rows[blocks[-1]], dtype=np.int32)
+    block_rows[blocks] = glyph_table._block_rows[blocks]
+
+    keys = np.unique(np.array([(left << 32) | right for left, right in pairs], dtype=np.int64))
+    values = glyph_table._load_kerning(keys) if glyph_table._has_kerning else np.zeros(len(keys), dtype=np.int64)
+
+    return {
+        "block_rows": block_rows,
+        "indexes": glyph_table._indexes.astype(np.int32),
+        "advances": glyph_table._advances.astype(np.int32),
+        "ink_left": glyph_table._ink_left.astype(np.int32),
+        "ink_right": glyph_table._ink_right.astype(np.int32),
+        "kerning_keys": keys[values != 0],
+        "kerning_values": values[values != 0].astype(np.int32),
+    }
+
+
+def _pack_unscaled(face, blocks: list[int], pairs: list[tuple[int, int]]) -> dict[str, np.ndarray]:
+    from freetype import FT_LOAD_NO_SCALE, FT_KERNING_UNSCALED
+
+    shape = (len(blocks), _BLOCK_SIZE)
+    indexes, advances = np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.int32)
+    ink_left, ink_right = np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.int32)
+    for row, block in enumerate(blocks):
+        for col in range(_BLOCK_SIZE):
+            code = (block << _BLOCK_BITS) | col
+            index = 0 if 0xD800 <= code <= 0xDFFF else face.get_char_index(code)
+            face.load_glyph(index, FT_LOAD_NO_SCALE)
+            metrics = face.glyph.metrics
+            indexes[row, col] = index
+            advances[row, col] = metrics.horiAdvance
+            ink_left[row, col] = metrics.horiBearingX
+            ink_right[row, col] = metrics.horiBearingX + metrics.width
+
+    block_rows = np.full(_BLOCKS_COUNT, len(blocks) - 1, dtype=np.int32)
+    block_rows[blocks] = np.arange(len(blocks))
+
+    keys = np.unique(np.array([(left << 32) | right for left, right in pairs], dtype=np.int64))
+    values = np.array([
+        face.get_kerning(key >> 32, key & 0xFFFFFFFF, FT_KERNING_UNSCALED).x for key in keys.tolist()
+    ], dtype=np.int32) if face.has_kerning else np.zeros(len(keys), dtype=np.int32)
+
+    return {
+        "block_rows": block_rows,
+        "indexes": indexes,
+        "advances": advances,
+        "ink_left": ink_left,
+        "ink_right": ink_right,
+        "kerning_keys": keys[values != 0],
+        "kerning_values": values[values != 0],
+    }
+
+
+def build_metrics_pack(fonts: set[tuple[str, float]], output_path: str):
+    """Builds a metrics pack with all styles of the fonts given as (name, size in pt)"""
+    from freetype import Face
+    from .find_font import find_font
+    from .paragraph_sizer import _FontFace
+
+    writer = _PackWriter()
+    for name in sorted({name for name, _ in fonts}):
+        for bold, italic in _STYLES:
+            try:
+                path = find_font(name, bold, italic)
+            except ValueError:
+                logging.getLogger("md2gost").warning(
+                    f"Шрифт {name} ({'bold' if bold else ''} {'italic' if italic else ''}) не найден")
+                continue
+
+            pairs = _read_kerning_pairs(path)
+            blocks = None
+            for size in sorted(size for name_, size in fonts if name_ == name):
+                font_face = _FontFace(path, size, bold, italic)
+                blocks = blocks or _get_blocks(font_face.face)
+                size_metrics = font_face.face.size
+                writer.add_face({
+                    "family": name, "bold": bold, "italic": italic, "size": size,
+                    "line_height": int(font_face.line_height),
+                    "ascender": size_metrics.ascender,
+                    "descender": size_metrics.descender,
+                    "line_gap": size_metrics.height - size_metrics.ascender + size_metrics.descender,
+                    "is_mono": font_face.is_mono,
+                    "mono_advance": font_face.mono_advance,
+                }, _pack_glyph_table(font_face.glyph_table, blocks, pairs))
+
+            face = Face(path)
+            blocks = blocks or _get_blocks(face)
+            arrays = _pack_unscaled(face, blocks, pairs)
+            i_advance, m_advance = (int(arrays["advances"][arrays["block_rows"][ord(c) >> _BLOCK_BITS],
+                                                           ord(c) & (_BLOCK_SIZE - 1)]) for c in "im")
+            writer.add_face({
+                "family": name, "bold": bold, "italic": italic, "size": None,
+                "units_per_em": face.units_per_EM,
+                "ascender": face.ascender,
+                "descender": face.descender,
+                "line_gap": face.height - face.ascender + face.descender,
+                "height": face.height,
+                "is_mono": i_advance == m_advance,
+                "mono_advance": m_advance,
+            }, arrays)
+
+    writer.write(output_path)
+
+
+def get_template_fonts(document: Document) -> set[tuple[str, float]]:
+    """Returns (name, size in pt) of the fonts used by paragraph and character styles"""
+    default_style_element = type("DefaultStyle", (), {})
+    default_style_element.rPr = document.styles.element.xpath('w:docDefaults/w:rPrDefault/w:rPr')[0]
+    default_style_element.pPr = document.styles.element.xpath('w:docDefaults/w:pPrDefault/w:pPr')[0]
+    default_font = _ParagraphStyle(default_style_element).font
+
+    fonts = set()
+    for style in document.styles:
+        if style.type not in (WD_STYLE_TYPE.PARAGRAPH, WD_STYLE_TYPE.CHARACTER):
+            continue
+        name, size = None, None
+        while style is not None:
+            name, size = name or style.font.name, size or style.font.size
+            style = style.base_style
+        name, size = name or default_font.name, size or default_font.size
+        if name and size:
+            fonts.add((name, size.pt))
+    return fonts
+
+
+def main():
+    parser = ArgumentParser(
+        prog="md2gost-metrics-pack",
+        description="Собирает метрики шрифтов шаблона в файл, который используется с флагом \
+                --metrics-pack вместо файлов шрифтов."
+    )
+    parser.add_argument("-t", "--template", help="Путь до шаблона .docx")
+    parser.add_argument("-o", "--output", help="Путь до файла метрик", default="metrics.pack")
+    parser.add_argument("--font", help="Дополнительный шрифт в формате \"Имя:размер\"",
+                        action="append", default=[])
+
+    args = parser.parse_args()
+
+    template = args.template or os.path.join(os.path.dirname(__file__), "..", "Template.docx")
+    fonts = get_template_fonts(docx.Document(template))
+    for font in args.font:
+        name, _, size = font.rpartition(":")
+        fonts.add((name, float(size)))
+
+    build_metrics_pack(fonts, args.output)
+    print(f"Метрики шрифтов: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,27 @@ from docx.table import Table
 from docx.oxml import CT_R
 from docx.shared import Length, Parented, RGBColor, Cm
 from docx.text.paragraph import Paragraph as DocxParagraph
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.text.paragraph import Run as DocxRun
 from docx.opc.constants import RELATIONSHIP_TYPE
 from docx.oxml.shared import qn
 
 from . import Renderable
-from .paragraph_sizer import ParagraphSizer
+from .paragraph_sizer import ParagraphSizer, ParagraphSizerResult
+from .. import element_templates
 from ..docx_elements import create_field
 from ..layout_tracker import LayoutState
-from ..util import create_element
+from ..pagination import BlockArray, PAGE_BREAK_BEFORE, paginate
+from ..util import create_element, hash_content
 from ..rendered_info import RenderedInfo
+from ..style_resolver import get_style_resolver
 
 
 class Link:
     def __init__(self, docx_paragraph: DocxParagraph, style: str | None):
         self._docx_paragraph = docx_paragraph
-        self._style = style
+        self._style_id = get_style_resolver(docx_paragraph.part.document).style_id(style, WD_STYLE_TYPE.CHARACTER) \
+            if style else None
 
         self._hyperlink = create_element("w:hyperlink")
 
@@ -34,18 +38,11 @@ class Link:
     def add_run(self, text: str, is_bold: bool = None, is_italic: bool = None, color: RGBColor = None,
                 strike_through: bool = None):
 
-        parts = text.split("-")
-        for i, part in enumerate(parts):
-            docx_run = DocxRun(create_element("w:r"), self._docx_paragraph)
-            self._hyperlink.append(docx_run._element)
-            docx_run.text = part
-            docx_run.style = self._style
-            docx_run.bold = is_bold
-            docx_run.italic = is_italic
-            docx_run.font.color.rgb = color
-            docx_run.font.strike = strike_through
-            if i != len(parts) - 1:
-                self._hyperlink.append(create_element("w:r", [create_element("w:noBreakHyphen")]))
+        for i, part in enumerate(text.split("-")):
+            if i:
+                self._hyperlink.append(element_templates.hyphen_run())
+            self._hyperlink.append(element_templates.formatted_run(part, is_bold, is_italic, color, strike_through,
+                                                                   self._style_id))
 
     @property
     def element(self):
@@ -71,23 +68,18 @@ class Reference:
 class Paragraph(Renderable):
     def __init__(self, parent: Parented):
         self._parent = parent
-        self._docx_paragraph = DocxParagraph(create_element("w:p"), parent)
-        self._docx_paragraph.style = "Normal"
+        self._docx_paragraph = DocxParagraph(
+            element_templates.paragraph(get_style_resolver(parent.part.document).style_id("Normal")), parent)
         self._references: list[Reference] = []
 
     def add_run(self, text: str, is_bold: bool = None, is_italic: bool = None, color: RGBColor = None,
                 strike_through: bool = None):
         # replace all hyphens with non-breaking hyphens
-        parts = text.split("-")
-        for i, part in enumerate(parts):
-            docx_run = self._docx_paragraph.add_run(part)
-            docx_run.bold = is_bold
-            docx_run.italic = is_italic
-            docx_run.font.color.rgb = color
-            docx_run.font.strike = strike_through
-            if i != len(parts)-1:
-                self._docx_paragraph.add_run()._element.\
-                    append(create_element("w:noBreakHyphen"))
+        p = self._docx_paragraph._p
+        for i, part in enumerate(text.split("-")):
+            if i:
+                p.append(element_templates.hyphen_run())
+            p.append(element_templates.formatted_run(part, is_bold, is_italic, color, strike_through))
 
     @property
     def references(self) -> list[Reference]:
@@ -133,7 +125,7 @@ class Paragraph(Renderable):
 
     @style.setter
     def style(self, value: str):
-        self._docx_paragraph.style = value
+        self._docx_paragraph._p.style = get_style_resolver(self._docx_paragraph.part.document).style_id(value)
 
     @property
     def first_line_indent(self):
@@ -151,51 +143,34 @@ class Paragraph(Renderable):
     def alignment(self, value: WD_PARAGRAPH_ALIGNMENT):
         self._docx_paragraph.alignment = value
 
-    def render(self, previous_rendered: RenderedInfo, layout_state: LayoutState)\
-            -> Generator[RenderedInfo | Renderable, None, None]:
-        remaining_space = layout_state.remaining_page_height
+    def content_hash(self) -> bytes | None:
+        return hash_content(type(self).__name__, self._docx_paragraph._p)
+
+    def get_sized_paragraphs(self) -> list[DocxParagraph]:
+        return [self._docx_paragraph]
 
+    def prepare(self, previous_rendered: RenderedInfo | None):
+        """Applies formatting that depends on the previous element, must be called before sizing"""
         # add space before if the previous element is table
         if isinstance(previous_rendered, RenderedInfo) and isinstance(previous_rendered.docx_element, Table):
             self._docx_paragraph.paragraph_format.space_before = Cm(0.35)  # todo: remake
 
-        if self.page_break_before:
-            layout_state.add_height(layout_state.remaining_page_height)
-
-        height_data = ParagraphSizer(
-            self._docx_paragraph,
-            previous_rendered.docx_element
-                      if previous_rendered and isinstance(previous_rendered.docx_element, DocxParagraph) else None,
-                      layout_state.max_width).calculate_height()
-
-        if layout_state.current_page_height == 0 and layout_state.page > 1:
-            height_data.before = 0
-
-        fitting_lines = 0
-        for lines in range(1, height_data.lines+1):
-            if height_data.before + ((lines - 1) * height_data.line_spacing + 1) * height_data.line_height \
-                    > layout_state.remaining_page_height:
-                break
-            fitting_lines += 1
-
-        if fitting_lines == height_data.lines:
-            # the whole paragraph fits page
-            height = min(height_data.full, layout_state.remaining_page_height)
-        elif fitting_lines <= 1 or (height_data.lines-fitting_lines == 1 and height_data.lines == 3):
-            # if only no or only one line fits the page, paragraph goes to the next page
-            height = layout_state.remaining_page_height + height_data.full
-        elif height_data.lines-fitting_lines == 1:
-            # if all lines except last fit the page, the last two lines go to the new page
-            height = layout_state.remaining_page_height + \
-                     height_data.before + height_data.line_height * height_data.line_spacing * 2 \
-                     + height_data.after
-        else:
-            height = layout_state.remaining_page_height + \
-                     height_data.before + height_data.line_height * height_data.line_spacing * \
-                     (height_data.lines-fitting_lines) + height_data.after
-
-        if self.page_break_before:
-            height += remaining_space
+    def render(self, previous_rendered: RenderedInfo, layout_state: LayoutState,
+               height_data: ParagraphSizerResult | None = None)\
+            -> Generator[RenderedInfo | Renderable, None, None]:
+        """If height_data is not given (see ParagraphSizer.size_many), the paragraph is sized here"""
+        self.prepare(previous_rendered)
+
+        if height_data is None:
+            height_data = ParagraphSizer(
+                self._docx_paragraph,
+                previous_rendered.docx_element
+                          if previous_rendered and isinstance(previous_rendered.docx_element, DocxParagraph) else None,
+                          layout_state.max_width).calculate_height()
+
+        blocks = BlockArray()
+        height_data.to_block(blocks, PAGE_BREAK_BEFORE if self.page_break_before else 0)
+        (height,), _ = paginate(blocks, layout_state.max_height, layout_state.current_height)
 
         yield (previous_rendered := RenderedInfo(self._docx_paragraph, Length(height)))
         layout_state.add_height(height)
@@ -1,66 +1,172 @@
-from dataclasses import dataclass
-from functools import cached_property
-from math import ceil
+import os
+import re
+from collections import OrderedDict
+from unicodedata import combining, east_asian_width
+from dataclasses import dataclass, field
+from functools import lru_cache
+from weakref import WeakKeyDictionary
 
 from docx.enum.text import WD_LINE_SPACING
+from lxml import etree
 from docx.oxml import CT_R
+from docx.oxml.ns import qn
 from docx.text.run import Run
-from freetype import Face
 
 from docx.text.paragraph import Paragraph
-from docx.text.font import Font as DocxFont
 from docx.shared import Length, Pt, Inches
-from docx.text.parfmt import ParagraphFormat
-from docx.styles.style import _ParagraphStyle
-
-from PIL import Image, ImageDraw, ImageFont
+from docx.text.font import Font as DocxFont
 
 from .find_font import find_font
-from ..util import merge_objects
+from .glyph_table import GlyphTable
+from .line_breaks import LineBreaks, MeasuredWords
+from .metrics_pack import open_metrics_pack
+from .width_cache import WidthCache
+from ..pagination import BlockArray, KEEP_TOGETHER, fitting_lines
+from ..style_resolver import ResolvedFont, ResolvedParagraphFormat, StyleResolver, get_style_resolver
+
+
+_R, _NO_BREAK_HYPHEN = qn("w:r"), qn("w:noBreakHyphen")
+_WORD = re.compile("[^ ]+")
+
+FONT_CACHE_SIZE = 64
+WORD_WIDTH_CACHE_SIZE = 65536
+SIZING_CACHE_SIZE = 4096
+
+# widths of words measured during conversions, shared by all fonts
+word_width_cache = WidthCache(WORD_WIDTH_CACHE_SIZE)
+
+
+class _FontFace:
+    """Loaded font files, shared by all Font objects with the same path and size"""
+
+    def __init__(self, path: str, size_pt: float, bold: bool, italic: bool):
+        from freetype import Face
+
+        self.key = (path, size_pt, bold, italic)
+        self.size_pt = size_pt
+
+        self.face = Face(path)
+        self.face.set_char_size(int(size_pt * 64))
+        self.glyph_table = GlyphTable(self.face)
+
+        self.face.load_char("i")
+        i_width = self.face.glyph.advance.x
+        self.face.load_char("m")
+        self.mono_advance = self.face.glyph.advance.x
+        self.is_mono = i_width == self.mono_advance
+
+        # TODO: make it work for all fonts
+        if "Times" in str(self.face.family_name) and size_pt == 14:
+            self.line_height = Pt(16.05)
+        elif "Courier" in str(self.face.family_name) and size_pt == 12:
+            self.line_height = Pt(13.61)
+        else:
+            self.line_height = Pt(self.face.size.height / 64)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _load_font_face(path: str, size_pt: float, bold: bool, italic: bool) -> _FontFace:
+    return _FontFace(path, size_pt, bold, italic)
+
+
+def measure_texts(face_key: tuple, texts: list[str]) -> list[int]:
+    """Measures the texts with the font face, used in the processes measuring paragraphs in advance"""
+    return [int(Pt(width)) for width in _load_font_face(*face_key).glyph_table.get_widths(texts)]
+
+
+def font_cache_info():
+    """Returns hits, misses and size of the process-wide font cache"""
+    return _load_font_face.cache_info()
 
 
 class Font:
     def __init__(self, name: str, bold: bool, italic: bool, size_pt: int):
-        path = find_font(name, bold, italic)
-        self._freetypefont = ImageFont.truetype(path, size_pt)
-        self._draw = ImageDraw.Draw(Image.new("RGB", (1000, 1000)))
-
-        self._face = Face(path)
-        self._face.set_char_size(int(size_pt * 64))
+        if metrics_pack_path := os.environ.get("METRICS_PACK"):
+            self._font_face = open_metrics_pack(metrics_pack_path).get_font_face(
+                name, bool(bold), bool(italic), size_pt)
+        else:
+            path = find_font(name, bold, italic)
+            self._font_face = _load_font_face(path, size_pt, bool(bold), bool(italic))
 
     def get_text_width(self, text: str) -> Length:
+        return self.get_text_widths([text])[0]
+
+    def get_text_widths(self, texts: list[str]) -> list[Length]:
+        """Measures all the texts at once"""
         if not self.is_mono:
-            bbox = self._draw.textbbox((0, 0), text, self._freetypefont)
-            return Pt(bbox[2] - bbox[0])
+            return word_width_cache.get_widths(self._font_face.key, texts, self._measure)
         else:
-            return Pt(len(text) * self._face.glyph.advance.x / 64)
+            return [Pt(len(text) * self._font_face.mono_advance / 64) for text in texts]
+
+    def _measure(self, texts: list[str]) -> list[Length]:
+        return [Pt(width) for width in self._font_face.glyph_table.get_widths(texts)]
+
+    @property
+    def face_key(self) -> tuple | None:
+        """Key of the font file face, which can be loaded in another process, None for metrics packs"""
+        return self._font_face.key if isinstance(self._font_face, _FontFace) else None
 
     def get_line_height(self) -> Length:
-        # TODO: make it work for all fonts
-        if "Times" in str(self._face.family_name) and self._freetypefont.size == 14:
-            return Pt(16.05)
-        if "Courier" in str(self._face.family_name) and self._freetypefont.size == 12:
-            return Pt(13.61)
-        else:
-            return Pt(self._face.size.height / 64)
+        return self._font_face.line_height
 
-    @cached_property
+    @property
     def is_mono(self):
-        self._face.load_char("i")
-        i_width = self._face.glyph.advance.x
-        self._face.load_char("m")
-        return i_width == self._face.glyph.advance.x
-        # return self._face.glyph.bitmap.width
+        return self._font_face.is_mono
+
+    @property
+    def mono_advance(self) -> int:
+        """Advance of a monospace font's characters in 26.6"""
+        return self._font_face.mono_advance
+
+
+def _count_cells(text: str) -> int:
+    """Returns the width of the text in monospace cells, wide characters take two cells"""
+    if text.isascii():
+        return len(text)
 
+    cells = 0
+    for char in text:
+        if east_asian_width(char) in "WF":
+            cells += 2
+        elif not combining(char):
+            cells += 1
+    return cells
 
 
-@dataclass
+# measured words of paragraphs, with the texts and fonts they were measured with
+_measured_words: WeakKeyDictionary = WeakKeyDictionary()
+
+# fonts of the resolved fonts (per metrics pack), runs with the same formatting share one
+_interned_fonts: dict[tuple[ResolvedFont, str | None], Font] = {}
+
+
+def get_font(font: ResolvedFont) -> Font:
+    key = (font, os.environ.get("METRICS_PACK"))
+    interned_font = _interned_fonts.get(key)
+    if interned_font is None:
+        interned_font = _interned_fonts[key] = Font(font.name, font.bold, font.italic, font.size.pt)
+    return interned_font
+
+
+@dataclass(frozen=True)
 class ParagraphSizerResult:
     before: Length
     lines: int
     line_height: Length
     line_spacing: float
     after: Length
+    line_breaks: LineBreaks | None = field(default=None, compare=False, repr=False)
+    keep_together: bool = False
+
+    def fitting_lines(self, height: Length) -> int:
+        """Returns how many lines fit the height"""
+        return fitting_lines(self.before, self.lines, self.line_height, self.line_spacing, height)
+
+    def to_block(self, blocks: BlockArray, flags: int = 0):
+        """Appends the paragraph to the blocks to be paginated"""
+        if self.keep_together:
+            flags |= KEEP_TOGETHER
+        blocks.append(self.before, self.lines, self.line_height, self.line_spacing, self.after, flags)
 
     @property
     def base(self) -> Length:
@@ -71,149 +177,242 @@ class ParagraphSizerResult:
         return Length(self.before + self.line_height * self.line_spacing * self.lines + self.after)
 
 
+# sizing results keyed by the paragraph XML, style, width, previous paragraph spacing and metrics pack
+_sizing_results: OrderedDict[tuple, ParagraphSizerResult] = OrderedDict()
+
+
 class ParagraphSizer:
     def __init__(self, paragraph: Paragraph, previous_paragraph: Paragraph | None, 
-                 max_width: Length, tabs_size: Length = 0):  # todo: remove tabs_size and resolve tabs here
+                 max_width: Length, tabs_size: Length = 0,  # todo: remove tabs_size and resolve tabs here
+                 style_resolver: StyleResolver | None = None):
         self.previous_paragraph = previous_paragraph
         self.max_width = max_width
         self.paragraph = paragraph
         self._tabs_size = tabs_size
 
-        self.same_style_as_previous = (paragraph.style == previous_paragraph.style) if previous_paragraph else False
-
-    @cached_property
-    def _default_style(self):
-
-        default_style_element = type("DefaultStyle", (), {})
-        default_style_element.rPr = \
-            self.paragraph.part.document.styles.element.xpath(
-                'w:docDefaults/w:rPrDefault/w:rPr')[0]
-        default_style_element.pPr = \
-            self.paragraph.part.document.styles.element.xpath(
-                'w:docDefaults/w:pPrDefault/w:pPr')[0]
-        default_style = _ParagraphStyle(default_style_element)
-        return default_style
-
-    @cached_property
-    def _styles(self) -> list[_ParagraphStyle]:
-        styles = [self.paragraph.style]
-        while styles[-1].base_style:
-            styles.append(styles[-1].base_style)
-        styles.append(self._default_style)
-        return styles
-
-    @cached_property
-    def _is_contextual_spacing(self) -> bool:
-        contextual_spacing = False
-        pPrs = [self.paragraph.paragraph_format._element.pPr] + \
-               [style._element.pPr for style in self._styles]
-        for pPr in pPrs:
-            if pPr.xpath("./w:contextualSpacing"):
-                contextual_spacing = True
-                break
-        return contextual_spacing
-
-    def count_lines(self, runs: list[Run], max_width: Length, docx_font: DocxFont, first_line_indent: Length,
-                    is_mono: bool = False):
-        lines = 1
-        line_width = first_line_indent
+        self._style_resolver = style_resolver or get_style_resolver(paragraph.part.document)
+        self._style = self._style_resolver.style(paragraph)
+        self._previous_style = self._style_resolver.style(previous_paragraph) if previous_paragraph else None
+        self.same_style_as_previous = \
+            (self._style.style_id == self._previous_style.style_id) if previous_paragraph else False
 
-        space_width = Font(docx_font.name, docx_font.bold, docx_font.italic, docx_font.size.pt).get_text_width(" ")
+    def count_lines(self, runs: list[Run], max_width: Length, docx_font: ResolvedFont | DocxFont, first_line_indent: Length,
+                    is_mono: bool = False):
+        if isinstance(docx_font, DocxFont):
+            docx_font = ResolvedFont().overlay(docx_font)
+
+        run_texts, run_fonts = self._get_run_texts_and_fonts([run._r for run in runs], docx_font)
+        words = self._measure_words(run_texts, run_fonts, docx_font, is_mono)
+        return words.wrap(max_width, first_line_indent).count
+
+    def _get_run_texts_and_fonts(self, runs: list[CT_R], docx_font: ResolvedFont)\
+            -> tuple[list[str], list[ResolvedFont]]:
+        run_texts = []
+        run_fonts = []
+        for r in runs:
+            run_text = r.text
+            if run_text == "" and r.find(_NO_BREAK_HYPHEN) is not None:
+                run_text = "-"
+            run_texts.append(run_text)
+            run_fonts.append(self._style_resolver.run_font(docx_font, r))
+        return run_texts, run_fonts
+
+    @staticmethod
+    def _measure_words(run_texts: list[str], run_fonts: list[ResolvedFont], docx_font: ResolvedFont,
+                       is_mono: bool) -> MeasuredWords:
+        space_width = get_font(docx_font).get_text_width(" ")
         if not is_mono:
             space_width *= 0.81
 
+        words = []
+        word_start = None
         word_part = ""
         word_parts_widths = [0]
         spaces = 0
-        for i, run in enumerate(runs):
+        offset = 0
+        for i, (run_text, run_font) in enumerate(zip(run_texts, run_fonts)):
             if word_part:
                 word_part = ""
                 word_parts_widths.append(0)
 
-            run_docx_font = merge_objects(
-                docx_font,
-                run.font
-            )
-            font = Font(run_docx_font.name, run_docx_font.bold, run_docx_font.italic, run_docx_font.size.pt)
+            font = get_font(run_font)
 
-            run_text = run.text
-            if run_text == "" and run._element.xpath("w:noBreakHyphen"):
-                run_text = "-"
-            if i == len(runs) - 1:
+            if i == len(run_texts) - 1:
                 run_text += " "  # add space to the end of the last run, so it adds the last word
 
-            for c in run_text:
-                if c == " ":
-                    if any(word_parts_widths):
-                        width = spaces*space_width + sum(word_parts_widths)
-                        if width <= max_width - line_width:
-                            line_width += width
-                        elif width > max_width - first_line_indent:
-                            if lines == 1 and line_width == first_line_indent and not spaces:
-                                lines += ceil((width - (max_width - first_line_indent)) / max_width)
-                                line_width = (width - (max_width - first_line_indent)) % max_width
-                            else:
-                                lines += ceil(width / max_width)
-                                line_width = width % max_width
-                        else:
-                            lines += 1
-                            line_width = sum(word_parts_widths)
-
-                        word_part = ""
-                        word_parts_widths = [0]
-                        spaces = 1
+            # word segments of the run are measured at once
+            segments = run_text.split(" ")
+            segments_widths = font.get_text_widths(segments)
+            for j, segment in enumerate(segments):
+                if segment:
+                    if word_start is None:
+                        word_start = offset
+                    if word_part:  # continues a zero-width word part
+                        word_part += segment
+                        word_parts_widths[-1] = font.get_text_width(word_part)
                     else:
-                        spaces += 1
+                        word_part = segment
+                        word_parts_widths[-1] = segments_widths[j]
+                offset += len(segment)
+                if j == len(segments) - 1:
+                    break
+                offset += 1
+
+                # a space follows the segment
+                if any(word_parts_widths):
+                    words.append((word_start, spaces, sum(word_parts_widths)))
+
+                    word_start = None
+                    word_part = ""
+                    word_parts_widths = [0]
+                    spaces = 1
                 else:
-                    word_part += c
-                    word_parts_widths[-1] = font.get_text_width(word_part)
+                    spaces += 1
+
+        return MeasuredWords(words, space_width)
 
-        return int(lines)
+    def _measure_mono_words(self, run_texts: list[str], run_fonts: list[ResolvedFont],
+                            docx_font: ResolvedFont) -> MeasuredWords | None:
+        """Measures words by counting characters if all runs have the same monospace font advance"""
+        advance = get_font(docx_font).mono_advance
+        for run_font in set(run_fonts):
+            font = get_font(run_font)
+            if not font.is_mono or font.mono_advance != advance:
+                return None
+
+        cell_width = Pt(advance / 64)
+
+        text = "".join(run_texts)
+        simple = text.isascii() and "\t" not in text
+
+        words = []
+        tabbed: dict[int, list[float]] = {}  # tabs are resolved on wrapping, as tab stops depend on the line
+        word_end = 0
+        spaces = 0
+        for match in _WORD.finditer(text):
+            word_start = match.start()
+            spaces += word_start - word_end
+            word_end = match.end()
+            if simple:
+                cells = word_end - word_start
+            elif "\t" in match.group():
+                parts = tabbed[len(words)] = [Pt(_count_cells(part) * advance / 64)
+                                              for part in match.group().split("\t")]
+                words.append((word_start, spaces, sum(parts)))
+                spaces = 0
+                continue
+            else:
+                cells = _count_cells(match.group())
+            if cells:
+                words.append((word_start, spaces, Pt(cells * advance / 64)))
+                spaces = 0
+
+        return MeasuredWords(words, cell_width, self._style_resolver.default_tab_stop, tabbed)
+
+    def _get_measured_words(self, runs: list[CT_R], docx_font: ResolvedFont, is_mono: bool) -> MeasuredWords:
+        """Returns measured words of the paragraph, which are cached while the paragraph text and fonts are same"""
+        run_texts, run_fonts = self._get_run_texts_and_fonts(runs, docx_font)
+        key = (docx_font, tuple(run_texts), tuple(run_fonts))
+        cached = _measured_words.get(self.paragraph._p)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        words = None
+        if is_mono:
+            words = self._measure_mono_words(run_texts, run_fonts, docx_font)
+        if words is None:
+            words = self._measure_words(run_texts, run_fonts, docx_font, is_mono)
+        _measured_words[self.paragraph._p] = (key, words)
+        return words
+
+    @staticmethod
+    def size_many(paragraphs: list[Paragraph], widths: list[Length],
+                  previous_paragraph: Paragraph | None = None) -> list[ParagraphSizerResult]:
+        """Sizes the paragraphs in one pass, each paragraph is the previous one of the next"""
+        if not paragraphs:
+            return []
+
+        style_resolver = get_style_resolver(paragraphs[0].part.document)
+        previous_paragraph_format = \
+            style_resolver.paragraph_format(previous_paragraph) if previous_paragraph else None
+
+        results = []
+        for paragraph, width in zip(paragraphs, widths):
+            sizer = ParagraphSizer(paragraph, previous_paragraph, width, style_resolver=style_resolver)
+            paragraph_format = style_resolver.paragraph_format(paragraph, sizer._style)
+            results.append(sizer._calculate_height(paragraph_format, previous_paragraph_format))
+            previous_paragraph, previous_paragraph_format = paragraph, paragraph_format
+        return results
+
+    @staticmethod
+    def get_texts_to_measure(paragraphs: list[Paragraph]) -> dict[tuple, set[str]]:
+        """Returns texts the sizing of the paragraphs will measure, grouped by the font face key"""
+        if not paragraphs:
+            return {}
+
+        style_resolver = get_style_resolver(paragraphs[0].part.document)
+        texts: dict[tuple, set[str]] = {}
+        for paragraph in paragraphs:
+            sizer = ParagraphSizer(paragraph, None, 0, style_resolver=style_resolver)
+            docx_font = sizer._style.font
+            run_texts, run_fonts = sizer._get_run_texts_and_fonts(list(paragraph._element.iter(_R)), docx_font)
+            if run_texts:
+                run_texts[-1] += " "  # as in _measure_words
+            for run_text, run_font in zip(run_texts, run_fonts):
+                font = get_font(run_font)
+                if not font.is_mono and font.face_key is not None:
+                    texts.setdefault(font.face_key, set()).update(run_text.split(" "))
+            font = get_font(docx_font)
+            if not font.is_mono and font.face_key is not None:
+                texts.setdefault(font.face_key, set()).add(" ")  # space width
+        return texts
 
     def calculate_height(self) -> ParagraphSizerResult:
+        previous_paragraph_format = None
+        if self.previous_paragraph:
+            previous_paragraph_format = self._style_resolver.paragraph_format(self.previous_paragraph,
+                                                                              self._previous_style)
+
+        return self._calculate_height(self._style_resolver.paragraph_format(self.paragraph, self._style),
+                                      previous_paragraph_format)
+
+    def _calculate_height(self, paragraph_format: ResolvedParagraphFormat,
+                          previous_paragraph_format: ResolvedParagraphFormat | None) -> ParagraphSizerResult:
+        """Returns the cached result if the same paragraph was sized in the same conditions before"""
+        key = (etree.tostring(self.paragraph._p), self._style, self.max_width, self._tabs_size,
+               self._previous_style.style_id if self._previous_style else None,
+               previous_paragraph_format.space_after if previous_paragraph_format else None,
+               os.environ.get("METRICS_PACK"))
+        result = _sizing_results.get(key)
+        if result is not None:
+            _sizing_results.move_to_end(key)
+            return result
+
+        result = _sizing_results[key] = self._size(paragraph_format, previous_paragraph_format)
+        if len(_sizing_results) > SIZING_CACHE_SIZE:
+            _sizing_results.popitem(last=False)
+        return result
+
+    def _size(self, paragraph_format: ResolvedParagraphFormat,
+              previous_paragraph_format: ResolvedParagraphFormat | None) -> ParagraphSizerResult:
         max_width = self.max_width
 
-        docx_font: DocxFont = merge_objects(
-            *[style.font for style in self._styles[::-1] if style.font],
-            self.paragraph.style.font)
-
-        paragraph_format: ParagraphFormat = merge_objects(
-            *[style.paragraph_format for style in self._styles[::-1]
-              if style.paragraph_format],
-            self.paragraph.paragraph_format
-        )
+        docx_font = self._style.font
 
         max_width -= (paragraph_format.left_indent or 0) + \
             (paragraph_format.right_indent or 0)
 
-        font = Font(docx_font.name, docx_font.bold, docx_font.italic, docx_font.size.pt)
+        font = get_font(docx_font)
 
         # here self.paragraph.runs is not used because
         # it does not always return all runs (e.g. if they are inside hyperlink)
-        runs = []
-        for element in self.paragraph._element.getiterator():
-            if isinstance(element, CT_R):
-                runs.append(Run(element, self.paragraph))
+        runs = list(self.paragraph._element.iter(_R))
 
-        lines = self.count_lines(runs, max_width, docx_font,
-                                 (paragraph_format.first_line_indent or 0) + self._tabs_size,
-                                 font.is_mono)
+        line_breaks = self._get_measured_words(runs, docx_font, font.is_mono)\
+            .wrap(max_width, (paragraph_format.first_line_indent or 0) + self._tabs_size)
+        lines = line_breaks.count
 
-        previous_paragraph_format: ParagraphFormat = None
-        if self.previous_paragraph:
-            previous_paragraph_styles = [self.previous_paragraph.style]
-            while previous_paragraph_styles[-1].base_style:
-                previous_paragraph_styles.append(
-                    previous_paragraph_styles[-1].base_style
-                )
-            previous_paragraph_styles.append(self._default_style)
-            previous_paragraph_format = merge_objects(
-                *[style.paragraph_format for style in previous_paragraph_styles[::-1]
-                    if style.paragraph_format],
-                self.previous_paragraph.paragraph_format
-            )
-
-        if self._is_contextual_spacing and self.same_style_as_previous:
+        if self.same_style_as_previous and self._style_resolver.is_contextual_spacing(self.paragraph, self._style):
             before = (previous_paragraph_format.space_after or 0)
         else:
             before = (paragraph_format.space_before or 0)
@@ -230,4 +429,5 @@ class ParagraphSizer:
         elif paragraph_format.line_spacing_rule == WD_LINE_SPACING.AT_LEAST:
             raise NotImplementedError("Line spacing rule AT_LEAST is not supported")
 
-        return ParagraphSizerResult(before, lines, line_height, line_spacing, after)
+        return ParagraphSizerResult(before, lines, line_height, line_spacing, after, line_breaks,
+                                    bool(paragraph_format.keep_together))
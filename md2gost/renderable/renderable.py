@@ -11,5 +11,14 @@ class Renderable(ABC):
             -> Generator[RenderedInfo | Renderable, None, None]:
         """Renders the object to one or multiple Parented objects or Renderables to be rendered on the next page"""
 
+    def content_hash(self) -> bytes | None:
+        """Returns a hash of everything the rendering depends on except the layout state and the previous element,
+        None if the rendered elements can't be reused from the layout cache"""
+        return None
+
+    def get_sized_paragraphs(self) -> list:
+        """Returns docx paragraphs sized when rendering, so they can be measured in advance"""
+        return []
+
     def added_to_document(self):
         pass
@@ -1,7 +1,7 @@
-from copy import copy
 from typing import Generator
 
 from docx.shared import Parented, Pt, Twips
+from docx.text.paragraph import Paragraph as DocxParagraph
 
 from . import Paragraph
 from .caption import Caption, CaptionInfo
@@ -10,22 +10,24 @@ from .requires_numbering import RequiresNumbering
 from ..docx_elements import *
 from ..layout_tracker import LayoutState
 from ..rendered_info import RenderedInfo
+from ..style_resolver import get_style_resolver
+from ..util import hash_content
 
 CELL_OFFSET = Pt(10)
 
 
 class Table(Renderable, RequiresNumbering):
+    NUMBERING_CATEGORY = "Таблица"
+
     def __init__(self, parent: Parented, rows: int, cols: int, caption_info: CaptionInfo):
-        super().__init__("Таблица", caption_info.unique_name if caption_info else None)
+        super().__init__(self.NUMBERING_CATEGORY, caption_info.unique_name if caption_info else None)
         self._parent = parent
         self._caption_info = caption_info
         self._cols = cols
 
         sect = parent.part.document.sections[-1]
 
-        # todo: style inheritance
-        left_margin = Twips(int(parent.part.styles["Normal Table"]._element.xpath("w:tblPr/w:tblCellMar/w:left")[0].attrib["{http://schemas.openxmlformats.org/wordprocessingml/2006/main}w"]))
-        right_margin = Twips(int(parent.part.styles["Normal Table"]._element.xpath("w:tblPr/w:tblCellMar/w:right")[0].attrib["{http://schemas.openxmlformats.org/wordprocessingml/2006/main}w"]))
+        left_margin, right_margin = get_style_resolver(parent.part.document).table_cell_margins("Normal Table")
 
         self._table_width = sect.page_width - sect.left_margin - sect.right_margin + left_margin + right_margin
         self._number = "?"
@@ -44,12 +46,22 @@ class Table(Renderable, RequiresNumbering):
     def set_number(self, number):
         self._number = number
 
+    def content_hash(self) -> bytes | None:
+        return hash_content(self._caption_info, self._number, self._cols, self._table_width,
+                            *[part for row in self._rows for cell in row
+                              for part in ("cell", *[paragraph._docx_paragraph._p for paragraph in cell])])
+
+    def get_sized_paragraphs(self) -> list[DocxParagraph]:
+        return [paragraph._docx_paragraph for row in self._rows for cell in row for paragraph in cell]
+
     def render(self, previous_rendered: RenderedInfo, layout_state: LayoutState)\
             -> Generator[RenderedInfo | Renderable, None, None]:
+        snapshot = layout_state.snapshot()
         caption_rendered_infos = list(
             Caption(self._parent, "Таблица", self._caption_info, self._number, True)
-            .render(previous_rendered, copy(layout_state))
+            .render(previous_rendered, layout_state)
         )
+        layout_state.restore(snapshot)
         layout_state.add_height(sum([info.height for info in caption_rendered_infos]))
         yield from caption_rendered_infos
 
@@ -57,6 +69,9 @@ class Table(Renderable, RequiresNumbering):
 
         table_height = Pt(0.5)  # top border
 
+        cell_layout_state = LayoutState(layout_state.max_height, self._table_width / self._cols - CELL_OFFSET)
+        cell_snapshot = cell_layout_state.snapshot()
+
         for row in self._rows:
             docx_row = create_table_row(docx_table)
             row_height = 0
@@ -64,10 +79,7 @@ class Table(Renderable, RequiresNumbering):
                 docx_cell = create_table_cell(docx_row, self._table_width / self._cols)
                 cell_height = 0
                 for paragraph in row[i]:
-                    cell_layout_state = LayoutState(
-                        layout_state.max_height, layout_state.max_width
-                    )
-                    cell_layout_state.max_width = self._table_width / self._cols - CELL_OFFSET
+                    cell_layout_state.restore(cell_snapshot)
                     for paragraph_rendered_info in paragraph.render(None, cell_layout_state):
                         docx_cell._element.append(paragraph_rendered_info.docx_element._element)
                         cell_height += paragraph_rendered_info.height
@@ -88,8 +100,9 @@ class Table(Renderable, RequiresNumbering):
                 continuation_paragraph.first_line_indent = 0
                 continuation_paragraph.page_break_before = True
 
-                continuation_rendered_info = next(
-                    continuation_paragraph.render(None, copy(layout_state)))
+                snapshot = layout_state.snapshot()
+                continuation_rendered_info = next(continuation_paragraph.render(None, layout_state))
+                layout_state.restore(snapshot)
 
                 layout_state.add_height(continuation_rendered_info.height)
                 yield continuation_rendered_info
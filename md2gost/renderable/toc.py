@@ -1,13 +1,15 @@
-from copy import copy
 from typing import Generator
 
 from docx.enum.text import WD_TAB_LEADER, WD_TAB_ALIGNMENT, WD_PARAGRAPH_ALIGNMENT
-from docx.shared import Parented, Cm
+from docx.shared import Length, Parented, Cm
+from docx.text.paragraph import Paragraph as DocxParagraph
 from docx.text.run import Run
 
 from . import Paragraph
+from .paragraph_sizer import ParagraphSizer
 from .renderable import Renderable
 from ..layout_tracker import LayoutState
+from ..pagination import BlockArray, PAGE_BREAK_BEFORE, paginate
 from ..rendered_info import RenderedInfo
 from ..util import create_element
 
@@ -75,11 +77,25 @@ class ToC(Renderable):
     def set_page(self, index: int, page: int):
         self._paragraphs[index].add_run(str(page))
 
+    def get_sized_paragraphs(self) -> list[DocxParagraph]:
+        return [paragraph._docx_paragraph for paragraph in self._paragraphs]
+
     def render(self, previous_rendered: RenderedInfo, layout_state: LayoutState)\
             -> Generator[RenderedInfo | Renderable, None, None]:
-        for paragraph in self._paragraphs:
-            paragraph_rendered_infos = list(
-                paragraph.render(previous_rendered, copy(layout_state)))
-            layout_state.add_height(sum([info.height for info in paragraph_rendered_infos]))
-            yield from paragraph_rendered_infos
-            previous_rendered = paragraph_rendered_infos[-1]
+        if self._paragraphs:
+            self._paragraphs[0].prepare(previous_rendered)
+        heights_data = ParagraphSizer.size_many(
+            [paragraph._docx_paragraph for paragraph in self._paragraphs],
+            [layout_state.max_width] * len(self._paragraphs),
+            previous_rendered.docx_element
+            if previous_rendered and isinstance(previous_rendered.docx_element, DocxParagraph) else None)
+
+        # the paragraphs are paginated in one pass
+        blocks = BlockArray()
+        for paragraph, height_data in zip(self._paragraphs, heights_data):
+            height_data.to_block(blocks, PAGE_BREAK_BEFORE if paragraph.page_break_before else 0)
+        heights, _ = paginate(blocks, layout_state.max_height, layout_state.current_height)
+
+        for paragraph, height in zip(self._paragraphs, heights):
+            layout_state.add_height(height)
+            yield RenderedInfo(paragraph._docx_paragraph, Length(height))
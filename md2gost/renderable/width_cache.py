@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from threading import Lock
+
+from docx.shared import Length
+
+
+@dataclass(frozen=True)
+class WidthCacheInfo:
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.
+
+
+class WidthCache:
+    """Thread-safe LRU cache of text widths keyed by (font key, text)"""
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._widths: OrderedDict[tuple[Hashable, str], Length] = OrderedDict()
+        self._lock = Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int):
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+
+    def get_widths(self, font_key: Hashable, texts: list[str],
+                   measure: Callable[[list[str]], list[Length]]) -> list[Length]:
+        """Returns cached widths of the texts, the missing ones are measured by one measure() call"""
+        widths: list[Length | None] = []
+        missing: dict[str, list[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = (font_key, text)
+                width = self._widths.get(key)
+                if width is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._widths.move_to_end(key)
+                widths.append(width)
+            misses = sum(len(indexes) for indexes in missing.values())
+            self._misses += misses
+            self._hits += len(texts) - misses
+
+        if not missing:
+            return widths
+
+        measured = measure(list(missing))
+
+        with self._lock:
+            for (text, indexes), width in zip(missing.items(), measured):
+                for i in indexes:
+                    widths[i] = width
+                self._widths[(font_key, text)] = width
+            self._evict()
+
+        return widths
+
+    def get_missing(self, font_key: Hashable, texts: list[str]) -> list[str]:
+        """Returns the texts which widths are not cached, without counting hits and misses"""
+        with self._lock:
+            return [text for text in dict.fromkeys(texts) if (font_key, text) not in self._widths]
+
+    def put_widths(self, font_key: Hashable, texts: list[str], widths: list[Length]):
+        """Adds widths measured elsewhere, e.g. in another process"""
+        with self._lock:
+            for text, width in zip(texts, widths):
+                self._widths[(font_key, text)] = width
+            self._evict()
+
+    def _evict(self):
+        while len(self._widths) > self._maxsize:
+            self._widths.popitem(last=False)
+            self._evictions += 1
+
+    def info(self) -> WidthCacheInfo:
+        with self._lock:
+            return WidthCacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._widths))
+
+    def clear(self):
+        with self._lock:
+            self._widths.clear()
+            self._hits = self._misses = self._evictions = 0
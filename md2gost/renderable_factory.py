@@ -25,6 +25,23 @@ class RenderableFactory:
         logging.getLogger("md2gost").warning(f"{marko_element.get_type()} не поддерживается")
         yield paragraph
 
+    @staticmethod
+    def get_numbered_names(marko_element: extended_markdown.BlockElement, caption_info: CaptionInfo | None)\
+            -> Generator[tuple[str, str | None], None, None]:
+        """Yields numbering categories and unique names of the elements created from the marko element,
+        without creating them"""
+        unique_name = caption_info.unique_name if caption_info else None
+        if isinstance(marko_element, extended_markdown.Paragraph):
+            for child in marko_element.children:
+                if isinstance(child, extended_markdown.Image):
+                    yield Image.NUMBERING_CATEGORY, child.unique_name
+        elif isinstance(marko_element, (extended_markdown.FencedCode, extended_markdown.CodeBlock)):
+            yield Listing.NUMBERING_CATEGORY, unique_name
+        elif isinstance(marko_element, extended_markdown.Equation):
+            yield Equation.NUMBERING_CATEGORY, unique_name
+        elif isinstance(marko_element, extended_markdown.Table):
+            yield Table.NUMBERING_CATEGORY, unique_name
+
     @staticmethod
     def _create_runs(paragraph_or_link: Paragraph | Link, children, classes: list[type] = None):
         if not classes:
@@ -1,11 +1,19 @@
+import logging
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
 from docx.document import Document
+from docx.oxml import CT_P, CT_Tbl
+from docx.oxml.xmlchemy import BaseOxmlElement
 from docx.shared import Length, Cm, Parented, Pt
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.table import Table
+from docx.text.paragraph import Paragraph
 
 from .renderable import Renderable
-from .util import create_element
+from .rendered_info import RenderedInfo
+from .util import create_element, hash_content
+from .layout_cache import LayoutCache
 from .layout_tracker import LayoutTracker
 
 if TYPE_CHECKING:
@@ -15,12 +23,39 @@ if TYPE_CHECKING:
 class Renderer:
     """Renders Renderable elements to docx file"""
 
-    def __init__(self, document: Document, layout_tracker: LayoutTracker, debugger: "Debugger | None" = None):
+    def __init__(self, document: Document, layout_tracker: LayoutTracker, debugger: "Debugger | None" = None,
+                 layout_cache: LayoutCache | None = None):
         self._document: Document = document
         self._debugger = debugger
         self._layout_tracker = layout_tracker
+        self._layout_cache = layout_cache
 
-        # add page numbering to the footer
+        self.previous_rendered = None
+        self._previous_hash = None
+
+    def process(self, renderables: Iterable[Renderable]):
+        """The renderables can be generated, so each of them can be released after it's rendered"""
+        if self._layout_cache:
+            self._layout_cache.start()
+
+        count = 0
+        for renderable in renderables:
+            self.render(renderable)
+            count += 1
+
+        if self._layout_cache:
+            self._layout_cache.finish()
+            logging.getLogger("md2gost").debug(
+                f"Layout cache: reused {self._layout_cache.reused} of {count} blocks")
+
+        # the footer is added after the renderables are created, as they can be generated while rendering,
+        # so relationship ids of the document are the same either way
+        self._add_page_numbering()
+
+        if self._debugger:
+            self._debugger.after_rendered(self._layout_tracker.page_map)
+
+    def _add_page_numbering(self):
         paragraph = self._document.sections[-1].footer.paragraphs[0]
         paragraph.paragraph_format.first_line_indent = 0
         paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -28,30 +63,57 @@ class Renderer:
             "w:instr": "PAGE \\* MERGEFORMAT"
         }))
 
-        self.previous_rendered = None
-
-    def process(self, renderables: list[Renderable]):
-        for i in range(len(renderables)):
-            self.render(renderables[i])
+    def render(self, renderable: Renderable, flush=True):
+        layout_state = self._layout_tracker.current_state
 
-        if self._debugger:
-            self._debugger.after_rendered()
+        key = None
+        if self._layout_cache and (content_hash := renderable.content_hash()) is not None:
+            key = LayoutCache.get_key(content_hash, self._previous_hash, layout_state)
+            cached = self._layout_cache.get(key)
+            if cached is not None:
+                for element, height in cached:
+                    self._add_rendered(RenderedInfo(self._wrap(element), height))
+                return
 
-    def render(self, renderable: Renderable, flush=True):
-        infos = renderable.render(self.previous_rendered, self._layout_tracker.current_state)
+        infos = renderable.render(self.previous_rendered, layout_state)
 
+        rendered_infos = []
         for info in infos:
             if isinstance(info, Renderable):
                 raise NotImplementedError()
             else:
-                self._add(info.docx_element, info.height)
-                self.previous_rendered = info
+                self._add_rendered(info)
+                rendered_infos.append(info)
+
+        if key is not None:
+            self._layout_cache.put(key, [(info.docx_element._element, info.height) for info in rendered_infos])
+
+    def _wrap(self, element: BaseOxmlElement) -> Parented:
+        if isinstance(element, CT_Tbl):
+            return Table(element, self._document._body)
+        if isinstance(element, CT_P):
+            return Paragraph(element, self._document._body)
+        raise ValueError(f"Unexpected cached element {element.tag}")
+
+    @staticmethod
+    def _hash_previous(element: Parented) -> bytes:
+        """Returns a hash of what the rendering of the next block uses from the previous element"""
+        if isinstance(element, Paragraph):
+            # its style and formatting are used for spacing, and an empty line is checked before headings
+            return hash_content(element._p.pPr, element.text == "\n")
+        return hash_content(type(element).__name__)
+
+    def _add_rendered(self, info: RenderedInfo):
+        self._add(info.docx_element, info.height)
+        self.previous_rendered = info
+        if self._layout_cache:
+            self._previous_hash = self._hash_previous(info.docx_element)
 
     def _add(self, element: Parented, height: Length):
         self._document._body._element.append(
             element._element
         )
-        self._layout_tracker.add_height(height)
+        self._layout_tracker.add_height(height, element._element)
 
         if self._debugger:
             self._debugger.add(element, height)
@@ -0,0 +1,255 @@
+from functools import cached_property
+from weakref import WeakKeyDictionary
+
+from docx.document import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import CT_R
+from docx.oxml.ns import qn
+from docx.oxml.text.font import CT_RPr
+from docx.shared import Length, Twips
+from docx.styles.style import _ParagraphStyle
+from docx.text.font import Font as DocxFont
+from docx.text.paragraph import Paragraph
+from docx.text.parfmt import ParagraphFormat
+
+DEFAULT_TAB_STOP = Twips(720)
+
+_PPR, _PSTYLE, _RPR, _VAL = qn("w:pPr"), qn("w:pStyle"), qn("w:rPr"), qn("w:val")
+_RFONTS, _ASCII, _SZ, _B, _I = qn("w:rFonts"), qn("w:ascii"), qn("w:sz"), qn("w:b"), qn("w:i")
+_CONTEXTUAL_SPACING = qn("w:contextualSpacing")
+
+# pPr children of the paragraph format properties
+_FORMAT_TAGS = {
+    "alignment": qn("w:jc"),
+    "first_line_indent": qn("w:ind"),
+    "keep_together": qn("w:keepLines"),
+    "keep_with_next": qn("w:keepNext"),
+    "left_indent": qn("w:ind"),
+    "line_spacing": qn("w:spacing"),
+    "line_spacing_rule": qn("w:spacing"),
+    "page_break_before": qn("w:pageBreakBefore"),
+    "right_indent": qn("w:ind"),
+    "space_after": qn("w:spacing"),
+    "space_before": qn("w:spacing"),
+    "widow_control": qn("w:widowControl"),
+}
+
+
+class ResolvedFont:
+    """Font with the style inheritance applied"""
+    __slots__ = ("name", "size", "bold", "italic")
+
+    def __init__(self, name=None, size=None, bold=None, italic=None):
+        self.name = name
+        self.size = size
+        self.bold = bold
+        self.italic = italic
+
+    def overlay(self, font: DocxFont) -> "ResolvedFont":
+        """Returns the font with the values of font that are set"""
+        resolved = ResolvedFont(self.name, self.size, self.bold, self.italic)
+        for name in self.__slots__:
+            if (value := getattr(font, name)) is not None:
+                setattr(resolved, name, value)
+        return resolved
+
+    def __eq__(self, other):
+        return isinstance(other, ResolvedFont) and \
+            (self.name, self.size, self.bold, self.italic) == (other.name, other.size, other.bold, other.italic)
+
+    def __hash__(self):
+        return hash((self.name, self.size, self.bold, self.italic))
+
+
+class ResolvedParagraphFormat:
+    """Paragraph format with the style inheritance applied"""
+    __slots__ = ("alignment", "first_line_indent", "keep_together", "keep_with_next", "left_indent",
+                 "line_spacing", "line_spacing_rule", "page_break_before", "right_indent", "space_after",
+                 "space_before", "widow_control")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    def overlay(self, paragraph_format: ParagraphFormat, tags: set[str] | None = None) -> "ResolvedParagraphFormat":
+        """Returns the format with the values of paragraph_format that are set.
+        If tags of the pPr children are given, only the properties stored in them are read."""
+        resolved = ResolvedParagraphFormat()
+        for name in self.__slots__:
+            value = getattr(paragraph_format, name) if tags is None or _FORMAT_TAGS[name] in tags else None
+            setattr(resolved, name, value if value is not None else getattr(self, name))
+        return resolved
+
+    def items(self):
+        return ((name, getattr(self, name)) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, ResolvedParagraphFormat) and tuple(self.items()) == tuple(other.items())
+
+    def __hash__(self):
+        return hash(tuple(self.items()))
+
+
+class ResolvedStyle:
+    """Paragraph style flattened with its base styles and document defaults"""
+    __slots__ = ("style_id", "font", "paragraph_format", "contextual_spacing")
+
+    def __init__(self, style_id: str | None, font: ResolvedFont, paragraph_format: ResolvedParagraphFormat,
+                 contextual_spacing: bool):
+        self.style_id = style_id
+        self.font = font
+        self.paragraph_format = paragraph_format
+        self.contextual_spacing = contextual_spacing
+
+    def _values(self) -> tuple:
+        return self.style_id, self.font, self.paragraph_format, self.contextual_spacing
+
+    def __eq__(self, other):
+        # styles of different documents are equal if they resolve to the same formatting, e.g. in --watch mode
+        return isinstance(other, ResolvedStyle) and self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+
+def get_run_signature(rPr: CT_RPr) -> tuple:
+    """Returns the run properties that affect the font, runs with the same signature share it"""
+    rFonts, sz, b, i = rPr.find(_RFONTS), rPr.find(_SZ), rPr.find(_B), rPr.find(_I)
+    return (rFonts.get(_ASCII) if rFonts is not None else None, sz.get(_VAL) if sz is not None else None,
+            b.val if b is not None else None, i.val if i is not None else None)
+
+
+def _get_style_id(p) -> str | None:
+    pPr = p.find(_PPR)
+    if pPr is None:
+        return None
+    pStyle = pPr.find(_PSTYLE)
+    return pStyle.get(_VAL) if pStyle is not None else None
+
+
+class StyleResolver:
+    """Resolves the formatting of paragraphs and runs, each style is compiled once"""
+
+    def __init__(self, document: Document):
+        self._document = document
+        self._styles = document.styles
+
+        default_style_element = type("DefaultStyle", (), {})
+        default_style_element.rPr = self._styles.element.xpath('w:docDefaults/w:rPrDefault/w:rPr')[0]
+        default_style_element.pPr = self._styles.element.xpath('w:docDefaults/w:pPrDefault/w:pPr')[0]
+        self._default_style = _ParagraphStyle(default_style_element)
+
+        # styles by the style id of paragraphs (None is the default style)
+        self._resolved: dict[str | None, ResolvedStyle] = {}
+        self._resolved_by_name: dict[str, ResolvedStyle] = {}
+        self._table_cell_margins: dict[str, tuple[Twips, Twips]] = {}
+        self._style_ids: dict[tuple[str, WD_STYLE_TYPE], str | None] = {}
+        # interned run fonts by the paragraph font and run signature
+        self._run_fonts: dict[tuple[ResolvedFont, tuple], ResolvedFont] = {}
+
+    @cached_property
+    def default_tab_stop(self) -> Length:
+        default_tab_stop = self._document.settings.element.find(qn("w:defaultTabStop"))
+        if default_tab_stop is None:
+            return DEFAULT_TAB_STOP
+        return Twips(int(default_tab_stop.get(qn("w:val"))))
+
+    def _compile(self, style: _ParagraphStyle) -> ResolvedStyle:
+        styles = [style]
+        while styles[-1].base_style:
+            styles.append(styles[-1].base_style)
+        styles.append(self._default_style)
+
+        font = ResolvedFont()
+        paragraph_format = ResolvedParagraphFormat()
+        for style_ in styles[::-1]:
+            font = font.overlay(style_.font)
+            paragraph_format = paragraph_format.overlay(style_.paragraph_format)
+
+        contextual_spacing = any(
+            style_._element.pPr is not None and style_._element.pPr.xpath("./w:contextualSpacing")
+            for style_ in styles
+        )
+        return ResolvedStyle(style.style_id, font, paragraph_format, contextual_spacing)
+
+    def style(self, paragraph: Paragraph) -> ResolvedStyle:
+        style_id = _get_style_id(paragraph._p)
+        resolved = self._resolved.get(style_id)
+        if resolved is None:
+            resolved = self._resolved[style_id] = self._compile(paragraph.style)
+        return resolved
+
+    def style_by_name(self, name: str) -> ResolvedStyle:
+        resolved = self._resolved_by_name.get(name)
+        if resolved is None:
+            style = self._styles[name]
+            resolved = self._resolved.get(style.style_id)
+            if resolved is None:
+                resolved = self._resolved[style.style_id] = self._compile(style)
+            self._resolved_by_name[name] = resolved
+        return resolved
+
+    def style_id(self, name: str, style_type: WD_STYLE_TYPE = WD_STYLE_TYPE.PARAGRAPH) -> str | None:
+        """Returns the id python-docx assigns for the named style, None for the default style"""
+        key = (name, style_type)
+        if key not in self._style_ids:
+            self._style_ids[key] = self._styles.get_style_id(name, style_type)
+        return self._style_ids[key]
+
+    def font(self, paragraph: Paragraph) -> ResolvedFont:
+        return self.style(paragraph).font
+
+    def paragraph_format(self, paragraph: Paragraph, style: ResolvedStyle | None = None) -> ResolvedParagraphFormat:
+        """Returns the format of the style with the direct formatting of the paragraph"""
+        paragraph_format = (style or self.style(paragraph)).paragraph_format
+        pPr = paragraph._p.find(_PPR)
+        if pPr is None:
+            return paragraph_format
+        tags = {child.tag for child in pPr}
+        if tags.isdisjoint(_FORMAT_TAGS.values()):
+            return paragraph_format
+        return paragraph_format.overlay(paragraph.paragraph_format, tags)
+
+    def is_contextual_spacing(self, paragraph: Paragraph, style: ResolvedStyle | None = None) -> bool:
+        pPr = paragraph._p.find(_PPR)
+        return (style or self.style(paragraph)).contextual_spacing \
+            or (pPr is not None and pPr.find(_CONTEXTUAL_SPACING) is not None)
+
+    def run_font(self, font: ResolvedFont, r: CT_R) -> ResolvedFont:
+        """Returns the font with the direct formatting of the run, it's resolved once per run signature"""
+        rPr = r.find(_RPR)
+        if rPr is None:
+            return font
+        key = (font, get_run_signature(rPr))
+        resolved = self._run_fonts.get(key)
+        if resolved is None:
+            resolved = self._run_fonts[key] = font.overlay(DocxFont(r))
+        return resolved
+
+    def table_cell_margins(self, style_name: str) -> tuple[Twips, Twips]:
+        """Returns left and right cell margins of the table style"""
+        margins = self._table_cell_margins.get(style_name)
+        if margins is None:
+            style = self._styles[style_name]
+            margins = self._table_cell_margins[style_name] = \
+                (self._get_cell_margin(style, "left"), self._get_cell_margin(style, "right"))
+        return margins
+
+    @staticmethod
+    def _get_cell_margin(style, side: str) -> Twips:
+        while style is not None:
+            if cell_margin := style._element.xpath(f"w:tblPr/w:tblCellMar/w:{side}"):
+                return Twips(int(cell_margin[0].attrib[qn("w:w")]))
+            style = style.base_style
+        return Twips(0)
+
+
+_resolvers: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def get_style_resolver(document: Document) -> StyleResolver:
+    """Returns the style resolver of the document, shared by all its paragraphs"""
+    resolver = _resolvers.get(document.part)
+    if resolver is None:
+        resolver = _resolvers[document.part] = StyleResolver(document)
+    return resolver
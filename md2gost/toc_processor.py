@@ -1,3 +1,4 @@
+from .layout_tracker import PageMap
 from .renderable import Renderable
 from .renderable.heading import Heading
 from .renderable.toc import ToC
@@ -21,7 +22,8 @@ class TocPreProcessor:
 
 
 class TocPostProcessor:
-    def __init__(self, pages_offset: int = 0):
+    def __init__(self, page_map: PageMap, pages_offset: int = 0):
+        self._page_map = page_map
         self._pages_offset = pages_offset
 
     def process(self, renderables: list[Renderable]):
@@ -37,5 +39,6 @@ class TocPostProcessor:
             i = 0
             for renderable in renderables_iter:
                 if isinstance(renderable, Heading):
-                    toc.set_page(i, renderable.rendered_page + self._pages_offset)
+                    page = self._page_map.page_of(self._page_map.index_of(renderable.docx_element))
+                    toc.set_page(i, page + self._pages_offset)
                     i += 1
@@ -1,6 +1,8 @@
+from hashlib import blake2b
+
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
-from lxml.etree import _Element
+from lxml.etree import _Element, tostring
 
 
 def create_element(name: str, *args: dict[str, str] | list[_Element] | str)\
@@ -34,27 +36,10 @@ def create_element(name: str, *args: dict[str, str] | list[_Element] | str)\
     return element
 
 
-def merge_objects(*objects):
-    from inspect import getmembers, ismethod
-    """
-    Returns the new object containing attributes from objects, where the latest
-    one has the highest priority.
-    """
-
-    class MergedObject:
-        pass
-
-    merged_object = MergedObject()
-    for name, value in getmembers(objects[0]):
-        if name.startswith("_") or ismethod(value):
-            continue
-        merged_object.__setattr__(name, value)
-
-    for object_ in objects[1:]:
-        for name, value in getmembers(object_):
-            if name.startswith("_") or ismethod(value):
-                continue
-            if value is not None:
-                merged_object.__setattr__(name, value)
-
-    return merged_object
+def hash_content(*parts: _Element | object) -> bytes:
+    """Returns a digest of the elements' XML and the reprs of other values"""
+    digest = blake2b(digest_size=16)
+    for part in parts:
+        digest.update(tostring(part) if isinstance(part, _Element) else repr(part).encode())
+        digest.update(b"\0")
+    return digest.digest()
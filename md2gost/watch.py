@@ -0,0 +1,29 @@
+import time
+from collections.abc import Callable
+
+from .file_buffer import FileBuffer
+
+WATCH_INTERVAL = 0.5
+
+
+def watch(file_buffer: FileBuffer, convert: Callable[[], None], interval: float = WATCH_INTERVAL):
+    """Converts again when any file accessed by the conversion changes, until interrupted"""
+    mtimes = file_buffer.get_mtimes()
+    print("Отслеживание изменений, для выхода нажмите Ctrl+C")
+    try:
+        while True:
+            time.sleep(interval)
+            if file_buffer.get_mtimes() == mtimes:
+                continue
+
+            start = time.perf_counter()
+            try:
+                convert()
+            except Exception as e:
+                print(f"Ошибка: {e}")
+            else:
+                print(f"Документ обновлён за {time.perf_counter() - start:.2f} с")
+            # files can be added or removed by the change
+            mtimes = file_buffer.get_mtimes()
+    except KeyboardInterrupt:
+        pass
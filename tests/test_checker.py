@@ -0,0 +1,73 @@
+import unittest
+from io import BytesIO
+
+from md2gost.checker import Checker
+from md2gost.converter import Converter
+
+TEXT = """# Глава
+
+См. @goods, @sort, @indented, @pipe и @missing, `@code`, \\@escaped.
+
+%goods Продукты
+
+| Продукт | Цена |
+|---|---|
+| Хлеб | 30 |
+
+%goods Дубль
+
+$$
+2 + 2 = 4
+$$
+
+%sort Сортировка
+
+```java Sort.java
+@Override
+```
+
+![](nope.png "%img Картинка")
+
+%indented Листинг с отступом
+
+    @Override
+    public void run() {}
+
+%pipe Не таблица
+
+Выбор a | b в тексте.
+
+    @Indented
+"""
+
+
+class TestChecker(unittest.TestCase):
+    def test_same_warnings_as_conversion(self):
+        with self.assertLogs("md2gost") as conversion_logs:
+            Converter({"a.md": BytesIO(TEXT.encode("utf-8"))}, ["a.md"], "out.docx").convert()
+
+        checker = Checker({"a.md": BytesIO(TEXT.encode("utf-8"))})
+        with self.assertLogs("md2gost") as check_logs:
+            checker.scan("a.md")
+            warnings = checker.check()
+
+        self.assertEqual(sorted(conversion_logs.output), sorted(check_logs.output))
+        self.assertEqual(5, warnings)
+        self.assertEqual([(1, "Глава")], checker.headings)
+
+    def test_emails_and_urls(self):
+        text = "См. @goods. Пишите на me@example.com., <you@example.org> или https://example.com/@missing\n\n" \
+               "%goods Продукты\n\n| Продукт | Цена |\n|---|---|\n| Хлеб | 30 |\n"
+        checker = Checker({"a.md": BytesIO(text.encode("utf-8"))})
+        checker.scan("a.md")
+        self.assertEqual(1, checker.references)
+        self.assertEqual(0, checker.check())
+
+    def test_caption_across_files(self):
+        checker = Checker({
+            "1.md": BytesIO("См. @goods\n\n%goods Продукты".encode("utf-8")),
+            "2.md": BytesIO("| Продукт | Цена |\n|---|---|\n| Хлеб | 30 |\n".encode("utf-8")),
+        })
+        checker.scan("1.md")
+        checker.scan("2.md")
+        self.assertEqual(0, checker.check())
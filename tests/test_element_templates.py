@@ -0,0 +1,61 @@
+import unittest
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.shared import Cm, RGBColor
+from docx.table import _Cell
+from docx.text.paragraph import Paragraph as DocxParagraph
+from docx.text.run import Run
+from lxml.etree import tostring
+
+from md2gost import element_templates
+from md2gost.style_resolver import get_style_resolver
+from md2gost.util import create_element
+
+from . import _create_test_document
+
+
+class TestElementTemplates(unittest.TestCase):
+    def setUp(self):
+        self._document, _, _ = _create_test_document()
+
+    def assertSameXml(self, expected, actual):
+        self.assertEqual(tostring(expected), tostring(actual))
+
+    def test_paragraph(self):
+        resolver = get_style_resolver(self._document)
+        for style in ("Normal", "Caption", "Heading 1"):
+            with self.subTest(style=style):
+                expected = DocxParagraph(create_element("w:p"), self._document._body)
+                expected.style = style
+                self.assertSameXml(expected._p, element_templates.paragraph(resolver.style_id(style)))
+
+    def test_run(self):
+        for text in ("текст", " с пробелами ", "табуляция\tи\nперенос", "", None):
+            with self.subTest(text=text):
+                expected = DocxParagraph(create_element("w:p"), self._document._body).add_run(text)
+                self.assertSameXml(expected._r, element_templates.run(text))
+
+    def test_formatted_run(self):
+        style_id = get_style_resolver(self._document).style_id("Emphasis", WD_STYLE_TYPE.CHARACTER)
+        for bold, italic, color, strike, style in ((None, None, None, None, None),
+                                                   (True, False, RGBColor(0xff, 0, 0), True, "Emphasis"),
+                                                   (False, True, None, None, None)):
+            with self.subTest(bold=bold, italic=italic, color=color, strike=strike, style=style):
+                expected = Run(create_element("w:r"), self._document._body)
+                expected.style = style
+                expected.bold, expected.italic, expected.font.strike = bold, italic, strike
+                if color is not None:
+                    expected.font.color.rgb = color
+                expected.text = " текст"
+                self.assertSameXml(expected._r, element_templates.formatted_run(
+                    " текст", bold, italic, color, strike, style_id if style else None))
+
+    def test_table_cell(self):
+        expected = _Cell(create_element("w:tc"), None)
+        expected.width = Cm(3.5)
+        self.assertSameXml(expected._tc, element_templates.table_cell(Cm(3.5)))
+
+    def test_templates_not_shared(self):
+        first, second = element_templates.bookmark("1", "a"), element_templates.bookmark("2", "b")
+        self.assertEqual(("1", "2"), (first[0].get(element_templates._ID), second[0].get(element_templates._ID)))
+        self.assertIsNot(element_templates.shading(), element_templates.shading())
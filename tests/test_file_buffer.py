@@ -0,0 +1,78 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from md2gost.converter import Converter
+from md2gost.file_buffer import FileBuffer
+from md2gost.watch import watch
+
+
+class TestFileBuffer(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "report.md")
+        with open(self._path, "w") as f:
+            f.write("# Введение")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_read(self):
+        file_buffer = FileBuffer()
+        with file_buffer[self._path] as f:
+            self.assertEqual("# Введение", f.read().decode("utf-8"))
+        # the stream is closed by the reader, the next access returns a new one
+        self.assertEqual("# Введение", file_buffer[self._path].read().decode("utf-8"))
+
+    def test_modified(self):
+        file_buffer = FileBuffer()
+        file_buffer[self._path].read()
+        mtimes = file_buffer.get_mtimes()
+
+        with open(self._path, "w") as f:
+            f.write("# Заключение")
+        os.utime(self._path, ns=(mtimes[self._path] + 10**9, mtimes[self._path] + 10**9))
+
+        self.assertNotEqual(mtimes, file_buffer.get_mtimes())
+        self.assertEqual("# Заключение", file_buffer[self._path].read().decode("utf-8"))
+
+    def test_missing(self):
+        file_buffer = FileBuffer()
+        missing = os.path.join(self._dir.name, "img.png")
+
+        self.assertNotIn(missing, file_buffer)
+        with self.assertRaises(FileNotFoundError):
+            file_buffer[missing]
+        self.assertEqual({missing: None}, file_buffer.get_mtimes())
+
+    def test_watch_survives_missing_input(self):
+        file_buffer = FileBuffer()
+        converted = []
+
+        def convert():
+            Converter(file_buffer, [self._path], os.path.join(self._dir.name, "out.docx")).convert()
+            converted.append(self._path)
+
+        def recreate():
+            with open(self._path, "w") as f:
+                f.write("# Заключение")
+
+        # an editor deletes and recreates the file on save, the watcher sees the file missing in between
+        steps = iter([lambda: os.remove(self._path), recreate])
+
+        def sleep(_):
+            step = next(steps, None)
+            if step is None:
+                raise KeyboardInterrupt
+            step()
+
+        convert()
+        output = io.StringIO()
+        with mock.patch("md2gost.watch.time.sleep", sleep), redirect_stdout(output):
+            watch(file_buffer, convert)
+
+        self.assertEqual(2, len(converted))
+        self.assertIn("не найден", output.getvalue())
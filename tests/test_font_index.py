@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from md2gost.renderable import font_index
+from md2gost.renderable.find_font import find_font
+from md2gost.renderable.font_index import FontIndex
+
+
+class TestFontIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fonts_dir = os.path.join(self.directory.name, "fonts")
+        self.index_path = os.path.join(self.directory.name, "cache", "font_index.json")
+        os.makedirs(os.path.join(self.fonts_dir, "serif"))
+        shutil.copy(find_font("Times New Roman", False, False), os.path.join(self.fonts_dir, "serif", "times.ttf"))
+        shutil.copy(find_font("Times New Roman", True, True), os.path.join(self.fonts_dir, "serif", "timesbi.ttf"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_find(self):
+        index = FontIndex([self.fonts_dir], self.index_path)
+        self.assertEqual(os.path.join(self.fonts_dir, "serif", "times.ttf"),
+                         index.find("Times New Roman", False, False))
+        self.assertEqual(os.path.join(self.fonts_dir, "serif", "timesbi.ttf"),
+                         index.find("Times New Roman", True, True))
+        self.assertIsNone(index.find("Times New Roman", True, False))
+        self.assertIsNone(index.find("Arial", False, False))
+
+    def test_stored_index(self):
+        FontIndex([self.fonts_dir], self.index_path)
+        self.assertTrue(os.path.exists(self.index_path))
+
+        with mock.patch.object(font_index, "read_font_names") as read_font_names:
+            index = FontIndex([self.fonts_dir], self.index_path)
+            read_font_names.assert_not_called()
+        self.assertIsNotNone(index.find("Times New Roman", False, False))
+
+    def test_outdated_index(self):
+        FontIndex([self.fonts_dir], self.index_path)
+
+        serif_dir = os.path.join(self.fonts_dir, "serif")
+        shutil.copy(find_font("Times New Roman", True, False), os.path.join(serif_dir, "timesbd.ttf"))
+        os.utime(serif_dir, ns=(0, os.stat(serif_dir).st_mtime_ns + 1))
+
+        index = FontIndex([self.fonts_dir], self.index_path)
+        self.assertEqual(os.path.join(serif_dir, "timesbd.ttf"), index.find("Times New Roman", True, False))
@@ -0,0 +1,57 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from freetype import Face
+from PIL import Image, ImageDraw, ImageFont
+
+from md2gost.renderable.find_font import find_font
+from md2gost.renderable.glyph_table import GlyphTable
+
+
+class TestGlyphTable(unittest.TestCase):
+    def _assert_same_as_pil(self, name: str, bold: bool, italic: bool, size: int, texts: list[str]):
+        path = find_font(name, bold, italic)
+        face = Face(path)
+        face.set_char_size(size * 64)
+        draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        # GlyphTable reproduces the basic layout, raqm shapes text with HarfBuzz
+        font = ImageFont.truetype(path, size, layout_engine=ImageFont.Layout.BASIC)
+
+        expected = []
+        for text in texts:
+            bbox = draw.textbbox((0, 0), text, font)
+            expected.append(bbox[2] - bbox[0])
+
+        self.assertEqual(expected, GlyphTable(face).get_widths(texts))
+
+    def test_get_widths(self):
+        self._assert_same_as_pil("Times New Roman", False, False, 14, [
+            "hello", "in", "Электроэнцефалографический", "AV", "Wo", "fi", "j", "T.", "—", "№1",
+        ])
+
+    def test_get_widths_bold_italic(self):
+        self._assert_same_as_pil("Times New Roman", True, True, 14, [
+            "hello", "Электроэнцефалографический", "(a+b)*c",
+        ])
+
+    def test_get_widths_with_spaces(self):
+        self._assert_same_as_pil("Times New Roman", False, False, 14, [" ", "hello world", "  a  "])
+
+    def test_get_widths_empty(self):
+        self._assert_same_as_pil("Times New Roman", False, False, 14, ["", "a", "", "b"])
+
+    def test_get_widths_no_texts(self):
+        face = Face(find_font("Times New Roman", False, False))
+        self.assertEqual([], GlyphTable(face).get_widths([]))
+
+    def test_get_widths_concurrent(self):
+        face = Face(find_font("Times New Roman", False, False))
+        face.set_char_size(14 * 64)
+        # each text loads new blocks and kerning pairs while the others are measured
+        texts = [[chr(block * 128 + i) + "AV" + chr(block * 128 + i + 1) for i in range(0, 120, 8)]
+                 for block in range(32)]
+        expected = [GlyphTable(face).get_widths(block_texts) for block_texts in texts]
+
+        glyph_table = GlyphTable(face)
+        with ThreadPoolExecutor(8) as executor:
+            self.assertEqual(expected, list(executor.map(glyph_table.get_widths, texts)))
@@ -0,0 +1,55 @@
+import unittest
+
+from md2gost.layout_cache import LayoutCache
+from md2gost.layout_tracker import LayoutTracker
+from md2gost.renderable.paragraph import Paragraph
+from md2gost.renderer import Renderer
+
+from . import _create_test_document
+
+
+class TestLayoutCache(unittest.TestCase):
+    def setUp(self):
+        self._layout_cache = LayoutCache()
+
+    def _render(self, texts: list[str]) -> tuple[list[str], LayoutTracker]:
+        document, max_height, max_width = _create_test_document()
+        layout_tracker = LayoutTracker(max_height, max_width)
+        renderables = []
+        for text in texts:
+            renderables.append(Paragraph(document._body))
+            renderables[-1].add_run(text)
+
+        Renderer(document, layout_tracker, layout_cache=self._layout_cache).process(renderables)
+        return [paragraph._p.xml for paragraph in document.paragraphs], layout_tracker
+
+    def test_reused(self):
+        texts = [f"Paragraph {i}. " + "Lorem ipsum dolor sit amet " * (i % 7 + 1) for i in range(60)]
+        first, first_tracker = self._render(texts)
+        self.assertEqual(0, self._layout_cache.reused)
+
+        second, second_tracker = self._render(texts)
+        self.assertEqual(60, self._layout_cache.reused)
+        self.assertEqual(first, second)
+        self.assertEqual([first_tracker.page_map.end(i) for i in range(60)],
+                         [second_tracker.page_map.end(i) for i in range(60)])
+
+    def test_relayout_from_changed_block(self):
+        texts = ["Lorem ipsum dolor sit amet"] * 40
+        self._render(texts)
+
+        # the changed paragraph takes the same height, so the following ones enter the same layout
+        texts[10] = "Lorem ipsum dolor sit"
+        self._render(texts)
+        self.assertEqual(39, self._layout_cache.reused)
+
+        # the changed paragraph is longer, so the following ones are laid out again
+        texts[10] = "Lorem ipsum dolor sit amet " * 8
+        relaid_out, relaid_out_tracker = self._render(texts)
+        self.assertLess(self._layout_cache.reused, 39)
+
+        self._layout_cache = LayoutCache()
+        expected, expected_tracker = self._render(texts)
+        self.assertEqual(expected, relaid_out)
+        self.assertEqual([expected_tracker.page_map.end(i) for i in range(40)],
+                         [relaid_out_tracker.page_map.end(i) for i in range(40)])
@@ -2,7 +2,7 @@ import unittest
 
 from docx.shared import Mm
 
-from md2gost.layout_tracker import LayoutState, LayoutTracker
+from md2gost.layout_tracker import LayoutState, LayoutTracker, PageMap
 
 
 class TestLayoutState(unittest.TestCase):
@@ -25,6 +25,20 @@ class TestLayoutState(unittest.TestCase):
     def test_page(self):
         self.assertEqual(2, self._state.page)
 
+    def test_snapshot_restore(self):
+        snapshot = self._state.snapshot()
+        self._state.max_width -= Mm(10)
+        self._state.add_height(Mm(300))
+        self._state.restore(snapshot)
+
+        self.assertEqual(Mm(210), self._state.max_width)
+        self.assertEqual(Mm(103), self._state.current_page_height)
+
+    def test_integer_emus(self):
+        self._state.add_height(Mm(1) + 0.75)
+        self.assertIs(int, type(self._state.current_page_height))
+        self.assertEqual(Mm(104), self._state.current_page_height)
+
 
 class TestLayoutTracker(unittest.TestCase):
     def test_add_height(self):
@@ -48,3 +62,39 @@ class TestLayoutTracker(unittest.TestCase):
 
         self.assertEqual(3, layout_tracker.current_state.page)
         self.assertEqual(0, layout_tracker.current_state.current_page_height)
+
+    def test_current_state_independent(self):
+        layout_tracker = LayoutTracker(Mm(297), Mm(210))
+        layout_tracker.current_state.add_height(Mm(100))
+        self.assertEqual(0, layout_tracker.current_state.current_page_height)
+
+
+class TestPageMap(unittest.TestCase):
+    def setUp(self):
+        self._page_map = PageMap(Mm(100))
+        for end in (Mm(40), Mm(90), Mm(130), Mm(350), Mm(360)):
+            self._page_map.add(end)
+
+    def test_page_of(self):
+        self.assertEqual([1, 1, 2, 4, 4], [self._page_map.page_of(i) for i in range(5)])
+        self.assertEqual(4, self._page_map.pages)
+
+    def test_elements_on(self):
+        self.assertEqual(range(0, 2), self._page_map.elements_on(1))
+        self.assertEqual(range(2, 3), self._page_map.elements_on(2))
+        self.assertEqual(range(3, 3), self._page_map.elements_on(3))
+        self.assertEqual(range(3, 5), self._page_map.elements_on(4))
+
+    def test_element_at(self):
+        self.assertEqual(0, self._page_map.element_at(Mm(10)))
+        self.assertEqual(3, self._page_map.element_at(Mm(250)))
+        self.assertEqual(Mm(130), self._page_map.start(3))
+
+    def test_tracker_page_map(self):
+        layout_tracker = LayoutTracker(Mm(297), Mm(210))
+        element = object()
+        layout_tracker.add_height(Mm(200))
+        layout_tracker.add_height(Mm(200), element)
+
+        self.assertEqual(1, layout_tracker.page_map.index_of(element))
+        self.assertEqual(2, layout_tracker.page_map.page_of(1))
@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+from md2gost.renderable.line_breaks import MeasuredWords
+from md2gost.renderable.paragraph_sizer import Font, ParagraphSizer, ParagraphSizerResult, _count_cells
+from md2gost.style_resolver import get_style_resolver
+
+from . import _create_test_document
+
+
+class TestMeasuredWords(unittest.TestCase):
+    def setUp(self):
+        # "aaaa bb cccccc dd"
+        self.words = MeasuredWords([(0, 0, 40), (5, 1, 20), (8, 1, 60), (15, 1, 20)], 10)
+
+    def test_wrap(self):
+        line_breaks = self.words.wrap(100, 0)
+        self.assertEqual([0, 8], line_breaks.offsets)
+        self.assertEqual([70, 90], line_breaks.widths)
+        self.assertEqual(2, line_breaks.count)
+
+    def test_wrap_first_line_indent(self):
+        self.assertEqual([0, 5, 15], self.words.wrap(100, 50).offsets)
+
+    def test_long_word(self):
+        words = MeasuredWords([(0, 0, 250)], 10)
+        line_breaks = words.wrap(100, 0)
+        self.assertEqual(3, line_breaks.count)
+        self.assertEqual([100, 100, 50], line_breaks.widths)
+
+    def test_tab(self):
+        # "ab\tc" with tab stops every 40
+        words = MeasuredWords([(0, 0, 30)], 10, 40, {0: [20, 10]})
+        self.assertEqual([50], words.wrap(100, 0).widths)
+        # tab stops are measured from the indent, not from the start of the first line
+        self.assertEqual([90], words.wrap(100, 25).widths)
+
+    def test_tab_after_wrapped_line(self):
+        # "aaaaaa bbb \tc", the tab stop of the wrapped word starts from the beginning of its line
+        words = MeasuredWords([(0, 0, 60), (7, 1, 30), (11, 1, 10)], 10, 40, {2: [0, 10]})
+        line_breaks = words.wrap(100, 0)
+        self.assertEqual([0, 11], line_breaks.offsets)
+        self.assertEqual([100, 50], line_breaks.widths)
+
+    def test_wrap_cached(self):
+        self.assertIs(self.words.wrap(100, 0), self.words.wrap(100, 0))
+
+
+class TestParagraphLineBreaks(unittest.TestCase):
+    def setUp(self):
+        self._document, self._max_height, self._max_width = _create_test_document()
+
+    def test_rewrap_without_measuring(self):
+        paragraph = self._document.add_paragraph("Lorem ipsum dolor sit amet, consectetur adipiscing elit " * 5)
+        narrow = ParagraphSizer(paragraph, None, self._max_width / 2).calculate_height()
+
+        with mock.patch.object(Font, "get_text_widths") as get_text_widths:
+            wide = ParagraphSizer(paragraph, None, self._max_width).calculate_height()
+            get_text_widths.assert_not_called()
+
+        self.assertLess(wide.lines, narrow.lines)
+        self.assertEqual(wide.lines, wide.line_breaks.count)
+        self.assertTrue(all(width <= self._max_width for width in wide.line_breaks.widths))
+
+    def test_measured_again_after_change(self):
+        paragraph = self._document.add_paragraph("Lorem ipsum")
+        ParagraphSizer(paragraph, None, self._max_width).calculate_height()
+        paragraph.add_run(" dolor sit amet, consectetur adipiscing elit" * 10)
+
+        self.assertGreater(ParagraphSizer(paragraph, None, self._max_width).calculate_height().lines, 1)
+
+    def test_fitting_lines(self):
+        result = ParagraphSizerResult(100, 5, 200, 1.5, 50)
+        self.assertEqual(0, result.fitting_lines(299))
+        self.assertEqual(1, result.fitting_lines(300))
+        self.assertEqual(2, result.fitting_lines(600))
+        self.assertEqual(5, result.fitting_lines(10000))
+
+
+class TestMonospace(unittest.TestCase):
+    def setUp(self):
+        self._document, self._max_height, self._max_width = _create_test_document()
+
+    def test_count_cells(self):
+        self.assertEqual(4, _count_cells("text"))
+        self.assertEqual(4, _count_cells("文字"))
+        self.assertEqual(1, _count_cells("e\u0301"))
+
+    def test_sized_without_measuring(self):
+        paragraph = self._document.add_paragraph("print('Lorem ipsum dolor sit amet') " * 5, style="Code")
+        font = get_style_resolver(self._document).font(paragraph)
+        expected = ParagraphSizer(paragraph, None, self._max_width).count_lines(paragraph.runs, self._max_width, font, 0, True)
+
+        paragraph = self._document.add_paragraph("print('Lorem ipsum dolor sit amet') " * 5, style="Code")
+        with mock.patch.object(Font, "get_text_widths") as get_text_widths:
+            result = ParagraphSizer(paragraph, None, self._max_width).calculate_height()
+            get_text_widths.assert_not_called()
+
+        self.assertGreater(expected, 1)
+        self.assertEqual(expected, result.lines)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+import docx
+
+from md2gost.renderable.metrics_pack import build_metrics_pack, get_template_fonts, MetricsPack
+from md2gost.renderable.paragraph_sizer import Font
+
+
+class TestMetricsPack(unittest.TestCase):
+    texts = ["hello", "in", "Электроэнцефалографический", "AV", "Wo", "fi", "T.", "—", "№1", ""]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "metrics.pack")
+        build_metrics_pack({("Times New Roman", 14.), ("Courier New", 12.)}, cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def tearDown(self):
+        os.environ.pop("METRICS_PACK", None)
+
+    def _assert_same_as_font_files(self, name: str, bold: bool, italic: bool, size: float):
+        font = Font(name, bold, italic, size)
+        os.environ["METRICS_PACK"] = self.path
+        packed_font = Font(name, bold, italic, size)
+        del os.environ["METRICS_PACK"]
+
+        self.assertEqual(font._measure(self.texts), packed_font._measure(self.texts))
+        self.assertEqual(font.get_line_height(), packed_font.get_line_height())
+        self.assertEqual(font.is_mono, packed_font.is_mono)
+        self.assertEqual(font.get_text_widths(self.texts), packed_font.get_text_widths(self.texts))
+
+    def test_same_as_font_files(self):
+        self._assert_same_as_font_files("Times New Roman", False, False, 14.)
+        self._assert_same_as_font_files("Times New Roman", True, True, 14.)
+
+    def test_mono(self):
+        self._assert_same_as_font_files("Courier New", False, False, 12.)
+
+    def test_line_height_overrides(self):
+        face = MetricsPack(self.path).get_font_face("Times New Roman", False, False, 14.)
+        self.assertEqual(docx.shared.Pt(16.05), face.line_height)
+
+    def test_unpacked_size(self):
+        face = MetricsPack(self.path).get_font_face("Times New Roman", False, False, 1.)
+        self.assertEqual(docx.shared.Pt(1), face.line_height)
+        self.assertGreater(face.glyph_table.get_widths(["hello"])[0], 0)
+
+    def test_unknown_font(self):
+        with self.assertRaises(ValueError):
+            MetricsPack(self.path).get_font_face("Arial", False, False, 14.)
+
+    def test_template_fonts(self):
+        template = os.path.join(os.path.dirname(__file__), "..", "md2gost", "Template.docx")
+        fonts = get_template_fonts(docx.Document(template))
+        self.assertIn(("Times New Roman", 14.), fonts)
+        self.assertIn(("Courier New", 12.), fonts)
@@ -0,0 +1,61 @@
+import unittest
+
+from md2gost.pagination import BlockArray, KEEP_TOGETHER, KEEP_WITH_NEXT, PAGE_BREAK_BEFORE, fitting_lines, lines_height, \
+    paginate
+
+PAGE_HEIGHT = 1000
+
+
+def _paginate(height: int, *blocks: tuple) -> tuple[list[int], list[int]]:
+    block_array = BlockArray()
+    for block in blocks:
+        block_array.append(*block)
+    heights, moved = paginate(block_array, PAGE_HEIGHT, height)
+    return list(heights), list(moved)
+
+
+class TestFittingLines(unittest.TestCase):
+    def test_same_as_comparing_heights(self):
+        for before, line_height, line_spacing in ((0, 100, 1), (10, 100, 1.5), (35, 12.7, 1.15)):
+            for height in range(0, 1000, 7):
+                expected = 0
+                while expected < 20 and lines_height(before, expected + 1, line_height, line_spacing) <= height:
+                    expected += 1
+                self.assertEqual(expected, fitting_lines(before, 20, line_height, line_spacing, height))
+
+    def test_all_lines(self):
+        self.assertEqual(3, fitting_lines(0, 3, 100, 1, 1000))
+
+
+class TestPaginate(unittest.TestCase):
+    def test_fits(self):
+        self.assertEqual([500, 200], _paginate(0, (0, 5, 100, 1, 0), (0, 2, 100, 1, 0))[0])
+
+    def test_split(self):
+        # three lines fit the page, the rest goes to the next one
+        self.assertEqual([500], _paginate(700, (0, 5, 100, 1, 0))[0])
+
+    def test_widow(self):
+        # all lines except the last fit the page, the last two lines go to the next one
+        self.assertEqual([600], _paginate(600, (0, 5, 100, 1, 0))[0])
+
+    def test_orphan(self):
+        # only one line fits the page, the block goes to the next one
+        self.assertEqual([650], _paginate(850, (0, 5, 100, 1, 0))[0])
+
+    def test_no_space_before_on_new_page(self):
+        self.assertEqual([200], _paginate(1000, (50, 2, 100, 1, 0))[0])
+        self.assertEqual([250], _paginate(0, (50, 2, 100, 1, 0))[0])
+
+    def test_page_break_before(self):
+        self.assertEqual([1000], _paginate(200, (50, 2, 100, 1, 0, PAGE_BREAK_BEFORE))[0])
+
+    def test_keep_together(self):
+        # three lines fit the page, but the block isn't split
+        self.assertEqual([800], _paginate(700, (0, 5, 100, 1, 0, KEEP_TOGETHER))[0])
+        self.assertEqual([500], _paginate(0, (0, 5, 100, 1, 0, KEEP_TOGETHER))[0])
+
+    def test_keep_with_next(self):
+        self.assertEqual(([150], [0]), _paginate(0, (50, 1, 100, 1, 0, KEEP_WITH_NEXT)))
+        # the block and three lines after it don't fit the page
+        self.assertEqual(([300], [1]), _paginate(800, (50, 1, 100, 1, 0, KEEP_WITH_NEXT)))
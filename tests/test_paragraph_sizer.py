@@ -3,7 +3,7 @@ import unittest
 import docx
 from docx import Document
 
-from md2gost.renderable.paragraph_sizer import Font, ParagraphSizer
+from md2gost.renderable.paragraph_sizer import Font, ParagraphSizer, font_cache_info
 from md2gost.renderable.listing import LISTING_OFFSET
 from docx.shared import Pt, Mm, Cm
 
@@ -66,6 +66,20 @@ class TestFont(unittest.case.TestCase):
         self.assertFalse(font.is_mono)
 
 
+class TestFontCache(unittest.TestCase):
+    def test_font_face_is_shared(self):
+        font1 = Font("Times New Roman", False, False, 14)
+        hits = font_cache_info().hits
+        font2 = Font("Times New Roman", False, False, 14)
+        self.assertIs(font1._font_face, font2._font_face)
+        self.assertEqual(hits + 1, font_cache_info().hits)
+
+    def test_font_face_differs_by_style(self):
+        font1 = Font("Times New Roman", False, False, 14)
+        font2 = Font("Times New Roman", True, False, 14)
+        self.assertIsNot(font1._font_face, font2._font_face)
+
+
 class TestParagraphSizer(unittest.TestCase):
     def setUp(self):
         self._document, self._max_height, self._max_width = _create_test_document()
@@ -299,6 +313,39 @@ class TestParagraphSizer(unittest.TestCase):
 
         self.assertEqual(1, ps.count_lines(paragraph.runs, self._max_width - LISTING_OFFSET, paragraph.style.font, 0, True))    
 
+    def test_size_many(self):
+        paragraphs = [self._document.add_paragraph("Lorem ipsum dolor sit amet " * i) for i in range(1, 4)]
+        paragraphs.insert(1, self._document.add_paragraph("def main():", style="Code"))
+        previous_paragraph = self._document.add_paragraph("Lorem ipsum")
+
+        expected = [
+            ParagraphSizer(paragraph, previous, self._max_width).calculate_height()
+            for paragraph, previous in zip(paragraphs, [previous_paragraph] + paragraphs[:-1])
+        ]
+
+        self.assertEqual(expected, ParagraphSizer.size_many(paragraphs, [self._max_width] * len(paragraphs),
+                                                            previous_paragraph))
+
+    def test_sizing_cached(self):
+        previous_paragraph = self._document.add_paragraph("Lorem ipsum")
+        paragraph = self._document.add_paragraph("Lorem ipsum dolor sit amet " * 3)
+        continuation = self._document.add_paragraph("Lorem ipsum dolor sit amet " * 3)
+
+        result = ParagraphSizer(paragraph, previous_paragraph, self._max_width).calculate_height()
+
+        self.assertIs(result, ParagraphSizer(continuation, previous_paragraph, self._max_width).calculate_height())
+        self.assertIsNot(result, ParagraphSizer(paragraph, None, self._max_width).calculate_height())
+        self.assertIsNot(result, ParagraphSizer(paragraph, previous_paragraph, self._max_width / 2).calculate_height())
+        paragraph.add_run("consectetur adipiscing elit")
+        self.assertIsNot(result, ParagraphSizer(paragraph, previous_paragraph, self._max_width).calculate_height())
+
+    def test_keep_together(self):
+        paragraph = self._document.add_paragraph("Lorem ipsum dolor sit amet, consectetur adipiscing elit " * 5)
+        self.assertFalse(ParagraphSizer(paragraph, None, self._max_width).calculate_height().keep_together)
+
+        paragraph.paragraph_format.keep_together = True
+        self.assertTrue(ParagraphSizer(paragraph, None, self._max_width).calculate_height().keep_together)
+
     # def test_count_lines_courier_multiple_runs3(self):
     #     paragraph = self._document.add_paragraph(style="Code")
     #     for run_text in ['', '            ', '-', '>', ' ', 'Generator', '[', 'RenderedInfo', ' ', '|', ' ', 'Renderable', ',', ' ', 'None', ',', ' ', 'None', ']', ':']:
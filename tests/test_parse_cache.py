@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from md2gost.converter import Converter
+from md2gost.extended_markdown import markdown
+from md2gost.parse_cache import ParseCache
+
+TEXT = "# Введение\n\n%goods Продукты\n\n| Продукт | Цена |\n|---|:-:|\n| Хлеб | 30 |\n\nСм. @goods."
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_get(self):
+        parse_cache = ParseCache(self._dir.name)
+        self.assertIsNone(parse_cache.get(TEXT))
+
+        parse_cache.put(TEXT, markdown.parse(TEXT))
+        self.assertEqual(repr(markdown.parse(TEXT).children), repr(parse_cache.get(TEXT).children))
+        self.assertEqual(1, parse_cache.hits)
+
+    def test_parser_version(self):
+        ParseCache(self._dir.name, parser_version=b"1").put(TEXT, markdown.parse(TEXT))
+        self.assertIsNone(ParseCache(self._dir.name, parser_version=b"2").get(TEXT))
+
+    def test_evict(self):
+        parse_cache = ParseCache(self._dir.name)
+        texts = [f"{TEXT} {i}" for i in range(3)]
+        for text in texts:
+            parse_cache.put(text, markdown.parse(text))
+        entries = sorted(os.scandir(self._dir.name), key=lambda entry: entry.name)
+        for i, entry in enumerate(entries):
+            os.utime(entry.path, ns=(i * 10**9, i * 10**9))
+        parse_cache.get(texts[0])  # used last
+
+        parse_cache._max_size = sum(entry.stat().st_size for entry in entries) - 1
+        parse_cache.evict()
+
+        self.assertIsNotNone(parse_cache.get(texts[0]))
+        self.assertEqual(2, len(os.listdir(self._dir.name)))
+
+    def test_conversion_not_parsed(self):
+        def convert():
+            Converter({"a.md": BytesIO(TEXT.encode("utf-8"))}, ["a.md"], "out.docx",
+                      parse_cache=ParseCache(self._dir.name)).convert()
+
+        convert()
+        with mock.patch.object(markdown, "parse") as parse:
+            convert()
+            parse.assert_not_called()
@@ -0,0 +1,64 @@
+import gc
+import re
+import unittest
+import weakref
+from io import BytesIO
+from unittest import mock
+
+from md2gost.converter import Converter
+from md2gost.renderable import Heading, ToC
+from md2gost.renderable_factory import RenderableFactory
+from md2gost.renderer import Renderer
+
+FILES = {
+    "0.md": "# *СОДЕРЖАНИЕ\n\n[TOC]\n\nСм. @goods и @sort.",
+    "1.md": "# Введение\n\nТекст первой главы.\n\n%goods Продукты",
+    "2.md": "| Продукт | Цена |\n|---|---|\n| Хлеб | 30 |\n\nСм. @goods.",
+    "3.md": "# Заключение\n\n- первый\n- второй\n\n%sort Сортировка\n\n```python\nsorted(x)\n```",
+}
+
+
+def _convert(jobs: int = 1, streaming: bool = False) -> str:
+    filebuffer = {path: BytesIO(text.encode("utf-8")) for path, text in FILES.items()}
+    converter = Converter(filebuffer, list(FILES), "out.docx", jobs=jobs, streaming=streaming)
+    converter.convert()
+    # ids of headings and captions are random
+    return re.sub(r"[0-9a-f]{32}", "", converter.document.element.xml)
+
+
+class TestParser(unittest.TestCase):
+    def test_parallel_same_as_sequential(self):
+        self.assertEqual(_convert(1), _convert(2))
+
+    def test_caption_across_files(self):
+        xml = _convert(2)
+        # the caption at the end of the first file names the table of the second one
+        self.assertIn("Продукты", xml)
+        self.assertLess(xml.index("Продукты"), xml.index("Хлеб"))
+
+
+class TestStreaming(unittest.TestCase):
+    def test_same_as_not_streaming(self):
+        self.assertEqual(_convert(), _convert(streaming=True))
+
+    def test_released(self):
+        created = []
+        create = RenderableFactory.__dict__["create"]
+        render = Renderer.render
+
+        def create_recorded(factory, marko_element, caption_info):
+            for renderable in create.__get__(factory)(marko_element, caption_info):
+                if not isinstance(renderable, (Heading, ToC)):  # they are kept for the table of contents
+                    created.append(weakref.ref(renderable))
+                yield renderable
+
+        def render_checked(renderer, renderable):
+            gc.collect()
+            # only the rendered block is alive
+            self.assertLessEqual(sum(ref() is not None for ref in created), 1)
+            render(renderer, renderable)
+
+        with mock.patch.object(RenderableFactory, "create", create_recorded), \
+                mock.patch.object(Renderer, "render", render_checked):
+            _convert(streaming=True)
+        self.assertGreater(len(created), 5)
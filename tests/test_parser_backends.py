@@ -0,0 +1,78 @@
+import logging
+import os
+import pickle
+import random
+import re
+import tempfile
+import unittest
+from importlib.util import find_spec
+from io import BytesIO
+
+from md2gost.converter import Converter
+from md2gost.file_buffer import FileBuffer
+from md2gost.parse_cache import ParseCache
+from md2gost.parser_backend import MarkoBackend, get_parser_backend
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "examples", "example.md")
+
+FRAGMENTS = [
+    "# Заголовок", "## *Без номера* текст", "Заголовок\n=====", "Подзаголовок\n---", "#", "## Заголовок ##",
+    "Текст с **жирным**, *курсивом*, ***обоими*** и ~~зачёркнутым~~ ~текстом~",
+    "и `кодом` $x^2$, ссылкой @ref-a, почтой user@mail.ru и $ не формулой",
+    "строка  \nперенос\\\nещё", "a &amp; &copy; \\* \\_", "[ссылка](http://a.b \"t\") и https://x.com/a. и www.y.org,",
+    "[*курсив* `код`](https://ru.wikipedia.org/wiki/ГОСТ)", "<http://auto.link> и <span>html</span>",
+    "%cap Подпись", "%name", "$$\na = b\n$$", "$$ c $$ хвост", "[TOC]", "[TOC] после",
+    "- пункт\n- второй\n  - вложенный\n\n  продолжение", "1. один\n2. два\n   1. вложенный", "- [ ] задача\n- [x] готово",
+    "| a | b |\n|---|:-:|\n| 1 | `2|3` |\n| 4 |", "a | b\n--|--:\n1 | 2", "```python\nprint(1)\n```", "~~~\nкод\n~~~",
+    "    код с отступом", "![alt](img.png \"%pic Картинка\")", "![без подписи](img.png)", "> цитата", "<div>html</div>",
+    "---", "[ref]: http://r.s", "Текст\n- список после текста", "Текст\n    не код",
+]
+
+
+def _corpus(seed: int, files: int) -> dict[str, str]:
+    rng = random.Random(seed)
+    return {f"{i}.md": "".join(fragment + rng.choice(["\n", "\n\n"])
+                               for fragment in rng.choices(FRAGMENTS, k=rng.randint(1, 8)))
+            for i in range(files)}
+
+
+def _convert(filebuffer: dict[str, BytesIO], paths: list[str], backend: str) -> str:
+    converter = Converter(filebuffer, paths, "out.docx", parser_backend=get_parser_backend(backend))
+    converter.convert()
+    # ids of headings and captions are random
+    return re.sub(r"[0-9a-f]{32}", "", converter.document.element.xml)
+
+
+@unittest.skipUnless(find_spec("markdown_it"), "markdown-it-py isn't installed")
+class TestMarkdownItBackend(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.WARNING)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_example(self):
+        self.assertEqual(_convert(FileBuffer(), [EXAMPLE], "marko"), _convert(FileBuffer(), [EXAMPLE], "markdown-it"))
+
+    def test_synthetic(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                texts = _corpus(seed, 20)
+
+                def convert(backend):
+                    filebuffer = {path: BytesIO(text.encode("utf-8")) for path, text in texts.items()}
+                    return _convert(filebuffer, list(texts), backend)
+
+                self.assertEqual(convert("marko"), convert("markdown-it"))
+
+    def test_picklable(self):
+        backend = pickle.loads(pickle.dumps(get_parser_backend("markdown-it")))
+        parsed = pickle.loads(pickle.dumps(backend.parse("# Заголовок\n\n%cap Подпись\n\n$$ a $$")))
+        self.assertEqual(["Heading", "Caption", "Equation"], [type(child).__name__ for child in parsed.children])
+
+    def test_parse_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            parse_cache = ParseCache(directory)
+            parse_cache.put("# Заголовок", MarkoBackend().parse("# Заголовок"))
+            self.assertIsNone(parse_cache.get("# Заголовок", get_parser_backend("markdown-it")))
+            self.assertIsNotNone(parse_cache.get("# Заголовок"))
@@ -0,0 +1,50 @@
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from md2gost.converter import Converter
+
+from md2gost.pre_measurer import PreMeasurer
+from md2gost.renderable.paragraph import Paragraph
+from md2gost.renderable.paragraph_sizer import Font, ParagraphSizer, word_width_cache
+
+from . import _create_test_document
+
+
+class TestPreMeasurer(unittest.TestCase):
+    def setUp(self):
+        self._document, self._max_height, self._max_width = _create_test_document()
+
+    def test_measured_in_advance(self):
+        paragraphs = []
+        for i in range(20):
+            paragraphs.append(Paragraph(self._document._body))
+            paragraphs[-1].add_run(f"Premeasured{i} paragraph with some words, ")
+            paragraphs[-1].add_run(f"bold{i} run", is_bold=True)
+
+        PreMeasurer(2).process(paragraphs)
+
+        with mock.patch.object(Font, "_measure") as measure:
+            for paragraph in paragraphs:
+                ParagraphSizer(paragraph._docx_paragraph, None, self._max_width).calculate_height()
+            measure.assert_not_called()
+
+    def test_cache_bound_restored(self):
+        text = "\n\n".join(f"Abzac{i} s novymi{i} slovami{i}" for i in range(20)).encode("utf-8")
+        maxsize = word_width_cache.maxsize
+        bound = word_width_cache.maxsize = word_width_cache.info().currsize + 1
+        try:
+            Converter({"a.md": BytesIO(text)}, ["a.md"], "out.docx", jobs=2).convert()
+            self.assertEqual(bound, word_width_cache.maxsize)
+            self.assertLessEqual(word_width_cache.info().currsize, bound)
+        finally:
+            word_width_cache.maxsize = maxsize
+
+    def test_texts_to_measure(self):
+        paragraph = self._document.add_paragraph("one two ")
+        paragraph.add_run("three").bold = True
+        texts = ParagraphSizer.get_texts_to_measure([paragraph])
+
+        self.assertEqual(2, len(texts))
+        self.assertIn({"one", "two", "", " "}, texts.values())
+        self.assertIn({"three", ""}, texts.values())
@@ -0,0 +1,73 @@
+import unittest
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.shared import Pt, RGBColor
+
+from md2gost.renderable.paragraph_sizer import get_font
+from md2gost.style_resolver import StyleResolver, get_style_resolver
+
+from . import _create_test_document
+
+
+class TestStyleResolver(unittest.TestCase):
+    def setUp(self):
+        self._document, _, _ = _create_test_document()
+        self._document.styles.add_style("Epigraph", WD_STYLE_TYPE.PARAGRAPH).base_style = self._document.styles["Normal"]
+        self._document.styles["Epigraph"].font.italic = True
+        self._document.styles["Epigraph"].paragraph_format.space_after = Pt(28)
+
+    def test_inheritance(self):
+        paragraph = self._document.add_paragraph(style="Epigraph")
+        resolver = StyleResolver(self._document)
+
+        self.assertEqual("Times New Roman", resolver.font(paragraph).name)
+        self.assertEqual(Pt(14), resolver.font(paragraph).size)
+        self.assertTrue(resolver.font(paragraph).italic)
+        self.assertEqual(self._document.styles["Normal"].paragraph_format.first_line_indent, resolver.paragraph_format(paragraph).first_line_indent)
+        self.assertEqual(Pt(28), resolver.paragraph_format(paragraph).space_after)
+
+    def test_direct_formatting(self):
+        paragraph = self._document.add_paragraph(style="Epigraph")
+        paragraph.paragraph_format.first_line_indent = 0
+        run = paragraph.add_run("text")
+        run.font.bold = True
+        resolver = StyleResolver(self._document)
+
+        self.assertEqual(0, resolver.paragraph_format(paragraph).first_line_indent)
+        self.assertEqual(Pt(28), resolver.paragraph_format(paragraph).space_after)
+        self.assertIsNone(resolver.font(paragraph).bold)
+        run_font = resolver.run_font(resolver.font(paragraph), run._r)
+        self.assertTrue(run_font.bold)
+        self.assertTrue(run_font.italic)
+
+    def test_style_compiled_once(self):
+        resolver = get_style_resolver(self._document)
+        first = self._document.add_paragraph(style="Epigraph")
+        second = self._document.add_paragraph(style="Epigraph")
+
+        self.assertIs(resolver, get_style_resolver(first.part.document))
+        self.assertIs(resolver.style(first), resolver.style(second))
+        self.assertIs(resolver.style(first), resolver.style_by_name("Epigraph"))
+
+    def test_run_fonts_interned(self):
+        paragraph = self._document.add_paragraph(style="Epigraph")
+        runs = [paragraph.add_run(text) for text in ("one", "two", "three")]
+        runs[0].font.bold = runs[1].font.bold = True
+        runs[1].font.color.rgb = RGBColor(255, 0, 0)
+        runs[2].font.size = Pt(12)
+        resolver = StyleResolver(self._document)
+        font = resolver.font(paragraph)
+
+        self.assertIs(resolver.run_font(font, runs[0]._r), resolver.run_font(font, runs[1]._r))
+        self.assertEqual(Pt(12), resolver.run_font(font, runs[2]._r).size)
+        self.assertIsNone(resolver.run_font(font, runs[2]._r).bold)
+        self.assertIs(get_font(resolver.run_font(font, runs[0]._r)), get_font(resolver.run_font(font, runs[1]._r)))
+
+    def test_styles_of_documents_equal(self):
+        other, _, _ = _create_test_document()
+        style = StyleResolver(self._document).style_by_name("Code")
+        other_style = StyleResolver(other).style_by_name("Code")
+
+        self.assertEqual(style, other_style)
+        self.assertEqual(hash(style), hash(other_style))
+        self.assertNotEqual(style, StyleResolver(other).style_by_name("Normal"))
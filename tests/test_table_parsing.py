@@ -0,0 +1,38 @@
+import unittest
+from unittest import mock
+
+from md2gost.extended_markdown import markdown, Heading
+from md2gost.extended_markdown.table import Table, TableRow
+
+
+def _cells(table: Table) -> list[list[str]]:
+    return [[cell.children[0].children if cell.children else "" for cell in row.children] for row in table.children]
+
+
+class TestTableParsing(unittest.TestCase):
+    def test_rows(self):
+        table = markdown.parse("| a | b |\n|---|:-:|\n| 1 | 2 |\n| 3 |\n| 4 | 5 | 6 |\n").children[0]
+        self.assertIsInstance(table, Table)
+        self.assertEqual([["a", "b"], ["1", "2"], ["3", ""], ["4", "5"]], _cells(table))
+        self.assertEqual("center", table.children[1].children[1].align)
+
+    def test_ended_by_block_element(self):
+        children = markdown.parse("a | b\n--|--\n1 | 2\n# Heading\n").children
+        self.assertEqual([["a", "b"], ["1", "2"]], _cells(children[0]))
+        self.assertIsInstance(children[1], Heading)
+
+    def test_reentrant(self):
+        parse = TableRow.parse.__func__
+        nested = False
+
+        def parse_nested(cls, source):
+            # another document is parsed while the table is parsed, as in a concurrent parser
+            nonlocal nested
+            if not nested:
+                nested = True
+                markdown.parse("| x | y | z |\n|---|---|---|\n| 7 | 8 | 9 |\n")
+            return parse(cls, source)
+
+        with mock.patch.object(TableRow, "parse", classmethod(parse_nested)):
+            table = markdown.parse("| a | b |\n|---|---|\n| 1 | 2 |\n").children[0]
+        self.assertEqual([["a", "b"], ["1", "2"]], _cells(table))
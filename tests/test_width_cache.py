@@ -0,0 +1,62 @@
+import unittest
+
+from md2gost.renderable.width_cache import WidthCache
+
+
+class TestWidthCache(unittest.TestCase):
+    def setUp(self):
+        self.measured: list[list[str]] = []
+
+    def _measure(self, texts: list[str]) -> list[int]:
+        self.measured.append(texts)
+        return [len(text) for text in texts]
+
+    def test_get_widths(self):
+        cache = WidthCache(10)
+        self.assertEqual([5, 2, 5], cache.get_widths("font", ["hello", "in", "hello"], self._measure))
+        self.assertEqual([["hello", "in"]], self.measured)
+
+    def test_hits_and_misses(self):
+        cache = WidthCache(10)
+        cache.get_widths("font", ["hello", "in"], self._measure)
+        cache.get_widths("font", ["hello", "world"], self._measure)
+
+        info = cache.info()
+        self.assertEqual(3, info.misses)
+        self.assertEqual(1, info.hits)
+        self.assertAlmostEqual(0.25, info.hit_rate)
+        self.assertEqual([["hello", "in"], ["world"]], self.measured)
+
+    def test_repeated_miss(self):
+        cache = WidthCache(10)
+        cache.get_widths("font", ["hello", "in", "hello"], self._measure)
+
+        info = cache.info()
+        self.assertEqual(3, info.misses)
+        self.assertEqual(0, info.hits)
+
+    def test_font_key(self):
+        cache = WidthCache(10)
+        cache.get_widths("font1", ["hello"], self._measure)
+        cache.get_widths("font2", ["hello"], self._measure)
+        self.assertEqual(2, cache.info().misses)
+
+    def test_lru_eviction(self):
+        cache = WidthCache(2)
+        cache.get_widths("font", ["a", "b"], self._measure)
+        cache.get_widths("font", ["a"], self._measure)  # "b" is the least recently used now
+        cache.get_widths("font", ["c"], self._measure)
+        cache.get_widths("font", ["a"], self._measure)
+        cache.get_widths("font", ["b"], self._measure)
+
+        self.assertEqual([["a", "b"], ["c"], ["b"]], self.measured)
+        self.assertEqual(2, cache.info().evictions)
+        self.assertEqual(2, cache.info().currsize)
+
+    def test_maxsize(self):
+        cache = WidthCache(3)
+        cache.get_widths("font", ["a", "b", "c"], self._measure)
+        cache.maxsize = 1
+
+        self.assertEqual(1, cache.info().currsize)
+        self.assertEqual(2, cache.info().evictions)